@@ -0,0 +1,80 @@
+"""
+Compare the throughput of the blocking `Api` and the pooled `AsyncApi`.
+
+Both clients run `list_products` against a local stand-in of the MiceBot
+API that answers after a configurable latency. The blocking client is
+driven the same way the command handlers used to drive it, one call after
+the other, because each call freezes the event loop.
+
+Usage:
+    python -m bench.api --requests 200 --concurrency 20 --latency 0.02
+"""
+import argparse
+import asyncio
+import time
+
+from bench.server import FakeServer
+from micebot.api import Api, AsyncApi
+from micebot.model.model import ProductQuery
+
+
+def run_blocking(endpoint: str, requests: int) -> float:
+    api = Api(endpoint=endpoint, username="user", password="pass")
+    api.authenticate()
+    start = time.perf_counter()
+    for _ in range(requests):
+        api.list_products(ProductQuery(limit=5))
+    return time.perf_counter() - start
+
+
+async def run_async(endpoint: str, requests: int, concurrency: int) -> float:
+    api = AsyncApi(
+        endpoint=endpoint,
+        username="user",
+        password="pass",
+        max_connections=concurrency,
+        max_keepalive=concurrency,
+    )
+    await api.authenticate()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def command():
+        async with semaphore:
+            await api.list_products(ProductQuery(limit=5))
+
+    start = time.perf_counter()
+    await asyncio.gather(*[command() for _ in range(requests)])
+    elapsed = time.perf_counter() - start
+    await api.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--size", type=int, default=5)
+    args = parser.parse_args()
+
+    server = FakeServer(
+        latency=args.latency, products=args.size, orders=0
+    ).start()
+    endpoint = server.endpoint
+
+    results = {
+        "Api (blocking)": run_blocking(endpoint, args.requests),
+        "AsyncApi (pooled)": asyncio.run(
+            run_async(endpoint, args.requests, args.concurrency)
+        ),
+    }
+    server.shutdown()
+    server.server_close()
+
+    print(f"{'client':<20}{'seconds':>10}{'req/s':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:<20}{elapsed:>10.3f}{args.requests / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Compare the validated and the trusted decoding of large listings.
+
+A page of `--orders` orders and one of `--products` products are generated
+by the fake API dataset and encoded as the API does. Each page is then
+decoded from its JSON bytes by every installed JSON codec, alone and
+followed by the pydantic validation or by the decoders of
+`micebot.api.decoding`, reporting the median time of the `--runs` runs,
+the memory retained by the decoded page and the peak memory of the
+decoding, as measured by `tracemalloc`.
+
+Usage:
+    python -m bench.decode --orders 10000 --products 10000 --runs 5
+"""
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+
+from bench.server import Dataset
+from micebot.api import decoding
+from micebot.api.codec import CODECS, JsonCodec
+from micebot.model.model import OrderWithTotal, ProductResponse
+
+Decoder = Callable[[dict], object]
+
+
+def timing(
+    payload: bytes, codec: JsonCodec, decode: Decoder, runs: int
+) -> float:
+    """
+    The median seconds to decode the payload, JSON parsing included.
+    """
+    seconds = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        decode(codec.loads(payload))
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def memory(
+    payload: bytes, codec: JsonCodec, decode: Decoder
+) -> Tuple[int, int, int]:
+    """
+    Measure the allocations of a decoding.
+
+    Returns:
+        - the bytes and blocks retained by the decoded page, and the peak
+            bytes allocated while decoding it.
+    """
+    gc.collect()
+    tracemalloc.start()
+    page = decode(codec.loads(payload))  # noqa: F841
+    retained, peak = tracemalloc.get_traced_memory()
+    snapshot = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    blocks = sum(stat.count for stat in snapshot.statistics("filename"))
+    return retained, blocks, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    dataset = Dataset(products=args.products, orders=args.orders, seed=0)
+    products = list(dataset.products.values())[: args.products]
+    pages: Dict[str, Tuple[bytes, Decoder, Decoder]] = {
+        f"{args.orders} orders": (
+            json.dumps(
+                {"total": args.orders, "orders": dataset.orders}
+            ).encode(),
+            lambda data: OrderWithTotal(**data),
+            decoding.orders_with_total,
+        ),
+        f"{args.products} products": (
+            json.dumps(
+                {
+                    "total": {
+                        "all": len(products),
+                        "taken": args.orders,
+                        "available": len(products) - args.orders,
+                    },
+                    "products": products,
+                }
+            ).encode(),
+            lambda data: ProductResponse(**data),
+            decoding.product_response,
+        ),
+    }
+
+    print(
+        f"{'page':<18}{'codec':<8}{'decoder':<11}{'ms':>9}"
+        f"{'retained KiB':>14}{'blocks':>10}{'peak KiB':>10}"
+    )
+    for name, (payload, validated, trusted) in pages.items():
+        baseline = None
+        for codec in CODECS.values():
+            for decoder, decode in (
+                ("none", lambda data: data),
+                ("validated", validated),
+                ("trusted", trusted),
+            ):
+                seconds = timing(payload, codec, decode, args.runs)
+                retained, blocks, peak = memory(payload, codec, decode)
+                if decoder == "validated" and baseline is None:
+                    baseline = seconds
+                speedup = (
+                    f"  x{baseline / seconds:.1f}" if decoder != "none" else ""
+                )
+                print(
+                    f"{name:<18}{codec.name:<8}{decoder:<11}"
+                    f"{seconds * 1000:>9.1f}{retained / 1024:>14.0f}"
+                    f"{blocks:>10}{peak / 1024:>10.0f}{speedup}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Compare the rendering of the listings before and after the embed templates.
+
+The `orders` and `ls` listings of `--records` records, generated by the
+fake API dataset, are rendered into embeds as the commands did before, by
+`pack`, `record` and `strftime` on every call, and as they do now, by the
+prebuilt templates of the commands and `format_datetime`. The formatter is
+measured cold, with its cache cleared before each run, and warm, as when
+the same listing is shown again. The `add` embed is rendered `--records`
+times both ways too. The median of the `--runs` runs is reported, per
+thousand records.
+
+Usage:
+    python -m bench.embeds --records 1000 --runs 20
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from discord import Colour, Embed
+
+from bench.server import Dataset
+from micebot.api import decoding
+from micebot.commands import orders, products
+from micebot.model.embed import (
+    _strftime,
+    EMBED_MAX_CHARACTERS,
+    EMBED_MAX_FIELDS,
+    FIELD_NAME_MAX_CHARACTERS,
+    FIELD_VALUE_MAX_CHARACTERS,
+    Field,
+    embed,
+    format_datetime,
+)
+from micebot.model.env import env
+from micebot.model.model import Order, Product
+
+Render = Callable[[], object]
+
+
+def record(title: str, fields: List[Field]) -> Field:
+    """
+    Condense a record into a single field, one line per attribute, as the
+    commands did before `RecordTemplate`.
+
+    Args:
+        - title: the record title, used as the field name.
+        - fields: the record attributes.
+
+    Returns:
+        - the field that represents the record.
+    """
+    return Field(
+        key=title,
+        value="\n".join(f"**{field.key}:** {field.value}" for field in fields),
+        inline=False,
+    )
+
+
+def pack(
+    title: str,
+    records: Iterable[Field],
+    fields: List[List[Field]] = None,
+    description: str = None,
+    footer: str = None,
+    color: Colour = Colour.lighter_grey(),
+    thumbnail: bool = False,
+) -> Iterator[Embed]:
+    """
+    Pack many records into as few embeds as the Discord limits allow, as the
+    commands did before `EmbedTemplate.pack`.
+
+    The first embed carries the title, the description and the header
+    fields. The records fill it up to the field count and the character
+    limits of an embed, the remaining ones overflow to untitled embeds of
+    the same color. The footer is added to the last embed.
+
+    Args:
+        - title: the title of the first embed.
+        - records: the records, as built by `record`.
+        - fields: the header fields of the first embed.
+        - description: the description of the first embed.
+        - footer: the optional footer of the last embed.
+        - color: the color of the embeds.
+        - thumbnail: if the default thumbnail is added to the first embed.
+
+    Returns:
+        - an iterator over the embeds, one per message to be sent.
+    """
+    reserved = len(footer or "")
+    current = embed(
+        title=title,
+        fields=fields,
+        description=description,
+        color=color,
+        thumbnail=thumbnail,
+    )
+    characters = reserved + len(title) + len(description or "")
+    characters += sum(
+        len(field.name) + len(field.value) for field in current.fields
+    )
+
+    for field in records:
+        name = field.key[:FIELD_NAME_MAX_CHARACTERS]
+        value = field.value[:FIELD_VALUE_MAX_CHARACTERS]
+
+        if (
+            len(current.fields) >= EMBED_MAX_FIELDS
+            or characters + len(name) + len(value) > EMBED_MAX_CHARACTERS
+        ):
+            yield current
+            current = Embed(colour=color)
+            characters = reserved
+
+        current.add_field(name=name, value=value, inline=field.inline)
+        characters += len(name) + len(value)
+
+    if footer:
+        current.set_footer(text=footer)
+    yield current
+
+
+def timing(render: Render, runs: int, cold: bool = False) -> float:
+    """
+    The median seconds of a rendering, all its embeds included.
+    """
+    seconds = []
+    for _ in range(runs):
+        if cold:
+            _strftime.cache_clear()
+        start = time.perf_counter()
+        render()
+        seconds.append(time.perf_counter() - start)
+    return statistics.median(seconds)
+
+
+def orders_before(items: List[Order]):
+    return list(
+        pack(
+            title="Útimos itens resgatados",
+            description=f"Aqui estão os {len(items)} itens resgatados "
+            f"de um total de {len(items)}.",
+            records=(
+                record(
+                    title=order.uuid,
+                    fields=[
+                        Field(
+                            key="Entregue em",
+                            value=order.requested_at.strftime(
+                                env.datetime_formatter
+                            ),
+                        ),
+                        Field(
+                            key="Entregue por", value=order.mod_display_name
+                        ),
+                        Field(
+                            key="Entregue para",
+                            value=order.owner_display_name,
+                        ),
+                        Field(
+                            key=f"Código do {order.product.summary}",
+                            value=order.product.code,
+                        ),
+                    ],
+                )
+                for order in items
+            ),
+        )
+    )
+
+
+def orders_after(items: List[Order]):
+    return list(
+        orders.LISTING.pack(
+            description=f"Aqui estão os {len(items)} itens resgatados "
+            f"de um total de {len(items)}.",
+            records=(
+                orders.LISTED_ORDER(
+                    order.uuid,
+                    format_datetime(order.requested_at),
+                    order.mod_display_name,
+                    order.owner_display_name,
+                    order.product.code,
+                    summary=order.product.summary,
+                )
+                for order in items
+            ),
+        )
+    )
+
+
+def header(items: List[Product]) -> List[List[Field]]:
+    return [[Field(key="Total", value=str(len(items)))]]
+
+
+def ls_before(items: List[Product]):
+    return list(
+        pack(
+            title="Detalhamento",
+            description="Esses são os dados que tenho até o momento:",
+            thumbnail=True,
+            color=Colour.green(),
+            fields=header(items),
+            records=(
+                record(
+                    title=product.code,
+                    fields=[
+                        Field(key="UUID", value=product.uuid),
+                        Field(key="descrição", value=product.summary),
+                        Field(
+                            key="criado em",
+                            value=product.created_at.strftime(
+                                env.datetime_formatter
+                            ),
+                        ),
+                    ],
+                )
+                for product in items
+            ),
+            footer="Final do Relatório.",
+        )
+    )
+
+
+def ls_after(items: List[Product]):
+    return list(
+        products.LISTING.pack(
+            fields=header(items),
+            records=(
+                products.LISTED_PRODUCT(
+                    product.code,
+                    product.uuid,
+                    product.summary,
+                    format_datetime(product.created_at),
+                )
+                for product in items
+            ),
+        )
+    )
+
+
+def added(product: Product) -> List[List[Field]]:
+    return [
+        [
+            Field(key="UUID", value=product.uuid, inline=False),
+            Field(key="código", value=product.code),
+            Field(key="descrição", value=product.summary),
+        ]
+    ]
+
+
+def add_before(items: List[Product]):
+    return [
+        embed(
+            title="Novo Item",
+            description="Acabei de adicionar um novo item para ser resgatado.",
+            fields=added(product)
+            + [
+                [
+                    Field(
+                        key="criado em",
+                        value=product.created_at.strftime(
+                            env.datetime_formatter
+                        ),
+                        inline=False,
+                    )
+                ]
+            ],
+            footer=products.DEFAULT_FOOTER,
+        )
+        for product in items
+    ]
+
+
+def add_after(items: List[Product]):
+    return [
+        products.ADDED.render(
+            fields=added(product)
+            + [
+                [
+                    Field(
+                        key="criado em",
+                        value=format_datetime(product.created_at),
+                        inline=False,
+                    )
+                ]
+            ]
+        )
+        for product in items
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    dataset = Dataset(products=args.records, orders=args.records, seed=0)
+    order_items = decoding.orders_with_total(
+        {"total": args.records, "orders": dataset.orders}
+    ).orders
+    product_items = [
+        decoding.product(product) for product in dataset.products.values()
+    ]
+    listings: Dict[str, Tuple[Callable, Callable, list]] = {
+        "orders": (orders_before, orders_after, order_items),
+        "ls": (ls_before, ls_after, product_items),
+        "add": (add_before, add_after, product_items),
+    }
+
+    scale = 1000 * 1000 / args.records
+    print(f"{'listing':<9}{'before':>10}{'cold':>10}{'warm':>10}  ms/1k")
+    for name, (before, after, items) in listings.items():
+        baseline = timing(lambda: before(items), args.runs)
+        cold = timing(lambda: after(items), args.runs, cold=True)
+        warm = timing(lambda: after(items), args.runs)
+        print(
+            f"{name:<9}{baseline * scale:>10.2f}{cold * scale:>10.2f}"
+            f"{warm * scale:>10.2f}  x{baseline / warm:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
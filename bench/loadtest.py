@@ -0,0 +1,254 @@
+"""
+Drive the bot commands at high concurrency against the fake MiceBot API.
+
+The real command callbacks from `micebot.commands` are invoked with
+synthetic contexts, whose channels answer instantly, so the measured
+latency is the time spent by the bot and the API. The outbox pacing is
+lifted for the same reason. The report shows the throughput and the p50,
+p95 and p99 latency of each command. With `--trace`, the spans are written
+for `python -m micebot.tracing.summary`.
+
+Usage:
+    python -m bench.loadtest --commands 2000 --concurrency 100 \\
+        --latency 0.02 --error-rate 0.01 --mix ls=4,orders=4,add=1,remove=1
+"""
+import argparse
+import asyncio
+import itertools
+import math
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from discord.ext.commands import Bot
+
+from bench.server import FakeServer
+from micebot.api import AsyncApi
+from micebot.commands.orders import register as register_order_commands
+from micebot.commands.products import register as register_product_commands
+from micebot.model.outbox import outbox
+from micebot.tracing import JsonlExporter, tracer
+
+Invocation = Tuple[str, Tuple[str, ...]]
+
+
+class FakeMessage:
+    def __init__(self, channel: "FakeChannel"):
+        self.channel = channel
+
+    async def edit(self, **kwargs):
+        pass
+
+    async def delete(self, **kwargs):
+        pass
+
+
+class FakeChannel:
+    def __init__(self, id: int):
+        self.id = id
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs) -> FakeMessage:
+        self.sent += 1
+        return FakeMessage(self)
+
+
+def context(channel: FakeChannel, user: int) -> SimpleNamespace:
+    """
+    Build the synthetic context of a command invocation.
+    """
+    return SimpleNamespace(
+        channel=channel,
+        author=SimpleNamespace(mention=f"<@{user}>"),
+        message=SimpleNamespace(
+            channel=channel, attachments=[], delete=FakeMessage(channel).delete
+        ),
+    )
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """
+    Parse the command mix, e.g. `ls=4,orders=4,add=1,remove=1`.
+    """
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def invocations(
+    mix: Dict[str, int], available: List[str], rng: random.Random
+) -> Iterator[Invocation]:
+    """
+    Yield the commands to be invoked, following the weighted mix.
+
+    Each `remove` takes a different available product, so it is not
+    answered with 404 because of an earlier removal.
+    """
+    names = list(mix)
+    weights = list(mix.values())
+    removable = iter(rng.sample(available, len(available)))
+    codes = (f"load-{i:08d}" for i in itertools.count())
+
+    while True:
+        name = rng.choices(names, weights)[0]
+        if name == "add":
+            yield name, (next(codes),)
+        elif name == "remove":
+            uuid = next(removable, None)
+            if uuid is not None:
+                yield name, (uuid,)
+        elif name in ("ls", "orders"):
+            yield name, ("5",)
+        else:
+            yield name, ()
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """
+    The nearest-rank percentile of sorted samples.
+    """
+    if not samples:
+        return math.nan
+    return samples[max(0, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+async def run(
+    endpoint: str,
+    available: List[str],
+    commands: int,
+    concurrency: int,
+    channels: int,
+    mix: Dict[str, int],
+    cache_ttl: float,
+    seed: Optional[int],
+) -> Tuple[float, Dict[str, List[float]], Dict[str, int], AsyncApi]:
+    api = AsyncApi(
+        endpoint=endpoint,
+        username="user",
+        password="pass",
+        max_connections=concurrency,
+        max_keepalive=concurrency,
+        cache_ttl=cache_ttl,
+    )
+    bot = Bot(command_prefix="!mice ")
+    register_product_commands(bot=bot, api=api)
+    register_order_commands(bot=bot, api=api)
+    outbox.rate, outbox.per = 10**6, 1.0
+
+    rng = random.Random(seed)
+    pending = itertools.islice(invocations(mix, available, rng), commands)
+    rooms = [FakeChannel(id=i) for i in range(channels)]
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    async def worker(user: int):
+        for name, args in pending:
+            ctx = context(rng.choice(rooms), user)
+            start = time.perf_counter()
+            try:
+                with tracer.span(f"command {name}", channel=ctx.channel.id):
+                    await bot.get_command(name).callback(ctx, *args)
+            except Exception:
+                errors[name] += 1
+            latencies[name].append(time.perf_counter() - start)
+
+    await api.authenticate()
+    start = time.perf_counter()
+    await asyncio.gather(*[worker(user) for user in range(concurrency)])
+    await outbox.join()
+    elapsed = time.perf_counter() - start
+    await api.close()
+    return elapsed, latencies, errors, api
+
+
+def report(
+    elapsed: float,
+    latencies: Dict[str, List[float]],
+    errors: Dict[str, int],
+    api: AsyncApi,
+    server: FakeServer,
+):
+    total = sum(len(samples) for samples in latencies.values())
+    print(
+        f"{total} commands in {elapsed:.3f}s "
+        f"({total / elapsed:.1f} commands/s)\n"
+    )
+    print(
+        f"{'command':<10}{'count':>8}{'errors':>8}"
+        f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    )
+
+    rows = dict(latencies)
+    rows["all"] = list(itertools.chain(*latencies.values()))
+    for name, samples in rows.items():
+        samples = sorted(samples)
+        failed = sum(errors.values()) if name == "all" else errors.get(name, 0)
+        print(
+            f"{name:<10}{len(samples):>8}{failed:>8}"
+            + "".join(
+                f"{percentile(samples, p) * 1000:>10.1f}" for p in (50, 95, 99)
+            )
+        )
+
+    print(f"\nAPI requests: {sum(server.requests.values())}")
+    for (method, path), count in sorted(server.requests.items()):
+        print(f"  {method:<7}{path:<12}{count:>8}")
+    if api.cache is not None:
+        print(f"Cache: {api.cache.stats}")
+    print(f"Coalescing: {api.flights.stats}")
+    print(f"Outbox: {outbox.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--commands", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--channels", type=int, default=10)
+    parser.add_argument("--mix", default="ls=4,orders=4,add=1,remove=1")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--cache-ttl", type=float, default=0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--trace", help="write the spans to this file")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.exporter = JsonlExporter(
+            args.trace, max_bytes=100_000_000, backups=1
+        )
+
+    server = FakeServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        products=args.products,
+        orders=args.orders,
+        seed=args.seed,
+    ).start()
+
+    elapsed, latencies, errors, api = asyncio.run(
+        run(
+            endpoint=server.endpoint,
+            available=server.dataset.available(),
+            commands=args.commands,
+            concurrency=args.concurrency,
+            channels=args.channels,
+            mix=parse_mix(args.mix),
+            cache_ttl=args.cache_ttl,
+            seed=args.seed,
+        )
+    )
+    server.shutdown()
+    server.server_close()
+    report(elapsed, latencies, errors, api, server)
+
+
+if __name__ == "__main__":
+    main()
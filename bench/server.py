@@ -0,0 +1,442 @@
+"""
+Local stand-in of the MiceBot API.
+
+It serves `/auth/`, `/hb/`, `/products/` and `/orders/` from an in-memory
+dataset, answering after a configurable latency and failing a configurable
+share of the requests with 503, so the bot can be exercised without the
+real server. A mutation with an `Idempotency-Key` is applied once, and its
+answer is repeated for the same key, so a share of the mutation answers can
+be lost after they are applied, as on a timeout.
+
+Usage:
+    python -m bench.server --port 8000 --latency 0.02 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import secrets
+import threading
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from micebot.api.idempotency import IDEMPOTENCY_HEADER
+
+Answer = Tuple[int, Optional[dict]]
+
+
+def flag(value: str) -> bool:
+    return value.lower() in ("1", "true", "yes")
+
+
+class Dataset:
+    def __init__(self, products: int, orders: int, seed: int = None):
+        """
+        The products and orders served by the fake API.
+
+        The first `orders` products are taken, each by one order.
+
+        Args:
+            - products: how many products are registered.
+            - orders: how many of them were already delivered.
+            - seed: the random seed, for reproducible datasets.
+        """
+        rng = random.Random(seed)
+        now = datetime.utcnow()
+        self.lock = threading.Lock()
+        self.products: Dict[str, dict] = {}
+        self.codes: Set[str] = set()
+        self.orders: List[dict] = []
+
+        for i in range(max(products, orders)):
+            created_at = now - timedelta(minutes=rng.randrange(60 * 24 * 30))
+            product = self.product(
+                code=f"code-{i:06d}",
+                summary="E-Book",
+                created_at=created_at,
+                uuid=f"{i:032x}",
+            )
+            if i < orders:
+                product["taken"] = True
+                moderator = rng.randrange(10)
+                self.orders.append(
+                    {
+                        "mod_id": str(moderator),
+                        "mod_display_name": f"moderator-{moderator}",
+                        "owner_display_name": f"viewer-{rng.randrange(1000)}",
+                        "uuid": secrets.token_hex(16),
+                        "requested_at": (
+                            created_at + timedelta(minutes=10)
+                        ).isoformat(),
+                        "product": product,
+                    }
+                )
+
+    def product(
+        self, code: str, summary: str, created_at: datetime, uuid: str = None
+    ) -> dict:
+        """
+        Register a new product.
+        """
+        product = {
+            "uuid": uuid or secrets.token_hex(16),
+            "code": code,
+            "summary": summary,
+            "taken": False,
+            "created_at": created_at.isoformat(),
+            "updated_at": created_at.isoformat(),
+        }
+        self.products[product["uuid"]] = product
+        self.codes.add(code)
+        return product
+
+    def available(self) -> List[str]:
+        """
+        The uuids of the products not taken yet.
+        """
+        with self.lock:
+            return [
+                uuid
+                for uuid, product in self.products.items()
+                if not product["taken"]
+            ]
+
+    def list_products(self, query: Dict[str, str]) -> Answer:
+        taken = flag(query.get("taken", "false"))
+        skip = int(query.get("skip", 0))
+        limit = int(query.get("limit", 0))
+
+        with self.lock:
+            products = list(self.products.values())
+
+        total = {
+            "all": len(products),
+            "taken": sum(product["taken"] for product in products),
+        }
+        total["available"] = total["all"] - total["taken"]
+
+        products = sorted(
+            (product for product in products if product["taken"] == taken),
+            key=lambda product: product["created_at"],
+            reverse=flag(query.get("desc", "true")),
+        )
+        page = products[skip : skip + limit] if limit else products[skip:]
+        if not page:
+            return 404, {"detail": "No product registered yet!"}
+        return 200, {"total": total, "products": page}
+
+    def add_product(self, body: dict) -> Answer:
+        with self.lock:
+            if body["code"] in self.codes:
+                return 409, {"detail": "Code already registered."}
+            product = self.product(
+                code=body["code"],
+                summary=body.get("summary"),
+                created_at=datetime.utcnow(),
+            )
+        return 201, product
+
+    def edit_product(self, uuid: str, body: dict) -> Answer:
+        with self.lock:
+            product = self.products.get(uuid)
+            if product is None:
+                return 404, {"detail": "Product not found."}
+            if body["code"] != product["code"] and body["code"] in self.codes:
+                return 409, {"detail": "Code already registered."}
+
+            self.codes.discard(product["code"])
+            self.codes.add(body["code"])
+            product.update(
+                code=body["code"],
+                summary=body.get("summary") or product["summary"],
+                updated_at=datetime.utcnow().isoformat(),
+            )
+        return 200, product
+
+    def delete_product(self, uuid: str) -> Answer:
+        with self.lock:
+            product = self.products.get(uuid)
+            if product is None:
+                return 404, {"detail": "Product not found."}
+            if product["taken"]:
+                return 401, {"detail": "Product already taken."}
+            del self.products[uuid]
+            self.codes.discard(product["code"])
+        return 200, {"deleted": True}
+
+    def list_orders(self, query: Dict[str, str]) -> Answer:
+        skip = int(query.get("skip", 0))
+        limit = int(query.get("limit", 0))
+
+        with self.lock:
+            orders = [
+                order
+                for order in self.orders
+                if query.get("moderator") in (None, order["mod_id"])
+                and query.get("owner") in (None, order["owner_display_name"])
+            ]
+
+        orders.sort(
+            key=lambda order: order["requested_at"],
+            reverse=flag(query.get("desc", "true")),
+        )
+        page = orders[skip : skip + limit] if limit else orders[skip:]
+        if not page:
+            return 404, {"detail": "No orders registered yet!"}
+        return 200, {"total": len(orders), "orders": page}
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        lost_rate: float = 0.0,
+        products: int = 100,
+        orders: int = 100,
+        username: str = "user",
+        password: str = "pass",
+        token_ttl: float = 900,
+        idempotency_size: int = 10000,
+        seed: int = None,
+    ):
+        """
+        The fake MiceBot API, served from threads.
+
+        Args:
+            - host: the interface to listen on.
+            - port: the port to listen on, a free one when it is zero.
+            - latency: how many seconds each answer takes, at least.
+            - jitter: the maximum random delay added to the latency.
+            - error_rate: the share of requests answered with 503.
+            - lost_rate: the share of mutations applied whose connection
+                is closed instead of answered.
+            - products: how many products the dataset starts with.
+            - orders: how many orders the dataset starts with.
+            - username: the accepted username.
+            - password: the accepted password.
+            - token_ttl: the lifetime of the issued tokens, in seconds.
+            - idempotency_size: how many idempotency keys are remembered.
+            - seed: the random seed, for reproducible runs.
+        """
+        super().__init__((host, port), Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.lost_rate = lost_rate
+        self.username = username
+        self.password = password
+        self.token_ttl = token_ttl
+        self.dataset = Dataset(products=products, orders=orders, seed=seed)
+        self.requests = Counter()
+        self.tokens: Set[str] = set()
+        self.idempotency_size = idempotency_size
+        self.answers: Dict[str, Tuple[Tuple[str, str], Answer]] = OrderedDict()
+        self.answers_lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    @property
+    def endpoint(self) -> str:
+        """
+        The URL to be used as the API endpoint.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeServer":
+        """
+        Serve from a background thread.
+        """
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def delay(self) -> Tuple[float, bool]:
+        """
+        Draw the latency of an answer and whether it fails.
+        """
+        with self.lock:
+            return (
+                self.latency + self.rng.uniform(0, self.jitter),
+                self.rng.random() < self.error_rate,
+            )
+
+    def lose(self) -> bool:
+        """
+        Draw whether the answer of a mutation is lost.
+        """
+        with self.lock:
+            return self.rng.random() < self.lost_rate
+
+    def once(
+        self, key: str, request: Tuple[str, str], apply: Callable[[], Answer]
+    ) -> Answer:
+        """
+        Apply a mutation once per idempotency key.
+
+        Returns:
+            - the answer of the first request with the key, or 422 when the
+                key was used by another request.
+        """
+        with self.answers_lock:
+            stored = self.answers.get(key)
+            if stored is None:
+                stored = self.answers[key] = (request, apply())
+                while len(self.answers) > self.idempotency_size:
+                    self.answers.popitem(last=False)
+            elif stored[0] != request:
+                return 422, {"detail": "Idempotency key already used."}
+            return stored[1]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakeServer
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.dispatch()
+
+    def do_POST(self):
+        self.dispatch()
+
+    def do_PUT(self):
+        self.dispatch()
+
+    def do_DELETE(self):
+        self.dispatch()
+
+    def dispatch(self):
+        url = urlsplit(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        query = {
+            key: values[-1] for key, values in parse_qs(url.query).items()
+        }
+        route = url.path.rstrip("/").split("/")[1:] or [""]
+
+        with self.server.lock:
+            self.server.requests[self.command, f"/{route[0]}/"] += 1
+
+        latency, fail = self.server.delay()
+        time.sleep(latency)
+
+        if fail:
+            self.answer(503, {"detail": "Service unavailable."})
+        elif route == ["auth"] and self.command == "POST":
+            self.answer(*self.authenticate(parse_qs(body.decode())))
+        elif not self.authorized():
+            self.answer(401, {"detail": "Not authenticated."})
+        elif self.command == "GET":
+            self.answer(*self.route(route, query, body))
+        else:
+            key = self.headers.get(IDEMPOTENCY_HEADER)
+            if key:
+                answer = self.server.once(
+                    key,
+                    (self.command, url.path),
+                    lambda: self.route(route, query, body),
+                )
+            else:
+                answer = self.route(route, query, body)
+            if self.server.lose():
+                # Applied, but the client never learns its outcome.
+                self.close_connection = True
+                return
+            self.answer(*answer)
+
+    def authenticate(self, form: Dict[str, List[str]]) -> Answer:
+        if form.get("username") != [self.server.username] or form.get(
+            "password"
+        ) != [self.server.password]:
+            return 401, {"detail": "Incorrect username or password."}
+
+        access_token = secrets.token_hex(32)
+        with self.server.lock:
+            self.server.tokens.add(access_token)
+        return 200, {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_in": self.server.token_ttl,
+        }
+
+    def authorized(self) -> bool:
+        scheme, _, access_token = self.headers.get(
+            "Authorization", ""
+        ).partition(" ")
+        return scheme == "Bearer" and access_token in self.server.tokens
+
+    def route(self, route: List[str], query: Dict[str, str], body: bytes):
+        dataset = self.server.dataset
+
+        if route == ["hb"] and self.command == "GET":
+            return 200, {"valid": True}
+        if route == ["orders"] and self.command == "GET":
+            return dataset.list_orders(query)
+        if route == ["products"] and self.command == "GET":
+            return dataset.list_products(query)
+        if route == ["products"] and self.command == "POST":
+            return dataset.add_product(json.loads(body))
+        if len(route) == 2 and route[0] == "products":
+            if self.command == "PUT":
+                return dataset.edit_product(route[1], json.loads(body))
+            if self.command == "DELETE":
+                return dataset.delete_product(route[1])
+        return 404, {"detail": "Not Found"}
+
+    def answer(self, status: int, content: Optional[dict]):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--lost-rate", type=float, default=0.0)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--orders", type=int, default=100)
+    parser.add_argument("--username", default="user")
+    parser.add_argument("--password", default="pass")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = FakeServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        lost_rate=args.lost_rate,
+        products=args.products,
+        orders=args.orders,
+        username=args.username,
+        password=args.password,
+        seed=args.seed,
+    )
+    print(f"Serving the fake MiceBot API on {server.endpoint}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Measure how long the bot takes to start, from the import to `on_ready`.
+
+The import time of `micebot.bot` is broken down per module with
+`python -X importtime`: the self time of every `micebot` module and the
+time of each package they import. Then the bot is started in fresh interpreters against a local
+stand-in of the MiceBot API, with the gateway login replaced by a sleep of
+`--gateway` seconds, and the median time of each startup milestone is
+reported. The numbers are meant to be tracked across releases.
+
+Usage:
+    python -m bench.startup --runs 5 --latency 0.02 --gateway 0.3
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Text, Tuple
+
+MODULE = "micebot.bot"
+
+# The name, self and cumulative microseconds, and nesting depth of each
+# import, in the order `-X importtime` reports them: children first.
+Import = Tuple[Text, int, int, int]
+
+
+def import_times(module: Text = MODULE) -> List[Import]:
+    """
+    Import a module in a fresh interpreter and parse `-X importtime`.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        own, cumulative, name = line[len("import time:") :].split("|")
+        if not own.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        times.append((name.strip(), int(own), int(cumulative), depth))
+    return times
+
+
+def breakdown(times: List[Import]) -> Dict[Text, float]:
+    """
+    Split the import time between the `micebot` modules, by their self
+    time, and the packages they import directly, by their cumulative time,
+    in milliseconds. A package imported by another package, e.g. aiohttp
+    by discord, is part of the latter.
+    """
+    parts: Dict[Text, float] = {}
+    pending: List[Import] = []
+    for name, own, cumulative, depth in times:
+        children = [child for child in pending if child[3] > depth]
+        pending = [child for child in pending if child[3] <= depth]
+        if name.startswith("micebot"):
+            parts[name] = own / 1000
+            for child in children:
+                if not child[0].startswith("micebot"):
+                    parts[child[0]] = child[2] / 1000
+        pending.append((name, own, cumulative, depth))
+    return parts
+
+
+def ready(gateway: float):
+    """
+    Start the bot as `python -m micebot` does, with the gateway login
+    replaced by a sleep, and print its milestones as JSON.
+
+    It runs in the child interpreters, so nothing but the standard library
+    is imported before the clock starts.
+    """
+    import asyncio
+
+    start = time.perf_counter()
+    from micebot.bot import on_ready, start_warm_up, startup
+
+    imported = time.perf_counter() - start
+
+    async def login():
+        start_warm_up()
+        await asyncio.sleep(gateway)
+        await on_ready()
+
+    asyncio.get_event_loop().run_until_complete(login())
+    offset = startup.started_at - start
+    phases = {"imported": imported}
+    phases.update(
+        (phase, offset + seconds) for phase, seconds in startup.phases.items()
+    )
+    print(json.dumps(phases))
+
+
+def startups(
+    endpoint: Text, runs: int, gateway: float
+) -> Dict[Text, List[float]]:
+    """
+    Start the bot in `runs` fresh interpreters.
+
+    Returns:
+        - the seconds to each milestone, by milestone.
+    """
+    environ = dict(
+        os.environ,
+        API_ENDPOINT=endpoint,
+        DISCORD_USER="user",
+        DISCORD_PASS="pass",
+        MIRROR_PATH="",
+        TRACE_FILE="",
+    )
+    phases: Dict[Text, List[float]] = defaultdict(list)
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"from bench.startup import ready; ready({gateway!r})",
+            ],
+            env=environ,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        phases["process exit"].append(time.perf_counter() - start)
+        for phase, seconds in json.loads(
+            result.stdout.splitlines()[-1]
+        ).items():
+            phases[phase].append(seconds)
+    return phases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument(
+        "--gateway",
+        type=float,
+        default=0.3,
+        help="the seconds the gateway login is assumed to take",
+    )
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print(f"Import time of {MODULE}, in ms:")
+    times = import_times()
+    total = next(item for item in times if item[0] == MODULE)[2] / 1000
+    print(f"  {'total':<32}{total:>10.1f}")
+    parts = sorted(breakdown(times).items(), key=lambda item: -item[1])
+    for name, milliseconds in parts[: args.top]:
+        print(f"  {name:<32}{milliseconds:>10.1f}")
+
+    # The stand-in is only needed by this process, not by the children.
+    from bench.server import FakeServer
+
+    server = FakeServer(latency=args.latency).start()
+    phases = startups(server.endpoint, runs=args.runs, gateway=args.gateway)
+    server.shutdown()
+    server.server_close()
+
+    print(
+        f"\nStartup milestones, median of {args.runs} runs with a "
+        f"{args.gateway * 1000:.0f} ms gateway login, in ms:"
+    )
+    for phase, seconds in sorted(
+        phases.items(), key=lambda item: statistics.median(item[1])
+    ):
+        print(f"  {phase:<32}{statistics.median(seconds) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,15 @@
-from micebot.bot import bot
+from micebot.bot import bot, mirror_sync, product_index, start_warm_up
 from micebot.model.env import env
 
+if env.metrics_port:
+    from micebot.metrics.server import serve
+
+    bot.loop.create_task(serve(host=env.metrics_host, port=env.metrics_port))
+
+if mirror_sync is not None:
+    bot.loop.create_task(mirror_sync.run())
+if product_index is not None:
+    bot.loop.create_task(product_index.run())
+
+start_warm_up(bot.loop)
 bot.run(env.discord_token)
@@ -13,13 +13,16 @@ from micebot.model.model import (
     ProductResponse,
     ProductDeleteResponse,
 )
-from micebot.api.errors import (
+from micebot.api.errors import (  # noqa: F401
+    AuthenticationFailed,
+    CircuitOpen,
     CodeAlreadyRegistered,
     UnknownNetworkError,
     ProductNotFound,
     ProductAlreadyTaken,
     OrderNotFound,
 )
+from micebot.api.client import AsyncApi  # noqa: F401
 
 
 class Api:
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import time
+from base64 import urlsafe_b64decode
+from typing import Awaitable, Callable, Optional, Text, Tuple
+
+from micebot.api.store import SharedStore
+
+Fetcher = Callable[[], Awaitable[Tuple[Optional[Text], Optional[float]]]]
+
+TOKEN_KEY = "token"
+AUTH_LEASE = "lease:auth"
+
+
+def token_expiry(access_token: Text) -> Optional[float]:
+    """
+    Read the expiration time from a JWT access token.
+
+    The signature is not verified, the claim is only used to know when the
+    token must be refreshed.
+
+    Args:
+        - access_token: the access token returned by the API.
+
+    Returns:
+        - the `exp` claim (seconds since epoch) if the token is a JWT with
+            this claim. Otherwise, `None` is returned.
+    """
+    try:
+        payload = access_token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenManager:
+    def __init__(
+        self,
+        fetch: Fetcher,
+        ttl: float = 900,
+        refresh_margin: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+        store: SharedStore = None,
+        lease: float = 10,
+        poll_interval: float = 0.05,
+    ):
+        """
+        Keep a valid access token, refreshing it before it expires.
+
+        Concurrent callers that need a new token share the same refresh,
+        so only one `/auth/` request is in flight at any time. With a
+        shared store, this also holds across the processes: the token is
+        read from the store, and only the process holding the store lease
+        requests a new one while the others wait for it.
+
+        Args:
+            - fetch: coroutine function that requests a new token. It must
+                return the token (or `None` when the credentials are
+                rejected) and, optionally, its lifetime in seconds.
+            - ttl: the lifetime assumed when the token does not carry an
+                expiration.
+            - refresh_margin: how many seconds before the expiration the
+                token is refreshed.
+            - clock: the monotonic clock, replaceable by the tests.
+            - store: the store shared with the other processes, if any.
+            - lease: how many seconds a process may take to request a
+                token for all, before another one takes over.
+            - poll_interval: how often the waiting processes check the
+                store for the new token.
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.store = store
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.access_token = None
+        self.expires_at = 0.0
+        self._refreshing: Optional[asyncio.Future] = None
+
+    def is_valid(self) -> bool:
+        """
+        Check if the current token can still be used.
+
+        Returns:
+            - `True` if there is a token and it is not about to expire.
+        """
+        return (
+            self.access_token is not None
+            and self.clock() < self.expires_at - self.refresh_margin
+        )
+
+    async def get(self) -> Optional[Text]:
+        """
+        Get a valid access token, refreshing it when needed.
+
+        Returns:
+            - the access token, or `None` if the credentials were rejected.
+        """
+        if self.is_valid():
+            return self.access_token
+        return await self.refresh()
+
+    async def refresh(self, stale: Text = None) -> Optional[Text]:
+        """
+        Request a new access token.
+
+        Args:
+            - stale: the token rejected by the API, if any. When another
+                caller already replaced it, the new token is returned
+                without a new request.
+
+        Returns:
+            - the access token, or `None` if the credentials were rejected.
+        """
+        if stale is not None and stale != self.access_token:
+            return self.access_token
+
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._refresh())
+            self._refreshing.add_done_callback(self._refreshed)
+
+        return await asyncio.shield(self._refreshing)
+
+    def invalidate(self) -> None:
+        """
+        Drop the current access token.
+        """
+        self.access_token = None
+        self.expires_at = 0.0
+
+    async def _refresh(self) -> Optional[Text]:
+        if self.store is None:
+            access_token, lifetime = await self.fetch()
+        else:
+            access_token, lifetime = await self._fetch_shared(
+                stale=self.access_token
+            )
+        self.access_token = access_token
+
+        if access_token is None:
+            self.expires_at = 0.0
+            return None
+
+        self.expires_at = self.clock() + self._lifetime(access_token, lifetime)
+        return access_token
+
+    def _lifetime(
+        self, access_token: Text, lifetime: Optional[float]
+    ) -> float:
+        if lifetime is None:
+            expiry = token_expiry(access_token)
+            lifetime = self.ttl if expiry is None else expiry - time.time()
+        return lifetime
+
+    async def _fetch_shared(
+        self, stale: Optional[Text]
+    ) -> Tuple[Optional[Text], Optional[float]]:
+        """
+        Read the token from the shared store, or request it for all the
+        processes when this one holds the lease.
+
+        Args:
+            - stale: the token being replaced, never taken from the store.
+        """
+        while True:
+            entry = self.store.get(TOKEN_KEY)
+            if entry is not None:
+                access_token = entry[0].decode()
+                lifetime = entry[1] - self.store.clock()
+                if access_token != stale and lifetime > self.refresh_margin:
+                    return access_token, lifetime
+
+            if self.store.acquire(AUTH_LEASE, ttl=self.lease):
+                try:
+                    access_token, lifetime = await self.fetch()
+                    if access_token is not None:
+                        lifetime = self._lifetime(access_token, lifetime)
+                        self.store.set(
+                            TOKEN_KEY, access_token.encode(), ttl=lifetime
+                        )
+                    return access_token, lifetime
+                finally:
+                    self.store.release(AUTH_LEASE)
+
+            await asyncio.sleep(self.poll_interval)
+
+    def _refreshed(self, future: asyncio.Future) -> None:
+        self._refreshing = None
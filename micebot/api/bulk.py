@@ -0,0 +1,80 @@
+import asyncio
+from typing import Iterable, List, Tuple
+
+from micebot.api.client import AsyncApi
+from micebot.api.errors import CodeAlreadyRegistered
+from micebot.model.model import ProductCreation
+
+
+class BulkSummary:
+    def __init__(self):
+        """
+        The live outcome of a bulk operation.
+
+        Attributes:
+            - added: how many products were added.
+            - duplicated: the codes already registered by other products.
+            - failed: the codes that could not be submitted (network or
+                unexpected errors), with the reason.
+        """
+        self.added = 0
+        self.duplicated: List[str] = []
+        self.failed: List[Tuple[str, str]] = []
+
+    @property
+    def processed(self) -> int:
+        """
+        How many products were already submitted.
+        """
+        return self.added + len(self.duplicated) + len(self.failed)
+
+
+async def bulk_add(
+    api: AsyncApi,
+    products: Iterable[ProductCreation],
+    concurrency: int = 16,
+    summary: BulkSummary = None,
+) -> BulkSummary:
+    """
+    Add many products, keeping a bounded number of requests in flight.
+
+    The products are consumed lazily, so a large import never has more
+    than a few pending items in memory. A failure never stops the import,
+    it is recorded in the summary instead.
+
+    Args:
+        - api: the API client.
+        - products: the products to be added.
+        - concurrency: the maximum number of concurrent requests.
+        - summary: the summary to be updated, so the caller can report
+            the progress while the import runs.
+
+    Returns:
+        - the summary of the import.
+    """
+    summary = BulkSummary() if summary is None else summary
+    queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def worker():
+        while True:
+            product = await queue.get()
+            try:
+                await api.add_product(product=product)
+                summary.added += 1
+            except CodeAlreadyRegistered:
+                summary.duplicated.append(product.code)
+            except Exception as e:
+                summary.failed.append((product.code, str(e)))
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+    try:
+        for product in products:
+            await queue.put(product)
+        await queue.join()
+    finally:
+        for task in workers:
+            task.cancel()
+
+    return summary
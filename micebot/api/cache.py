@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple
+
+MISSING = object()
+
+
+class CacheStats(NamedTuple):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+
+
+class TTLCache:
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Least recently used cache whose entries expire after a while.
+
+        Args:
+            - ttl: how many seconds an entry is kept.
+            - max_size: the maximum number of entries. When it is reached,
+                the least recently used entry is evicted.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    @property
+    def stats(self) -> CacheStats:
+        """
+        The counters used to tune the cache.
+        """
+        return CacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            size=len(self._entries),
+        )
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Get a cached value.
+
+        Args:
+            - key: the entry key.
+
+        Returns:
+            - the value if present and not expired. Otherwise, `MISSING`
+                is returned.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None or entry[0] <= self.clock():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any, generation: int = None):
+        """
+        Cache a value.
+
+        Args:
+            - key: the entry key.
+            - value: the value to be cached.
+            - generation: the `generation` read before the value was
+                fetched. If the cache was invalidated meanwhile, the value
+                may be stale and is not stored.
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        self._entries[key] = (self.clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: Hashable):
+        """
+        Drop an entry, if it is cached.
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Invalidate all the entries.
+        """
+        self.generation += 1
+        self._entries.clear()
@@ -0,0 +1,1001 @@
+import asyncio
+import math
+import time
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Hashable,
+    List,
+    NoReturn,
+    Optional,
+    Text,
+    Tuple,
+)
+
+from httpx import (
+    AsyncClient,
+    PoolLimits,
+    Response,
+    HTTPError,
+    NetworkError,
+    ProtocolError,
+    ConnectTimeout,
+    ReadTimeout,
+    WriteTimeout,
+    PoolTimeout,
+)
+
+from micebot.model.model import (
+    Order,
+    Product,
+    ProductCreation,
+    ProductEdit,
+    ProductDelete,
+    OrderQuery,
+    OrderWithTotal,
+    ProductQuery,
+    ProductResponse,
+    ProductDeleteResponse,
+)
+from micebot.api import decoding
+from micebot.api.auth import TokenManager
+from micebot.api.cache import MISSING, TTLCache
+from micebot.api.codec import JsonCodec, get_codec
+from micebot.api.idempotency import IDEMPOTENCY_HEADER, IdempotencyLedger
+from micebot.api.mirror import Mirror
+from micebot.api.resilience import CircuitBreaker, RetryPolicy, retry_after
+from micebot.api.singleflight import SingleFlight
+from micebot.api.store import SharedStore
+from micebot.api.errors import (
+    AuthenticationFailed,
+    CircuitOpen,
+    CodeAlreadyRegistered,
+    UnknownNetworkError,
+    ProductNotFound,
+    ProductAlreadyTaken,
+    OrderNotFound,
+)
+from micebot.metrics import metrics
+from micebot.tracing import tracer
+
+TRANSPORT_ERRORS = (
+    HTTPError,
+    NetworkError,
+    ProtocolError,
+    ConnectTimeout,
+    ReadTimeout,
+    WriteTimeout,
+    PoolTimeout,
+)
+
+REQUEST_DURATION = metrics.histogram(
+    "micebot_api_request_duration_seconds",
+    "Latency of the API requests, retries included as separate requests.",
+    labels=("method", "endpoint"),
+)
+RESPONSES = metrics.counter(
+    "micebot_api_responses_total",
+    "API responses by status code, or `error` when the API was not reached.",
+    labels=("method", "endpoint", "status"),
+)
+RECEIVED_BYTES = metrics.counter(
+    "micebot_api_received_bytes_total",
+    "Bytes received from the API.",
+    labels=("method", "endpoint"),
+)
+REJECTED = metrics.counter(
+    "micebot_api_rejected_total",
+    "Requests not sent because the circuit breaker was open.",
+    labels=("method", "endpoint"),
+)
+
+
+def endpoint_of(path: str) -> str:
+    """
+    The endpoint of a request path, used as a metric label.
+
+    The resource identifiers are replaced, so `/products/<uuid>` is a single
+    endpoint instead of one per product.
+    """
+    resource, _, identifier = path.strip("/").partition("/")
+    return f"/{resource}/{{uuid}}" if identifier else f"/{resource}/"
+
+
+class AsyncApi:
+    def __init__(
+        self,
+        endpoint: str,
+        username: str,
+        password: str,
+        max_connections: int = 100,
+        max_keepalive: int = 10,
+        timeout: float = 5.0,
+        token_ttl: float = 900,
+        token_refresh_margin: float = 60,
+        cache_ttl: float = 0,
+        cache_size: int = 128,
+        retry_policy: RetryPolicy = None,
+        circuit_breaker: CircuitBreaker = None,
+        mirror: Mirror = None,
+        trust_responses: bool = False,
+        codec: JsonCodec = None,
+        store: SharedStore = None,
+        idempotency: IdempotencyLedger = None,
+        transport=None,
+    ):
+        """
+        Init the non-blocking API client.
+
+        All the requests share a single `AsyncClient`, so the TCP/TLS
+        connections are kept alive and reused between commands. It is only
+        built on the first request, which keeps its TLS setup out of the
+        bot startup.
+
+        Args:
+            - endpoint: the API endpoint.
+            - username: the client username for authorization.
+            - password: the client password for authorization.
+            - max_connections: the maximum number of open connections.
+            - max_keepalive: the maximum number of idle connections kept
+                alive in the pool.
+            - timeout: the timeout (in seconds) for the network operations.
+            - token_ttl: the token lifetime (in seconds) assumed when the
+                API does not inform its expiration.
+            - token_refresh_margin: how many seconds before the expiration
+                the token is refreshed.
+            - cache_ttl: how many seconds a listing is cached. The cache is
+                disabled when it is zero.
+            - cache_size: the maximum number of cached listings.
+            - retry_policy: the backoff for the idempotent requests.
+            - circuit_breaker: the breaker shared by all the requests.
+            - mirror: the local copy that answers the listings once it is
+                ready, kept in sync by a `MirrorSync`.
+            - trust_responses: if the listings are decoded without
+                validation, which is several times faster on large pages.
+                The responses of the mutations are always validated.
+            - codec: the JSON codec of the responses, the fastest one
+                installed by default.
+            - store: the store shared with the other worker processes. The
+                access token and, when the cache is enabled, the listings
+                are shared through it.
+            - idempotency: the keys of the mutations whose outcome is
+                unknown, reused when they are sent again.
+            - transport: an optional transport, mainly used by the tests.
+        """
+        self.endpoint = endpoint
+        self.username = username
+        self.password = password
+        self.tokens = TokenManager(
+            self._fetch_token,
+            ttl=token_ttl,
+            refresh_margin=token_refresh_margin,
+            store=store,
+        )
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.cache = (
+            TTLCache(ttl=cache_ttl, max_size=cache_size) if cache_ttl else None
+        )
+        self.flights = SingleFlight()
+        self.mirror = mirror
+        self.trust_responses = trust_responses
+        self.codec = codec or get_codec()
+        self.store = store
+        self._store_generation = None
+        self.idempotency = idempotency or IdempotencyLedger()
+        self.listeners: List[Callable[[Text, Any], None]] = []
+        self._client_options = dict(
+            base_url=endpoint,
+            pool_limits=PoolLimits(
+                max_keepalive=max_keepalive, max_connections=max_connections
+            ),
+            timeout=timeout,
+            transport=transport,
+        )
+        self._client: Optional[AsyncClient] = None
+
+    @property
+    def client(self) -> AsyncClient:
+        """
+        The pooled client, built on first use.
+        """
+        if self._client is None:
+            self._client = AsyncClient(**self._client_options)
+        return self._client
+
+    async def close(self) -> NoReturn:
+        """
+        Close the connection pool, if it was ever opened.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        access_token: Text = None,
+        idempotent: bool = False,
+        **kwargs,
+    ) -> Response:
+        """
+        Send a request through the pooled client.
+
+        Transport errors and 5xx answers count as failures for the circuit
+        breaker. Idempotent requests are retried on those failures and on
+        429, following the retry policy and the `Retry-After` header. Every
+        attempt is measured, by method and endpoint, and traced as a span.
+
+        Args:
+            - method: the HTTP method.
+            - path: the path, relative to the API endpoint.
+            - access_token: the bearer token, if the request needs one.
+            - idempotent: if the request can be safely retried.
+            - kwargs: the extra arguments for `AsyncClient.request`.
+
+        Raises:
+            CircuitOpen: when the circuit breaker is open.
+            UnknownNetworkError: when the API cannot be reached.
+
+        Returns:
+            - the API response.
+        """
+        if access_token:
+            kwargs["headers"] = dict(
+                kwargs.get("headers") or {},
+                Authorization=f"Bearer {access_token}",
+            )
+
+        endpoint = endpoint_of(path)
+        attempt = 0
+        while True:
+            if not self.circuit_breaker.allow():
+                REJECTED.inc(method=method, endpoint=endpoint)
+                raise CircuitOpen(
+                    f"The API is unavailable, {method} {path} was not sent."
+                )
+
+            span = tracer.start(
+                f"api {method} {endpoint}", path=path, attempt=attempt
+            )
+            start = time.perf_counter()
+            try:
+                response = await self.client.request(method, path, **kwargs)
+            except TRANSPORT_ERRORS as e:
+                tracer.finish(span, error=e)
+                REQUEST_DURATION.observe(
+                    time.perf_counter() - start,
+                    method=method,
+                    endpoint=endpoint,
+                )
+                RESPONSES.inc(method=method, endpoint=endpoint, status="error")
+                self.circuit_breaker.record_failure()
+                if not (
+                    idempotent and self.retry_policy.should_retry(attempt)
+                ):
+                    raise UnknownNetworkError(
+                        f"Failed to reach the API, network error: "
+                        f"({method} {path} - {e!r})."
+                    ) from e
+                wait = None
+            except BaseException as e:
+                tracer.finish(span, error=e)
+                raise
+            else:
+                REQUEST_DURATION.observe(
+                    time.perf_counter() - start,
+                    method=method,
+                    endpoint=endpoint,
+                )
+                RESPONSES.inc(
+                    method=method,
+                    endpoint=endpoint,
+                    status=response.status_code,
+                )
+                RECEIVED_BYTES.inc(
+                    len(response.content), method=method, endpoint=endpoint
+                )
+                span.set(
+                    status=response.status_code, bytes=len(response.content)
+                )
+                tracer.finish(span)
+
+                if response.status_code >= 500:
+                    self.circuit_breaker.record_failure()
+                else:
+                    self.circuit_breaker.record_success()
+
+                if not (
+                    idempotent
+                    and (
+                        response.status_code >= 500
+                        or response.status_code == 429
+                    )
+                    and self.retry_policy.should_retry(attempt)
+                ):
+                    return response
+                wait = retry_after(response.headers.get("Retry-After"))
+
+            await asyncio.sleep(self.retry_policy.backoff(attempt, wait))
+            attempt += 1
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        retry_unauthorized: bool = True,
+        **kwargs,
+    ) -> Response:
+        """
+        Send an authorized request.
+
+        The token is only refreshed when it is about to expire or when the
+        API answers 401, in which case the request is sent once more with
+        a new token. A second 401 is returned to the caller.
+
+        Args:
+            - method: the HTTP method.
+            - path: the path, relative to the API endpoint.
+            - retry_unauthorized: if a 401 always means a rejected token.
+                When `False`, e.g. for the endpoints that answer 401 for a
+                business rule, the request is only sent again if the token
+                expired meanwhile.
+            - kwargs: the extra arguments for `AsyncClient.request`.
+
+        Raises:
+            AuthenticationFailed: when the API rejects the credentials.
+            UnknownNetworkError: when the API cannot be reached.
+
+        Returns:
+            - the API response.
+        """
+        access_token = await self.tokens.get()
+        if access_token is None:
+            raise AuthenticationFailed("The API rejected the credentials.")
+
+        response = await self._send(method, path, access_token, **kwargs)
+
+        if response.status_code == 401 and (
+            retry_unauthorized or not self.tokens.is_valid()
+        ):
+            access_token = await self.tokens.refresh(stale=access_token)
+            if access_token is None:
+                raise AuthenticationFailed("The API rejected the credentials.")
+            response = await self._send(method, path, access_token, **kwargs)
+
+        return response
+
+    async def _mutate(self, method: str, path: str, **kwargs) -> Response:
+        """
+        Send a mutation with an idempotency key, so it can be retried.
+
+        The key is kept while the outcome is unknown, i.e. until the API
+        answers with anything but a server error, so sending the same
+        mutation again resolves to the outcome of the first attempt.
+
+        Args:
+            - method: the HTTP method.
+            - path: the path, relative to the API endpoint.
+            - kwargs: the extra arguments for `AsyncClient.request`.
+
+        Raises:
+            AuthenticationFailed: when the API rejects the credentials.
+            UnknownNetworkError: when the API cannot be reached.
+
+        Returns:
+            - the API response.
+        """
+        request = self.idempotency.request(method, path, kwargs.get("json"))
+        response = await self._request(
+            method,
+            path,
+            idempotent=True,
+            headers={IDEMPOTENCY_HEADER: self.idempotency.key_for(request)},
+            **kwargs,
+        )
+        if response.status_code < 500:
+            self.idempotency.resolve(request)
+        return response
+
+    async def _fetch_token(self) -> Tuple[Optional[Text], Optional[float]]:
+        """
+        Request a new access token.
+
+        Raises:
+            ValueError: when the access token is not present on response.
+
+        Returns:
+            - the access token (`None` when the credentials are rejected)
+                and its lifetime in seconds, if informed by the API.
+        """
+        response = await self._send(
+            "POST",
+            "/auth/",
+            data={"username": self.username, "password": self.password},
+        )
+
+        if response.status_code == 401:
+            return None, None
+
+        content = self.codec.loads(response.content)
+        access_token = content.get("access_token")
+        if not access_token:
+            raise ValueError(
+                "The access_token key is not present "
+                "on Authorization response."
+            )
+
+        return access_token, content.get("expires_in")
+
+    def get_access_token(self) -> Optional[Text]:
+        """
+        Get the access token.
+
+        Returns:
+            - the access token if present. Otherwise, `None`is returned.
+        """
+        return self.tokens.access_token
+
+    async def authenticate(self) -> bool:
+        """
+        Authenticate the client.
+
+        Returns:
+            - `True` if the client was authenticated, otherwise `False`.
+        """
+        return await self.tokens.refresh() is not None
+
+    async def heartbeat(self) -> bool:
+        """
+        Check if the application "session" is valid.
+
+        Returns:
+            - the specific heartbeat response associate to request.
+        """
+        access_token = self.get_access_token()
+
+        if not access_token:
+            return False
+
+        response = await self._send(
+            "GET", "/hb/", access_token, idempotent=True
+        )
+
+        if response.status_code == 401:
+            return False
+
+        return bool(self.codec.loads(response.content).get("valid"))
+
+    async def _cached(
+        self,
+        key: Hashable,
+        fetch: Callable[[], Awaitable],
+        decode: Callable[[Any], Any],
+    ):
+        """
+        Read-through access to the list cache.
+
+        On a cache miss, concurrent calls with the same key share a single
+        request, even when the cache is disabled. With a shared store, the
+        misses are looked up there before reaching the API, and the local
+        cache is dropped once another process invalidates the store.
+
+        Args:
+            - key: the cache key, built from the full query.
+            - fetch: coroutine function that requests the value to the API.
+            - decode: builds the value from its JSON in the shared store.
+
+        Returns:
+            - the cached value, or the fetched one on a cache miss.
+        """
+        if self.cache is None:
+            return await self.flights.do(key, fetch)
+
+        if self.store is not None:
+            generation = self.store.generation()
+            if generation not in (None, self._store_generation):
+                self.flights.forget()
+                self.cache.clear()
+                self._store_generation = generation
+
+        value = self.cache.get(key)
+        if value is not MISSING:
+            return value
+
+        async def load():
+            generation = self.cache.generation
+            if self.store is None:
+                value = await fetch()
+            else:
+                value = await self._shared(repr(key), fetch, decode)
+            self.cache.set(key, value, generation=generation)
+            return value
+
+        return await self.flights.do(key, load)
+
+    async def _shared(
+        self,
+        key: Text,
+        fetch: Callable[[], Awaitable],
+        decode: Callable[[Any], Any],
+    ):
+        """
+        Read a listing from the shared store, or fetch and share it.
+        """
+        data = self.store.get_cached(key)
+        if data is not None:
+            return decode(self.codec.loads(data))
+
+        generation = self.store.generation()
+        value = await fetch()
+        if generation is not None:
+            self.store.set_cached(
+                key, value.json().encode(), self.cache.ttl, generation
+            )
+        return value
+
+    def _mutated(self, action: Text, value: Any) -> NoReturn:
+        """
+        Invalidate the cached listings and notify the listeners after a
+        successful mutation.
+
+        Args:
+            - action: `add`, `edit` or `delete`.
+            - value: the returned product, or the uuid of the removed one.
+        """
+        self._invalidate()
+        for listener in self.listeners:
+            listener(action, value)
+
+    def _invalidate(self) -> NoReturn:
+        """
+        Drop the cached listings after a successful mutation.
+
+        The listings in flight may predate the mutation, so the next calls
+        do not join them.
+        """
+        self.flights.forget()
+        if self.cache is not None:
+            self.cache.clear()
+        if self.store is not None:
+            self.store.clear_cached()
+
+    async def add_product(self, product: ProductCreation) -> Optional[Product]:
+        """
+        Add a new product.
+
+        Args:
+            - product: the required values for product creation.
+
+        Raises:
+            CodeAlreadyRegistered: when the code used to register the
+                product is already in use by another persisted product.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the API response for a creation operation.
+        """
+        response = await self._mutate(
+            "POST",
+            "/products/",
+            json={"code": product.code, "summary": product.summary},
+        )
+
+        if response.status_code == 409:
+            raise CodeAlreadyRegistered(
+                f"{product.code} is already in use by another product."
+            )
+
+        if response.status_code != 201:
+            raise UnknownNetworkError(
+                f"Failed to add a product, network error: "
+                f"(status: {response.status_code} - data: {response.content})."
+            )
+        product = Product(**self.codec.loads(response.content))
+        self._mutated("add", product)
+        return product
+
+    async def edit_product(self, product: ProductEdit) -> Optional[Product]:
+        """
+        Edit an existent product.
+
+        Args:
+            - product: the parameters for edit a product.
+
+        Raises:
+            ProductNotFound: when no product was found for the uuid provided.
+            CodeAlreadyRegistered: when the code used to register the
+                product is already in use by another persisted product.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the API response for an edit operation.
+        """
+        response = await self._mutate(
+            "PUT",
+            f"/products/{product.uuid}",
+            json={"code": product.code, "summary": product.summary},
+        )
+
+        if response.status_code == 404:
+            raise ProductNotFound(
+                f"Product with uuid {product.uuid} not found."
+            )
+
+        if response.status_code == 409:
+            raise CodeAlreadyRegistered(
+                f"{product.code} is already in use by another product."
+            )
+
+        if response.status_code != 200:
+            raise UnknownNetworkError(
+                f"Failed to edit a product, network error: "
+                f"(status: {response.status_code} - data: {response.content})."
+            )
+        updated = Product(**self.codec.loads(response.content))
+        self._mutated("edit", updated)
+        return updated
+
+    async def delete_product(
+        self, product: ProductDelete
+    ) -> ProductDeleteResponse:
+        """
+        Delete an existent product.
+
+        Args:
+            - product: the parameters for remove a product.
+
+        Raises:
+            ProductNotFound: when no product was found for the uuid provided.
+            ProductAlreadyTaken: when the product is already taken.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the API response from a delete operation.
+        """
+        # The API answers 401 for a taken product, not for the token.
+        response = await self._mutate(
+            "DELETE", f"/products/{product.uuid}", retry_unauthorized=False
+        )
+
+        if response.status_code == 404:
+            raise ProductNotFound(
+                f"Product with uuid {product.uuid} not found."
+            )
+
+        if response.status_code == 401:
+            raise ProductAlreadyTaken(
+                f"Cannot delete the product {product.uuid}, "
+                f"because it is already taken."
+            )
+
+        if response.status_code != 200:
+            raise UnknownNetworkError(
+                f"Failed to remove a product, network error: "
+                f"(status: {response.status_code} - data: {response.content})."
+            )
+
+        self._mutated("delete", product.uuid)
+        return ProductDeleteResponse(**self.codec.loads(response.content))
+
+    async def list_products(self, query: ProductQuery) -> ProductResponse:
+        """
+        List the registered products.
+
+        The response is served from the mirror once it is ready, or from
+        the cache while it is fresh, and concurrent calls with an equal
+        query share a single request.
+
+        Args:
+            - query: the query parameters for list products.
+
+        Raises:
+            ProductNotFound: when there is no product registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the products available for the query parameters provided.
+        """
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.list_products(query)
+        return await self._cached(
+            ("products", tuple(query.dict().items())),
+            lambda: self.fetch_products(query),
+            decoding.product_response,
+        )
+
+    async def fetch_products(self, query: ProductQuery) -> ProductResponse:
+        """
+        Request the products to the API, bypassing the mirror and the cache.
+
+        Args:
+            - query: the query parameters for list products.
+
+        Raises:
+            ProductNotFound: when there is no product registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the products available for the query parameters provided.
+        """
+        response = await self._request(
+            "GET",
+            "/products/",
+            idempotent=True,
+            params={
+                "taken": query.taken,
+                "desc": query.desc,
+                "skip": query.skip,
+                "limit": query.limit,
+            },
+        )
+
+        if response.status_code == 404:
+            raise ProductNotFound("No product registered yet!")
+
+        if response.status_code != 200:
+            raise UnknownNetworkError(
+                f"Failed to list the products, network error: "
+                f"(status: {response.status_code} - data: {response.content})."
+            )
+        with tracer.span("parse ProductResponse"):
+            data = self.codec.loads(response.content)
+            if self.trust_responses:
+                return decoding.product_response(data)
+            return ProductResponse(**data)
+
+    async def list_orders(
+        self, query: OrderQuery = OrderQuery()
+    ) -> OrderWithTotal:
+        """
+        List the registered orders.
+
+        The response is served from the mirror once it is ready, or from
+        the cache while it is fresh, and concurrent calls with an equal
+        query share a single request.
+
+        Args:
+            - query: the query parameters for list orders.
+
+        Raises:
+            OrderNotFound: when there is no orders registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the available orders for the query parameters provided.
+        """
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.list_orders(query)
+        return await self._cached(
+            ("orders", tuple(query.dict().items())),
+            lambda: self.fetch_orders(query),
+            decoding.orders_with_total,
+        )
+
+    async def fetch_orders(self, query: OrderQuery) -> OrderWithTotal:
+        """
+        Request the orders to the API, bypassing the mirror and the cache.
+
+        Args:
+            - query: the query parameters for list orders.
+
+        Raises:
+            OrderNotFound: when there is no orders registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the orders for the query parameters provided.
+        """
+        response = await self._request(
+            "GET",
+            "/orders/",
+            idempotent=True,
+            params={
+                "moderator": query.moderator,
+                "owner": query.owner,
+                "skip": query.skip,
+                "limit": query.limit,
+                "desc": query.desc,
+            },
+        )
+
+        if response.status_code == 404:
+            raise OrderNotFound("No orders registered yet!")
+
+        if response.status_code != 200:
+            raise UnknownNetworkError(
+                f"Failed to list the orders, network error: "
+                f"(status: {response.status_code} - data: {response.content})."
+            )
+
+        with tracer.span("parse OrderWithTotal"):
+            data = self.codec.loads(response.content)
+            if self.trust_responses:
+                return decoding.orders_with_total(data)
+            return OrderWithTotal(**data)
+
+    async def find_product(self, code: Text) -> Optional[Product]:
+        """
+        Look a product up by its code.
+
+        The mirror answers once it is ready. Otherwise, the listings are
+        read page by page until the product is found.
+
+        Args:
+            - code: the product code.
+
+        Raises:
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - the product, or `None` if no product has this code.
+        """
+        if self.mirror is not None and self.mirror.ready:
+            return self.mirror.find_product(code)
+
+        for taken in (False, True):
+            try:
+                async for product in self.iter_products(
+                    ProductQuery(taken=taken)
+                ):
+                    if product.code == code:
+                        return product
+            except ProductNotFound:
+                continue
+        return None
+
+    def iter_products(
+        self, query: ProductQuery = ProductQuery(), page_size: int = 100
+    ) -> AsyncIterator[Product]:
+        """
+        Iterate over the products, page by page.
+
+        The pages are requested lazily and the next one is prefetched while
+        the current one is consumed. The listing cache is bypassed.
+
+        Args:
+            - query: the query parameters for list products. A `limit`
+                greater than zero caps the number of products yielded.
+            - page_size: how many products are requested at once.
+
+        Raises:
+            ProductNotFound: when there is no product registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+            ValueError: when the page size is not greater than zero.
+
+        Returns:
+            - an async iterator over the products.
+        """
+        return self._paginate(
+            fetch=self.fetch_products,
+            query=query,
+            page_size=page_size,
+            records=lambda page: page.products,
+            total=lambda page: (
+                page.total.taken if query.taken else page.total.available
+            ),
+            not_found=ProductNotFound,
+        )
+
+    def iter_orders(
+        self, query: OrderQuery = OrderQuery(), page_size: int = 100
+    ) -> AsyncIterator[Order]:
+        """
+        Iterate over the orders, page by page.
+
+        The pages are requested lazily and the next one is prefetched while
+        the current one is consumed. The listing cache is bypassed.
+
+        Args:
+            - query: the query parameters for list orders. A `limit`
+                greater than zero caps the number of orders yielded.
+            - page_size: how many orders are requested at once.
+
+        Raises:
+            OrderNotFound: when there is no orders registed yet.
+            UnknownNetworkError: when any unknown network error happens.
+            ValueError: when the page size is not greater than zero.
+
+        Returns:
+            - an async iterator over the orders.
+        """
+        return self._paginate(
+            fetch=self.fetch_orders,
+            query=query,
+            page_size=page_size,
+            records=lambda page: page.orders,
+            total=lambda page: page.total,
+            not_found=OrderNotFound,
+        )
+
+    def _paginate(
+        self,
+        fetch: Callable[[Any], Awaitable],
+        query: Any,
+        page_size: int,
+        records: Callable[[Any], List],
+        total: Callable[[Any], int],
+        not_found: type,
+    ) -> AsyncIterator:
+        """
+        Yield the records of a paginated listing, prefetching the next page.
+
+        The iteration stops at the listing total, at the query limit, at a
+        short page or when the API answers 404 for a next page.
+
+        Raises:
+            ValueError: when the page size is not greater than zero, as the
+                API answers everything for a zero limit.
+        """
+        if page_size <= 0:
+            raise ValueError(
+                f"The page size must be greater than zero, not {page_size}."
+            )
+        return self._pages(fetch, query, page_size, records, total, not_found)
+
+    async def _pages(
+        self,
+        fetch: Callable[[Any], Awaitable],
+        query: Any,
+        page_size: int,
+        records: Callable[[Any], List],
+        total: Callable[[Any], int],
+        not_found: type,
+    ) -> AsyncIterator:
+        skip = query.skip
+        remaining = query.limit or math.inf
+        size, page = self._request_page(
+            fetch, query, skip, page_size, remaining
+        )
+        page = await page
+
+        while True:
+            items = records(page)[:size]
+            skip += len(items)
+            remaining -= len(items)
+
+            prefetch = None
+            if len(items) == size and skip < total(page) and remaining > 0:
+                size, prefetch = self._request_page(
+                    fetch, query, skip, page_size, remaining
+                )
+
+            try:
+                for item in items:
+                    yield item
+            except BaseException:
+                if prefetch is not None:
+                    prefetch.cancel()
+                raise
+
+            if prefetch is None:
+                return
+
+            try:
+                page = await prefetch
+            except not_found:
+                return
+
+    @staticmethod
+    def _request_page(
+        fetch: Callable[[Any], Awaitable],
+        query: Any,
+        skip: int,
+        page_size: int,
+        remaining: float,
+    ) -> Tuple[int, "asyncio.Future"]:
+        """
+        Start requesting the page at `skip`, at most `remaining` records.
+
+        Returns:
+            - the requested page size and the future of the page.
+        """
+        size = min(page_size, remaining)
+        return (
+            size,
+            asyncio.ensure_future(
+                fetch(query.copy(update={"skip": skip, "limit": size}))
+            ),
+        )
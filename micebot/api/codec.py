@@ -0,0 +1,51 @@
+"""
+The JSON codecs used to decode the API responses.
+
+The standard library is always available. orjson, when installed, parses
+several times faster and straight from the response bytes, while
+`json.loads` decodes the bytes into an intermediate `str` first.
+"""
+import json
+from typing import Any, Callable, Dict, NamedTuple, Text
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class JsonCodec(NamedTuple):
+    name: Text
+    loads: Callable[[bytes], Any]
+
+
+STDLIB = JsonCodec("json", json.loads)
+CODECS: Dict[Text, JsonCodec] = {STDLIB.name: STDLIB}
+if orjson is not None:
+    CODECS["orjson"] = JsonCodec("orjson", orjson.loads)
+
+AUTO = "auto"
+
+
+def get_codec(name: Text = AUTO) -> JsonCodec:
+    """
+    Pick a JSON codec by name.
+
+    Args:
+        - name: `json`, `orjson`, or `auto` for the fastest one installed.
+
+    Raises:
+        ValueError: when the codec is unknown or not installed.
+
+    Returns:
+        - the codec.
+    """
+    if name == AUTO:
+        return CODECS.get("orjson", STDLIB)
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"The JSON codec {name!r} is not available, "
+            f"choose one of {', '.join([AUTO, *CODECS])}."
+        ) from None
@@ -16,3 +16,11 @@ class ProductAlreadyTaken(Exception):
 
 class OrderNotFound(Exception):
     """When the query for a order returns 404."""
+
+
+class AuthenticationFailed(UnknownNetworkError):
+    """When the API rejects the client credentials."""
+
+
+class CircuitOpen(UnknownNetworkError):
+    """When the API is considered down and the request is not sent."""
@@ -0,0 +1,64 @@
+"""
+Idempotency keys for the mutations.
+
+Each mutation carries a client-generated key in the `Idempotency-Key`
+header, and the API answers a repeated key with the outcome of the first
+request instead of applying the mutation again. So a mutation can be
+retried when its outcome is unknown, e.g. after a timeout, without a
+misleading `CodeAlreadyRegistered` for a product that was stored.
+"""
+import json
+import time
+import uuid
+from typing import Any, Callable, Hashable, Optional, Text
+
+from micebot.api.cache import MISSING, TTLCache
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+class IdempotencyLedger:
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_size: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        The keys of the mutations whose outcome is still unknown.
+
+        A mutation sent again while its outcome is unknown, by a retry or
+        by the user, reuses the key, so the API resolves it to the outcome
+        of the first attempt. Once an answer is received, the key is
+        dropped, and a later equal mutation is a new one.
+
+        Args:
+            - ttl: how many seconds a key is kept, at most as long as the
+                API remembers the keys.
+            - max_size: the maximum number of keys kept.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.keys = TTLCache(ttl=ttl, max_size=max_size, clock=clock)
+
+    @staticmethod
+    def request(method: Text, path: Text, body: Optional[Any]) -> Hashable:
+        """
+        The identity of a mutation, its method, path and body.
+        """
+        return method, path, json.dumps(body, sort_keys=True)
+
+    def key_for(self, request: Hashable) -> Text:
+        """
+        The key of a mutation, reused while its outcome is unknown.
+        """
+        key = self.keys.get(request)
+        if key is MISSING:
+            key = uuid.uuid4().hex
+            self.keys.set(request, key)
+        return key
+
+    def resolve(self, request: Hashable):
+        """
+        Drop the key of a mutation, once the API answered it.
+        """
+        self.keys.discard(request)
@@ -0,0 +1,492 @@
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import (
+    Any,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Text,
+    Tuple,
+)
+
+from micebot.api.errors import OrderNotFound, ProductNotFound
+from micebot.model.model import (
+    Order,
+    OrderQuery,
+    OrderWithTotal,
+    Product,
+    ProductQuery,
+    ProductResponse,
+    ProductTotal,
+)
+from micebot.tracing import tracer
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    uuid TEXT PRIMARY KEY,
+    code TEXT NOT NULL,
+    summary TEXT,
+    taken INTEGER NOT NULL,
+    created_at TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS products_listing
+    ON products (taken, created_at);
+CREATE INDEX IF NOT EXISTS products_code ON products (code);
+CREATE TABLE IF NOT EXISTS orders (
+    uuid TEXT PRIMARY KEY,
+    mod_id TEXT NOT NULL,
+    mod_display_name TEXT NOT NULL,
+    owner_display_name TEXT NOT NULL,
+    requested_at TEXT NOT NULL,
+    product_uuid TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS orders_listing ON orders (requested_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+PRODUCT_COLUMNS = "uuid, code, summary, taken, created_at, updated_at"
+
+logger = logging.getLogger(__name__)
+
+
+def timestamp(value: Optional[datetime]) -> Optional[Text]:
+    return None if value is None else value.isoformat()
+
+
+def page(skip: int, limit: int) -> Text:
+    return f"LIMIT {int(limit) if limit else -1} OFFSET {int(skip)}"
+
+
+class Mirror:
+    def __init__(self, path: Text):
+        """
+        Local SQLite copy of the products and orders.
+
+        The mirror answers the listings the same way the API does, but in
+        a fraction of a millisecond. It is only used once `ready`, i.e.
+        after it was synchronized by this process.
+
+        Args:
+            - path: the database file, or `:memory:`.
+        """
+        self.path = path
+        self.ready = False
+        # A `sqlite3.Connection` once opened, sqlite3 is imported then.
+        self.db: Optional[Any] = None
+        self._totals: Optional[ProductTotal] = None
+
+    def open(self):
+        """
+        Connect to the database, creating the tables if needed.
+        """
+        if self.db is None:
+            import sqlite3
+
+            self.db = sqlite3.connect(self.path, isolation_level=None)
+            self.db.executescript(SCHEMA)
+
+    def close(self):
+        """
+        Close the database.
+        """
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+            self.ready = False
+
+    def get_meta(self, key: Text) -> Optional[Text]:
+        row = self.db.execute(
+            "SELECT value FROM meta WHERE key = ?", (key,)
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def set_meta(self, key: Text, value: Any):
+        self.db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, None if value is None else str(value)),
+        )
+
+    def save_products(self, products: Iterable[Product]):
+        """
+        Insert or update products.
+        """
+        self._totals = None
+        self.db.executemany(
+            f"INSERT OR REPLACE INTO products ({PRODUCT_COLUMNS}) "
+            f"VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    product.uuid,
+                    product.code,
+                    product.summary,
+                    int(product.taken),
+                    timestamp(product.created_at),
+                    timestamp(product.updated_at),
+                )
+                for product in products
+            ],
+        )
+
+    def save_orders(self, orders: Iterable[Order]):
+        """
+        Insert or update orders, along with their (taken) products.
+        """
+        orders = list(orders)
+        self.save_products(order.product for order in orders)
+        self.db.executemany(
+            "INSERT OR REPLACE INTO orders (uuid, mod_id, mod_display_name, "
+            "owner_display_name, requested_at, product_uuid) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    order.uuid,
+                    order.mod_id,
+                    order.mod_display_name,
+                    order.owner_display_name,
+                    timestamp(order.requested_at),
+                    order.product.uuid,
+                )
+                for order in orders
+            ],
+        )
+
+    def delete_product(self, uuid: Text):
+        """
+        Remove a product.
+        """
+        self._totals = None
+        self.db.execute("DELETE FROM products WHERE uuid = ?", (uuid,))
+
+    def replace(self, products: List[Product], orders: List[Order]):
+        """
+        Replace the whole content, in a single transaction.
+        """
+        self._totals = None
+        with self.db:
+            self.db.execute("BEGIN")
+            self.db.execute("DELETE FROM products")
+            self.db.execute("DELETE FROM orders")
+            self.save_products(products)
+            self.save_orders(orders)
+
+    def totals(self) -> ProductTotal:
+        """
+        Count the products, as in the API listing.
+
+        The count is kept until the next write, so the listings do not scan
+        the whole table.
+        """
+        if self._totals is None:
+            count, taken = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(taken), 0) FROM products"
+            ).fetchone()
+            self._totals = ProductTotal(
+                all=count, taken=taken, available=count - taken
+            )
+        return self._totals
+
+    def count_orders(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
+
+    def list_products(self, query: ProductQuery) -> ProductResponse:
+        """
+        List the products, as `AsyncApi.list_products` does.
+
+        Raises:
+            ProductNotFound: when the page is empty.
+        """
+        rows = self.db.execute(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE taken = ? "
+            f"ORDER BY created_at {'DESC' if query.desc else 'ASC'} "
+            f"{page(query.skip, query.limit)}",
+            (int(query.taken),),
+        ).fetchall()
+
+        if not rows:
+            raise ProductNotFound("No product registered yet!")
+        return ProductResponse(
+            total=self.totals(), products=[self._product(row) for row in rows]
+        )
+
+    def list_orders(self, query: OrderQuery) -> OrderWithTotal:
+        """
+        List the orders, as `AsyncApi.list_orders` does.
+
+        Raises:
+            OrderNotFound: when the page is empty.
+        """
+        conditions, params = ["1"], []
+        if query.moderator is not None:
+            conditions.append("o.mod_id = ?")
+            params.append(query.moderator)
+        if query.owner is not None:
+            conditions.append("o.owner_display_name = ?")
+            params.append(query.owner)
+        where = " AND ".join(conditions)
+
+        total = self.db.execute(
+            f"SELECT COUNT(*) FROM orders o WHERE {where}", params
+        ).fetchone()[0]
+        rows = self.db.execute(
+            f"SELECT o.uuid, o.mod_id, o.mod_display_name, "
+            f"o.owner_display_name, o.requested_at, "
+            f"p.uuid, p.code, p.summary, p.taken, p.created_at, "
+            f"p.updated_at "
+            f"FROM orders o JOIN products p ON p.uuid = o.product_uuid "
+            f"WHERE {where} "
+            f"ORDER BY o.requested_at {'DESC' if query.desc else 'ASC'} "
+            f"{page(query.skip, query.limit)}",
+            params,
+        ).fetchall()
+
+        if not rows:
+            raise OrderNotFound("No orders registered yet!")
+        return OrderWithTotal(
+            total=total,
+            orders=[
+                Order(
+                    uuid=row[0],
+                    mod_id=row[1],
+                    mod_display_name=row[2],
+                    owner_display_name=row[3],
+                    requested_at=row[4],
+                    product=self._product(row[5:]),
+                )
+                for row in rows
+            ],
+        )
+
+    def find_product(self, code: Text) -> Optional[Product]:
+        """
+        Look a product up by its code.
+        """
+        row = self.db.execute(
+            f"SELECT {PRODUCT_COLUMNS} FROM products WHERE code = ?", (code,)
+        ).fetchone()
+        return None if row is None else self._product(row)
+
+    def all_products(self) -> List[Product]:
+        """
+        Every product, available and taken.
+        """
+        rows = self.db.execute(
+            f"SELECT {PRODUCT_COLUMNS} FROM products"
+        ).fetchall()
+        return [self._product(row) for row in rows]
+
+    @staticmethod
+    def _product(row: Tuple) -> Product:
+        return Product(
+            uuid=row[0],
+            code=row[1],
+            summary=row[2],
+            taken=bool(row[3]),
+            created_at=row[4],
+            updated_at=row[5],
+        )
+
+
+class MirrorSync:
+    def __init__(
+        self,
+        api,
+        mirror: Mirror,
+        interval: float = 30,
+        full_sync_every: float = 3600,
+        page_size: int = 100,
+    ):
+        """
+        Keep the mirror in sync with the API, in the background.
+
+        The API cannot filter by modification date, so a delta sync reads
+        the listings newest first and stops at the last watermark: new
+        products by `created_at`, new orders (which also mark their
+        products as taken) by `requested_at`. The bot's own mutations are
+        applied to the mirror as they succeed. When the totals informed by
+        the API disagree with the mirror (e.g. a product removed by another
+        client), and periodically to catch the edits made elsewhere, the
+        whole content is downloaded again.
+
+        Args:
+            - api: the `AsyncApi` used to read the listings.
+            - mirror: the mirror to be kept in sync.
+            - interval: how many seconds between two syncs.
+            - full_sync_every: how many seconds between two full syncs.
+            - page_size: how many records are requested at once.
+        """
+        self.api = api
+        self.mirror = mirror
+        self.interval = interval
+        self.full_sync_every = full_sync_every
+        self.page_size = page_size
+        self.lock = asyncio.Lock()
+
+    def on_mutation(self, action: Text, value: Any):
+        """
+        Apply a successful mutation to the mirror.
+
+        Args:
+            - action: `add`, `edit` or `delete`.
+            - value: the returned product, or the uuid of the removed one.
+        """
+        if self.mirror.db is None:
+            return
+        if action == "delete":
+            self.mirror.delete_product(value)
+        else:
+            self.mirror.save_products([value])
+
+    async def run(self):
+        """
+        Sync forever, every `interval` seconds.
+        """
+        self.mirror.open()
+        while True:
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.warning("Failed to sync the mirror: %r", e)
+            await asyncio.sleep(self.interval)
+
+    async def sync(self, full: bool = False):
+        """
+        Fetch the records changed since the last sync.
+
+        Args:
+            - full: download everything, instead of the delta.
+        """
+        self.mirror.open()
+        async with self.lock:
+            last_full = float(self.mirror.get_meta("full_sync_at") or 0)
+            full = full or time.time() - last_full >= self.full_sync_every
+
+            with tracer.span("mirror sync", full=full) as span:
+                if full:
+                    await self._full_sync()
+                elif not await self._delta_sync():
+                    logger.info("The mirror diverged from the API, resyncing.")
+                    span.set(diverged=True)
+                    await self._full_sync()
+            self.mirror.ready = True
+
+    async def _delta_sync(self) -> bool:
+        """
+        Returns:
+            - `True` if the mirror agrees with the API totals afterwards.
+        """
+        total, products = await self._newest(
+            fetch=self.api.fetch_products,
+            query=ProductQuery(taken=False, desc=True),
+            records=lambda response: response.products,
+            when=lambda product: product.created_at,
+            watermark="products_watermark",
+            not_found=ProductNotFound,
+        )
+        orders_total, orders = await self._newest(
+            fetch=self.api.fetch_orders,
+            query=OrderQuery(desc=True),
+            records=lambda response: response.orders,
+            when=lambda order: order.requested_at,
+            watermark="orders_watermark",
+            not_found=OrderNotFound,
+        )
+
+        with self.mirror.db:
+            self.mirror.db.execute("BEGIN")
+            self.mirror.save_products(products)
+            self.mirror.save_orders(orders)
+            self._advance("products_watermark", products, "created_at")
+            self._advance("orders_watermark", orders, "requested_at")
+
+        expected = (
+            total.all if total else 0,
+            total.taken if total else 0,
+            orders_total or 0,
+        )
+        mirrored = self.mirror.totals()
+        return expected == (
+            mirrored.all,
+            mirrored.taken,
+            self.mirror.count_orders(),
+        )
+
+    async def _newest(
+        self, fetch, query, records, when, watermark, not_found
+    ) -> Tuple[Any, List]:
+        """
+        Read a listing newest first, down to the watermark.
+
+        Returns:
+            - the total informed by the API and the records read.
+        """
+        mark = self.mirror.get_meta(watermark)
+        mark = datetime.fromisoformat(mark) if mark else None
+        total, found, skip = None, [], 0
+
+        while True:
+            try:
+                response = await fetch(
+                    query.copy(update={"skip": skip, "limit": self.page_size})
+                )
+            except not_found:
+                return total, found
+
+            total = response.total
+            items = records(response)
+            for item in items:
+                # Equal timestamps are read again, saving is idempotent.
+                if mark is not None and when(item) < mark:
+                    return total, found
+                found.append(item)
+
+            skip += len(items)
+            if len(items) < self.page_size:
+                return total, found
+
+    async def _full_sync(self):
+        products = await self._all(
+            self.api.iter_products(
+                ProductQuery(taken=False), page_size=self.page_size
+            ),
+            not_found=ProductNotFound,
+        )
+        products += await self._all(
+            self.api.iter_products(
+                ProductQuery(taken=True), page_size=self.page_size
+            ),
+            not_found=ProductNotFound,
+        )
+        orders = await self._all(
+            self.api.iter_orders(OrderQuery(), page_size=self.page_size),
+            not_found=OrderNotFound,
+        )
+
+        self.mirror.replace(products, orders)
+        with self.mirror.db:
+            self.mirror.db.execute("BEGIN")
+            self._advance("products_watermark", products, "created_at")
+            self._advance("orders_watermark", orders, "requested_at")
+            self.mirror.set_meta("full_sync_at", time.time())
+
+    @staticmethod
+    async def _all(records: AsyncIterator, not_found: type) -> List:
+        try:
+            return [record async for record in records]
+        except not_found:
+            return []
+
+    def _advance(self, watermark: Text, records: List, field: Text):
+        stamps = [getattr(record, field) for record in records]
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        if stamps:
+            current = self.mirror.get_meta(watermark)
+            newest = max(stamps)
+            if current is None or newest > datetime.fromisoformat(current):
+                self.mirror.set_meta(watermark, newest.isoformat())
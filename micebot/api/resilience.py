@@ -0,0 +1,155 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Text
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def retry_after(value: Optional[Text]) -> Optional[float]:
+    """
+    Parse a `Retry-After` header.
+
+    Args:
+        - value: the header value, in seconds or as an HTTP date.
+
+    Returns:
+        - how many seconds to wait, or `None` if the header is absent or
+            invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        attempts: int = 3,
+        base: float = 0.2,
+        cap: float = 5.0,
+        rng: Callable[[], float] = random.random,
+    ):
+        """
+        Capped exponential backoff with full jitter.
+
+        Args:
+            - attempts: how many times a request is sent, at most.
+            - base: the backoff of the first retry, in seconds.
+            - cap: the maximum backoff, in seconds. It also caps the
+                `Retry-After` informed by the API.
+            - rng: the random generator, replaceable by the tests.
+        """
+        self.attempts = attempts
+        self.base = base
+        self.cap = cap
+        self.rng = rng
+
+    def should_retry(self, attempt: int) -> bool:
+        """
+        Check if a failed attempt can be retried.
+
+        Args:
+            - attempt: the failed attempt, starting at zero.
+        """
+        return attempt + 1 < self.attempts
+
+    def backoff(self, attempt: int, wait: float = None) -> float:
+        """
+        How long to wait before the next attempt.
+
+        Args:
+            - attempt: the failed attempt, starting at zero.
+            - wait: the `Retry-After` informed by the API, if any.
+
+        Returns:
+            - the delay, in seconds.
+        """
+        if wait is not None:
+            return min(wait, self.cap)
+        return self.rng() * min(self.cap, self.base * 2 ** attempt)
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30,
+        on_state_change: Callable[[Text, Text], None] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Fail fast while the API is down.
+
+        The circuit opens after `failure_threshold` consecutive failures.
+        Once `reset_timeout` seconds have passed, it becomes half-open and
+        lets a single probe through: a success closes the circuit again,
+        a failure reopens it.
+
+        Args:
+            - failure_threshold: how many consecutive failures open the
+                circuit.
+            - reset_timeout: how many seconds the circuit stays open.
+            - on_state_change: called with the old and the new state on
+                every transition.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.changed_at = clock()
+
+    def allow(self) -> bool:
+        """
+        Check if a request can be sent.
+
+        Returns:
+            - `False` while the circuit is open, or while a half-open probe
+                is in flight.
+        """
+        if self.state == CLOSED:
+            return True
+
+        if self.clock() - self.changed_at < self.reset_timeout:
+            return False
+
+        # Half-open: let a probe through. A probe that never reports back
+        # is replaced by a new one after another `reset_timeout`.
+        self._transition(HALF_OPEN)
+        return True
+
+    def record_success(self):
+        """
+        Report a request answered by the API.
+        """
+        self.failures = 0
+        if self.state != CLOSED:
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        """
+        Report a request that failed because of the API.
+        """
+        self.failures += 1
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._transition(OPEN)
+
+    def _transition(self, state: Text):
+        previous, self.state = self.state, state
+        self.changed_at = self.clock()
+        if self.on_state_change is not None and previous != state:
+            self.on_state_change(previous, state)
@@ -0,0 +1,255 @@
+"""
+An in-memory search index over the product codes and summaries.
+
+The codes are kept sorted, so the codes that start with a prefix are a
+contiguous range found by bisection, as the leaves under a trie node. The
+summaries are split into normalized tokens, each one mapped to the
+products that hold it. A lookup never calls the API.
+"""
+import asyncio
+import logging
+import re
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Set, Text, Tuple
+
+from micebot.api.errors import ProductNotFound
+from micebot.model.model import Product, ProductQuery
+from micebot.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+WORD = re.compile(r"\w+")
+# Sorts after any text that starts with the same prefix.
+LAST = "\U0010ffff"
+
+
+def normalize(text: Text) -> Text:
+    """
+    Fold the case and strip the accents, e.g. `Descrição` is `descricao`.
+    """
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text: Optional[Text]) -> Set[Text]:
+    """
+    The normalized words of a text.
+    """
+    return set(WORD.findall(normalize(text or "")))
+
+
+def between(keys: List, low: Any, high: Any) -> range:
+    """
+    The positions of the sorted keys from `low` up to `high`.
+    """
+    start = bisect_left(keys, low)
+    return range(start, bisect_left(keys, high, lo=start))
+
+
+class ProductIndex:
+    def __init__(
+        self,
+        api=None,
+        interval: float = 3600,
+        page_size: int = 500,
+        mirror_poll: float = 1.0,
+    ):
+        """
+        Find the products by a code prefix or by words of their summaries.
+
+        The index is built from the product listing, then kept up to date
+        with the bot's own mutations, as an `AsyncApi` listener. The
+        changes made by other clients are picked up by the periodic
+        rebuilds. When the API client has a mirror, the listing is read
+        from it, so the products are not downloaded twice.
+
+        Args:
+            - api: the `AsyncApi` used to read the listing.
+            - interval: how many seconds between two rebuilds.
+            - page_size: how many products are requested at once.
+            - mirror_poll: how often the first build checks if the mirror
+                is ready.
+        """
+        self.api = api
+        self.interval = interval
+        self.page_size = page_size
+        self.mirror_poll = mirror_poll
+        self.ready = False
+        self.products: Dict[Text, Product] = {}
+        self.codes: List[Tuple[Text, Text]] = []
+        self.tokens: Dict[Text, Set[Text]] = {}
+        self.vocabulary: List[Text] = []
+        # The mutations applied while a rebuild reads the listing, which
+        # may predate them.
+        self.pending: Optional[List[Tuple[Text, Any]]] = None
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def save(self, product: Product):
+        """
+        Index a product, replacing its previous version.
+        """
+        self.delete(product.uuid)
+        self.products[product.uuid] = product
+        insort(self.codes, (normalize(product.code), product.uuid))
+        for token in tokenize(product.summary):
+            uuids = self.tokens.get(token)
+            if uuids is None:
+                uuids = self.tokens[token] = set()
+                insort(self.vocabulary, token)
+            uuids.add(product.uuid)
+
+    def delete(self, uuid: Text):
+        """
+        Remove a product from the index, if it is there.
+        """
+        product = self.products.pop(uuid, None)
+        if product is None:
+            return
+        key = (normalize(product.code), uuid)
+        del self.codes[bisect_left(self.codes, key)]
+        for token in tokenize(product.summary):
+            uuids = self.tokens[token]
+            uuids.discard(uuid)
+            if not uuids:
+                del self.tokens[token]
+                del self.vocabulary[bisect_left(self.vocabulary, token)]
+
+    def replace(self, products: List[Product]):
+        """
+        Index the products, in place of the current ones.
+        """
+        self.products = {product.uuid: product for product in products}
+        self.codes = sorted(
+            (normalize(product.code), product.uuid) for product in products
+        )
+        self.tokens = {}
+        for product in products:
+            for token in tokenize(product.summary):
+                self.tokens.setdefault(token, set()).add(product.uuid)
+        self.vocabulary = sorted(self.tokens)
+
+    def search(self, text: Text, limit: int = 10) -> Tuple[int, List[Product]]:
+        """
+        Look the products up.
+
+        The products whose code starts with the text come first, sorted by
+        code. They are followed by the ones whose summary has a word that
+        starts with each word of the text.
+
+        Args:
+            - text: the code prefix or the summary words.
+            - limit: how many products are returned.
+
+        Returns:
+            - how many products match, and the first `limit` of them.
+        """
+        prefix = normalize(text.strip())
+        by_code = between(self.codes, (prefix,), (prefix + LAST,))
+        found = [self.codes[i][1] for i in by_code[:limit]]
+
+        by_summary: Set[Text] = set()
+        words = tokenize(text)
+        if words:
+            matches = [self._words_starting(word) for word in words]
+            matches.sort(key=len)
+            # The sets of the index are shared, never updated here.
+            by_summary = matches[0]
+            if len(matches) > 1:
+                by_summary = by_summary.intersection(*matches[1:])
+            if by_code and by_summary:
+                by_summary = by_summary.difference(
+                    self.codes[i][1] for i in by_code
+                )
+            for uuid in by_summary:
+                if len(found) >= limit:
+                    break
+                found.append(uuid)
+
+        return (
+            len(by_code) + len(by_summary),
+            [self.products[uuid] for uuid in found],
+        )
+
+    def _words_starting(self, prefix: Text) -> Set[Text]:
+        positions = between(self.vocabulary, prefix, prefix + LAST)
+        if len(positions) == 1:
+            return self.tokens[self.vocabulary[positions[0]]]
+        return set().union(
+            *(self.tokens[self.vocabulary[i]] for i in positions)
+        )
+
+    def on_mutation(self, action: Text, value: Any):
+        """
+        Apply a successful mutation to the index.
+
+        Args:
+            - action: `add`, `edit` or `delete`.
+            - value: the returned product, or the uuid of the removed one.
+        """
+        if self.pending is not None:
+            self.pending.append((action, value))
+        if action == "delete":
+            self.delete(value)
+        else:
+            self.save(value)
+
+    async def build(self):
+        """
+        Index every product of the listing, available and taken.
+
+        The listing is read from the mirror once it is ready, otherwise it
+        is requested to the API.
+        """
+        self.pending = []
+        try:
+            with tracer.span("search index build") as span:
+                mirror = self.api.mirror
+                if mirror is not None and mirror.ready:
+                    products = mirror.all_products()
+                    span.set(source="mirror")
+                else:
+                    products = await self._download()
+                    span.set(source="api")
+                self.replace(products)
+                pending, self.pending = self.pending, None
+                for action, value in pending:
+                    self.on_mutation(action, value)
+                span.set(products=len(self.products))
+            self.ready = True
+        finally:
+            self.pending = None
+
+    async def _download(self) -> List[Product]:
+        products = []
+        for taken in (False, True):
+            try:
+                async for product in self.api.iter_products(
+                    ProductQuery(taken=taken), page_size=self.page_size
+                ):
+                    products.append(product)
+            except ProductNotFound:
+                continue
+        return products
+
+    async def run(self):
+        """
+        Rebuild the index forever, every `interval` seconds.
+
+        With a mirror, the first build waits for its first sync instead of
+        downloading the listing as well.
+        """
+        mirror = self.api.mirror
+        while mirror is not None and not mirror.ready:
+            await asyncio.sleep(self.mirror_poll)
+        while True:
+            try:
+                await self.build()
+            except Exception as e:
+                logger.warning("Failed to build the search index: %r", e)
+            await asyncio.sleep(self.interval)
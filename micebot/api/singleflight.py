@@ -0,0 +1,76 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Hashable, NamedTuple
+
+
+class FlightStats(NamedTuple):
+    calls: int
+    shared: int
+    in_flight: int
+
+
+class SingleFlight:
+    def __init__(self):
+        """
+        Coalesce concurrent calls with the same key into a single one.
+
+        While a call is in flight, the callers asking for the same key wait
+        for it and share its result (or its exception) instead of sending
+        their own request. Nothing is kept once the call completes, so the
+        results are never stale.
+        """
+        self.calls = 0
+        self.shared = 0
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def stats(self) -> FlightStats:
+        """
+        How many calls were made and how many callers joined one of them.
+        """
+        return FlightStats(
+            calls=self.calls, shared=self.shared, in_flight=len(self._flights),
+        )
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable]) -> Any:
+        """
+        Call `fetch`, unless a call with the same key is in flight.
+
+        A cancelled caller does not cancel the shared call, the other
+        callers still get its result.
+
+        Args:
+            - key: identifies the equivalent calls.
+            - fetch: coroutine function that makes the call.
+
+        Returns:
+            - the result of the call.
+        """
+        flight = self._flights.get(key)
+
+        if flight is None:
+            flight = asyncio.ensure_future(fetch())
+            flight.add_done_callback(partial(self._landed, key))
+            self._flights[key] = flight
+            self.calls += 1
+        else:
+            self.shared += 1
+
+        return await asyncio.shield(flight)
+
+    def forget(self):
+        """
+        Stop sharing the calls in flight.
+
+        The callers already waiting still get their results, but the next
+        ones start a new call. Used when the in-flight results may be
+        outdated, e.g. after a mutation.
+        """
+        self._flights.clear()
+
+    def _landed(self, key: Hashable, flight: asyncio.Future):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.cancelled():
+            # Every caller may be gone, do not warn about the exception.
+            flight.exception()
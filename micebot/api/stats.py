@@ -0,0 +1,174 @@
+"""
+Order analytics, maintained incrementally.
+
+The aggregates are counted once over the whole listing, then each refresh
+reads the orders newest first and folds in only the ones requested after
+the last processed order, so a report does not read the listing again.
+"""
+import asyncio
+import logging
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Set, Text, Tuple
+
+from micebot.api.errors import OrderNotFound
+from micebot.model.model import Order, OrderQuery, OrderWithTotal
+from micebot.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class OrderStats:
+    def __init__(self, api, page_size: int = 500):
+        """
+        Redemption counts per moderator, recipient, product summary and day.
+
+        Args:
+            - api: the `AsyncApi` used to read the orders. Its mirror
+                answers once it is ready.
+            - page_size: how many orders are requested at once.
+        """
+        self.api = api
+        self.page_size = page_size
+        self.lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget the aggregates, so the next refresh counts every order.
+        """
+        self.total = 0
+        self.moderators: Counter = Counter()
+        self.moderator_names: Dict[Text, Text] = {}
+        self.owners: Counter = Counter()
+        self.summaries: Counter = Counter()
+        self.days: Counter = Counter()
+        self.watermark: Optional[datetime] = None
+        # The orders requested at the watermark, which may be followed by
+        # others requested at the same time.
+        self.at_watermark: Set[Text] = set()
+
+    def fold(self, orders: Iterable[Order]) -> int:
+        """
+        Count the orders requested after the last processed one.
+
+        Args:
+            - orders: the orders, in any order.
+
+        Returns:
+            - how many orders were counted.
+        """
+        counted: List[Order] = []
+        for order in orders:
+            if self.watermark is not None and (
+                order.requested_at < self.watermark
+                or (
+                    order.requested_at == self.watermark
+                    and order.uuid in self.at_watermark
+                )
+            ):
+                continue
+            counted.append(order)
+            self.moderators[order.mod_id] += 1
+            self.moderator_names[order.mod_id] = order.mod_display_name
+            self.owners[order.owner_display_name] += 1
+            self.summaries[order.product.summary] += 1
+            self.days[order.requested_at.date()] += 1
+
+        if counted:
+            newest = max(order.requested_at for order in counted)
+            if self.watermark is None or newest > self.watermark:
+                self.watermark = newest
+                self.at_watermark = set()
+            self.at_watermark.update(
+                order.uuid
+                for order in counted
+                if order.requested_at == self.watermark
+            )
+        self.total += len(counted)
+        return len(counted)
+
+    async def refresh(self) -> int:
+        """
+        Fold in the orders requested since the last refresh.
+
+        When the total informed by the API disagrees with the aggregates
+        afterwards, e.g. because orders were removed, every order is
+        counted again.
+
+        Raises:
+            UnknownNetworkError: when any unknown network error happens.
+
+        Returns:
+            - how many orders were counted.
+        """
+        async with self.lock:
+            with tracer.span("stats refresh") as span:
+                total, counted = await self._fold_newest()
+                if total != self.total:
+                    logger.info("The order stats diverged, recounting.")
+                    span.set(diverged=True)
+                    self.reset()
+                    total, counted = await self._fold_newest()
+                span.set(counted=counted)
+                return counted
+
+    async def _fold_newest(self) -> Tuple[int, int]:
+        """
+        Read the orders newest first, down to the watermark.
+
+        Returns:
+            - the total informed by the API and how many orders were
+                counted.
+        """
+        total, skip = None, 0
+        found: Dict[Text, Order] = {}
+        while True:
+            try:
+                page = await self._page(
+                    OrderQuery(desc=True, skip=skip, limit=self.page_size)
+                )
+            except OrderNotFound:
+                break
+
+            if total is None:
+                total = page.total
+            for order in page.orders:
+                if (
+                    self.watermark is not None
+                    and order.requested_at < self.watermark
+                ):
+                    break
+                # The orders requested while the listing is read shift
+                # the pages, so an order may be read twice.
+                found[order.uuid] = order
+            else:
+                skip += len(page.orders)
+                if len(page.orders) == self.page_size:
+                    continue
+            break
+
+        return total or 0, self.fold(found.values())
+
+    async def _page(self, query: OrderQuery) -> OrderWithTotal:
+        mirror = self.api.mirror
+        if mirror is not None and mirror.ready:
+            return mirror.list_orders(query)
+        # The listing cache is bypassed, a full count would evict it.
+        return await self.api.fetch_orders(query)
+
+    def top_moderators(self, limit: int) -> List[tuple]:
+        """
+        The moderators with the most deliveries, by display name.
+        """
+        return [
+            (self.moderator_names[mod_id], count)
+            for mod_id, count in self.moderators.most_common(limit)
+        ]
+
+    def last_days(self, limit: int) -> List[tuple]:
+        """
+        The deliveries of the last days with any, newest first.
+        """
+        days: List[date] = sorted(self.days, reverse=True)[:limit]
+        return [(day, self.days[day]) for day in days]
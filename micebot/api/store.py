@@ -0,0 +1,235 @@
+"""
+A store shared by the worker processes of the bot on a host.
+
+It is a SQLite database in WAL mode, so the processes read concurrently
+and SQLite file locks serialize the writes. The workers keep the access
+token and the cached listings there, so `/auth/` and the listings are
+requested once per host instead of once per process.
+
+The calls block the event loop, so they only wait a few milliseconds for
+the lock of another process. A busy store answers as an empty one, and the
+callers fall back to their local state.
+"""
+import functools
+import logging
+import os
+import time
+from typing import Any, Callable, Optional, Text, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generation (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO generation (id, value) VALUES (0, 0);
+"""
+
+CACHE_PREFIX = "cache:"
+
+logger = logging.getLogger(__name__)
+
+
+def unless_busy(default: Any = None) -> Callable:
+    """
+    Answer `default` when the database stays locked by another process,
+    or fails otherwise, instead of raising.
+    """
+
+    def decorate(method: Callable) -> Callable:
+        @functools.wraps(method)
+        def call(self, *args, **kwargs):
+            import sqlite3
+
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                logger.warning(
+                    "The shared store is busy, skipped %s: %r",
+                    method.__name__,
+                    e,
+                )
+                return default
+
+        return call
+
+    return decorate
+
+
+class SharedStore:
+    def __init__(
+        self,
+        path: Text,
+        timeout: float = 0.05,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Key-value entries that expire, shared by several processes.
+
+        The cached listings also carry the generation of the store, bumped
+        on every mutation, so a listing fetched before a mutation in any
+        process is never stored after it. An invalidation that finds the
+        store busy is retried on the next read of the generation.
+
+        Args:
+            - path: the database file.
+            - timeout: how many seconds a call waits for the lock, before
+                answering as if the store was empty.
+            - clock: the wall clock, shared by the processes.
+        """
+        self.path = path
+        self.timeout = timeout
+        self.clock = clock
+        self.owner = str(os.getpid()).encode()
+        # An invalidation of the listings not written yet.
+        self.stale = False
+        # A `sqlite3.Connection` once opened, sqlite3 is imported then.
+        self.db: Optional[Any] = None
+
+    def open(self):
+        """
+        Connect to the database, creating the tables if needed.
+        """
+        if self.db is None:
+            import sqlite3
+
+            db = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript(SCHEMA)
+            except sqlite3.Error:
+                db.close()
+                raise
+            self.db = db
+
+    def close(self):
+        """
+        Close the database.
+        """
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    @unless_busy()
+    def get(self, key: Text) -> Optional[Tuple[bytes, float]]:
+        """
+        Read an entry.
+
+        Returns:
+            - the value and its expiration (seconds since epoch), or `None`
+                if the entry is missing or expired.
+        """
+        self.open()
+        row = self.db.execute(
+            "SELECT value, expires_at FROM entries "
+            "WHERE key = ? AND expires_at > ?",
+            (key, self.clock()),
+        ).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    @unless_busy()
+    def set(self, key: Text, value: bytes, ttl: float):
+        """
+        Write an entry, which expires after `ttl` seconds.
+        """
+        self.open()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at) "
+            "VALUES (?, ?, ?)",
+            (key, value, self.clock() + ttl),
+        )
+
+    @unless_busy(default=False)
+    def acquire(self, key: Text, ttl: float) -> bool:
+        """
+        Take a lease, unless another process holds it.
+
+        The lease expires after `ttl` seconds, so a process that dies
+        while holding it does not block the others.
+
+        Returns:
+            - `True` if the lease was taken by this process.
+        """
+        self.open()
+        now = self.clock()
+        cursor = self.db.execute(
+            "INSERT INTO entries (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE "
+            "SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE entries.expires_at <= ?",
+            (key, self.owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    @unless_busy()
+    def release(self, key: Text):
+        """
+        Give a lease back, if this process holds it. Otherwise, it expires.
+        """
+        self.open()
+        self.db.execute(
+            "DELETE FROM entries WHERE key = ? AND value = ?",
+            (key, self.owner),
+        )
+
+    @unless_busy()
+    def generation(self) -> Optional[int]:
+        """
+        The number of times the cached listings were invalidated, or `None`
+        when the store is busy.
+        """
+        self.open()
+        if self.stale:
+            self._clear_cached()
+        return self.db.execute(
+            "SELECT value FROM generation WHERE id = 0"
+        ).fetchone()[0]
+
+    def get_cached(self, key: Text) -> Optional[bytes]:
+        """
+        Read a cached listing.
+        """
+        entry = self.get(CACHE_PREFIX + key)
+        return None if entry is None else entry[0]
+
+    @unless_busy()
+    def set_cached(self, key: Text, value: bytes, ttl: float, generation: int):
+        """
+        Cache a listing, unless the listings were invalidated since
+        `generation` was read.
+        """
+        self.open()
+        self.db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at) "
+            "SELECT ?, ?, ? FROM generation WHERE id = 0 AND value = ?",
+            (CACHE_PREFIX + key, value, self.clock() + ttl, generation),
+        )
+
+    def clear_cached(self) -> bool:
+        """
+        Invalidate the cached listings of every process.
+
+        Returns:
+            - `False` if the store was busy, the invalidation is then
+                retried on the next read of the generation.
+        """
+        self.stale = True
+        return self._clear_cached()
+
+    @unless_busy(default=False)
+    def _clear_cached(self) -> bool:
+        self.open()
+        with self.db:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.execute("UPDATE generation SET value = value + 1")
+            self.db.execute(
+                "DELETE FROM entries WHERE key LIKE ?", (CACHE_PREFIX + "%",)
+            )
+        self.stale = False
+        return True
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from micebot.metrics import metrics
+from micebot.tracing import tracer
+
+Mutation = Callable[[Any], Awaitable[Any]]
+
+QUEUED = metrics.gauge(
+    "micebot_write_behind_queued", "Mutations waiting for the next flush."
+)
+FLUSH_SIZE = metrics.histogram(
+    "micebot_write_behind_flush_size",
+    "Mutations sent per flush.",
+    buckets=(1, 2, 5, 10, 20, 50, 100),
+)
+
+
+class Pending:
+    __slots__ = ("mutation", "argument", "future", "queued_at")
+
+    def __init__(self, mutation, argument, future, queued_at):
+        self.mutation = mutation
+        self.argument = argument
+        self.future = future
+        self.queued_at = queued_at
+
+
+class WriteBehind:
+    def __init__(
+        self,
+        batch_size: int = 20,
+        interval: float = 2.0,
+        concurrency: int = 8,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Queue the mutations and send them in batches, in the background.
+
+        A batch is flushed once `batch_size` mutations are queued, or
+        `interval` seconds after its oldest mutation was queued. The API
+        has no bulk endpoint, so the mutations of a batch are sent
+        concurrently, up to `concurrency` at a time, each one with its own
+        idempotency key and retries.
+
+        Args:
+            - batch_size: how many mutations trigger a flush.
+            - interval: how many seconds a mutation waits, at most.
+            - concurrency: the maximum number of requests in flight.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.batch_size = batch_size
+        self.interval = interval
+        self.concurrency = concurrency
+        self.clock = clock
+        self.flushes = 0
+        self._pending: List[Pending] = []
+        self._in_flight: List[Pending] = []
+        self._full: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Set by `join`, the queue is flushed without waiting.
+        self._joining = False
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def submit(self, mutation: Mutation, argument: Any) -> "asyncio.Future":
+        """
+        Queue a mutation, e.g. `submit(api.add_product, product)`.
+
+        Args:
+            - mutation: the `AsyncApi` method.
+            - argument: its argument.
+
+        Returns:
+            - a future resolved with the outcome of the mutation, once its
+                batch is flushed.
+        """
+        loop = asyncio.get_event_loop()
+        if self._full is None:
+            self._full = asyncio.Event()
+        pending = Pending(
+            mutation, argument, loop.create_future(), self.clock()
+        )
+        self._pending.append(pending)
+        QUEUED.set(len(self._pending))
+
+        if len(self._pending) >= self.batch_size:
+            self._full.set()
+        if self._worker is None:
+            self._worker = loop.create_task(self._drain())
+        return pending.future
+
+    async def join(self):
+        """
+        Wait until every queued mutation is flushed.
+        """
+        if self._worker is not None:
+            self._joining = True
+            self._full.set()
+            await asyncio.shield(self._worker)
+
+    async def close(self):
+        """
+        Send every mutation still queued or in flight, e.g. when the bot
+        closes.
+
+        The worker may have been cancelled along with the other tasks of
+        the loop, so the mutations of an interrupted flush are sent again.
+        They keep their idempotency keys, so none is applied twice.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            await asyncio.wait([self._worker])
+
+        batch = [p for p in self._in_flight if not p.future.done()]
+        batch += self._pending
+        self._in_flight, self._pending = [], []
+        QUEUED.set(0)
+        for start in range(0, len(batch), self.batch_size):
+            end = start + self.batch_size
+            await self._flush(batch[start:end])
+
+    async def _drain(self):
+        try:
+            while self._pending:
+                wait = (
+                    self._pending[0].queued_at + self.interval - self.clock()
+                )
+                if (
+                    len(self._pending) < self.batch_size
+                    and wait > 0
+                    and not self._joining
+                ):
+                    try:
+                        await asyncio.wait_for(self._full.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                self._full.clear()
+
+                self._in_flight = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+                QUEUED.set(len(self._pending))
+                await self._flush(self._in_flight)
+                self._in_flight = []
+        finally:
+            self._worker = None
+            self._joining = False
+
+    async def _flush(self, batch: List[Pending]):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def send(pending: Pending):
+            async with semaphore:
+                try:
+                    result = await pending.mutation(pending.argument)
+                except Exception as e:
+                    pending.future.set_exception(e)
+                else:
+                    pending.future.set_result(result)
+
+        self.flushes += 1
+        FLUSH_SIZE.observe(len(batch))
+        with tracer.span("write-behind flush", mutations=len(batch)):
+            await asyncio.gather(*(send(pending) for pending in batch))
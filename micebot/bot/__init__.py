@@ -1,27 +1,239 @@
-from discord.ext.commands import Bot
+import asyncio
+from typing import Optional
 
-from micebot.api import Api
+from discord.ext.commands import AutoShardedBot, Bot, Context
+
+from micebot.api import AsyncApi
+from micebot.api.codec import get_codec
+from micebot.api.idempotency import IdempotencyLedger
+from micebot.api.mirror import Mirror, MirrorSync
+from micebot.api.resilience import CLOSED, CircuitBreaker, RetryPolicy
+from micebot.api.search import ProductIndex
+from micebot.api.store import SharedStore
+from micebot.api.writebehind import WriteBehind
+from micebot.bot.startup import Startup
 from micebot.commands.orders import register as register_order_commands
 from micebot.commands.products import register as register_product_commands
+from micebot.metrics import metrics
+from micebot.metrics.commands import instrument
+from micebot.metrics.shards import instrument_shards
 from micebot.model.env import env
+from micebot.model.model import OrderQuery, ProductQuery
+from micebot.model.outbox import outbox
+from micebot.model.permission import PermissionCache
+from micebot.tracing import JsonlExporter, tracer
+
+startup = Startup()
+warming_up: Optional[asyncio.Task] = None
+
+
+def report_circuit(previous: str, state: str):
+    print(f"API circuit breaker changed from {previous} to {state}.")
+
 
-api = Api(
+api = AsyncApi(
     endpoint=env.api_endpoint,
     username=env.discord_user,
     password=env.discord_pass,
+    max_connections=env.api_max_connections,
+    max_keepalive=env.api_max_keepalive,
+    timeout=env.api_timeout,
+    token_ttl=env.api_token_ttl,
+    token_refresh_margin=env.api_token_refresh_margin,
+    cache_ttl=env.api_cache_ttl,
+    cache_size=env.api_cache_size,
+    retry_policy=RetryPolicy(
+        attempts=env.api_retry_attempts,
+        base=env.api_retry_base,
+        cap=env.api_retry_cap,
+    ),
+    circuit_breaker=CircuitBreaker(
+        failure_threshold=env.api_breaker_threshold,
+        reset_timeout=env.api_breaker_reset,
+        on_state_change=report_circuit,
+    ),
+    mirror=Mirror(env.mirror_path) if env.mirror_path else None,
+    trust_responses=env.api_trust_responses,
+    codec=get_codec(env.api_json_codec),
+    store=(
+        SharedStore(env.shared_store_path) if env.shared_store_path else None
+    ),
+    idempotency=IdempotencyLedger(
+        ttl=env.api_idempotency_ttl, max_size=env.api_idempotency_size
+    ),
 )
 
-bot = Bot(command_prefix=env.command_prefix)
+mirror_sync = None
+if api.mirror is not None:
+    mirror_sync = MirrorSync(
+        api=api,
+        mirror=api.mirror,
+        interval=env.mirror_interval,
+        full_sync_every=env.mirror_full_sync_every,
+    )
+    api.listeners.append(mirror_sync.on_mutation)
+
+product_index = None
+if env.search_index:
+    product_index = ProductIndex(api=api, interval=env.search_interval)
+    api.listeners.append(product_index.on_mutation)
+
+writer = None
+if env.write_behind:
+    # The add and remove commands are acknowledged at once, then sent in
+    # batches.
+    writer = WriteBehind(
+        batch_size=env.write_behind_batch,
+        interval=env.write_behind_interval,
+        concurrency=env.write_behind_concurrency,
+    )
+
+metrics.gauge(
+    "micebot_api_circuit_open",
+    "1 while the API circuit breaker is not closed.",
+    function=lambda: float(api.circuit_breaker.state != CLOSED),
+)
+if api.cache is not None:
+    metrics.counter(
+        "micebot_api_cache_hits_total",
+        "Listings served from the cache.",
+        function=lambda: api.cache.stats.hits,
+    )
+    metrics.counter(
+        "micebot_api_cache_misses_total",
+        "Listings requested to the API.",
+        function=lambda: api.cache.stats.misses,
+    )
+
+if env.trace_file:
+    tracer.exporter = JsonlExporter(
+        env.trace_file,
+        max_bytes=env.trace_max_bytes,
+        backups=env.trace_backups,
+    )
+
+if env.discord_sharded:
+    # All the shards share this process, so the API client and its cache.
+    bot = AutoShardedBot(
+        command_prefix=env.command_prefix,
+        shard_count=env.discord_shard_count or None,
+        shard_ids=env.discord_shard_ids or None,
+    )
+    instrument_shards(bot)
+else:
+    bot = Bot(command_prefix=env.command_prefix)
+instrument(bot)
+
+permissions = PermissionCache(ttl=env.permission_ttl)
+permissions.register(bot)
+
+close_bot = bot.close
+
+
+async def close():
+    """
+    Close the bot, then release the pooled API connections.
+
+    The queued mutations are sent first, while the Discord connection is
+    still open, so their outcomes can still be answered.
+    """
+    if writer is not None:
+        await writer.close()
+        await outbox.join()
+    await close_bot()
+    await api.close()
+
 
-register_product_commands(bot=bot, api=api)
+bot.close = close
+
+register_product_commands(bot=bot, api=api, index=product_index, writer=writer)
 register_order_commands(bot=bot, api=api)
 
 
+async def warm_up() -> bool:
+    """
+    Authenticate and warm the API client up.
+
+    The authentication builds the pooled client and opens its first
+    connection. Unless the mirror answers the listings, the listings of
+    `ls` and `orders` with their default arguments are then cached.
+
+    Returns:
+        - `False` if the API rejected the credentials.
+    """
+    # Let the gateway login go first, so the client is built while the
+    # login waits for Discord.
+    await asyncio.sleep(0)
+    with tracer.span("startup warm-up"):
+        if not await api.authenticate():
+            return False
+        startup.mark("API authenticated")
+
+        if env.api_preload and api.mirror is None and api.cache is not None:
+            results = await asyncio.gather(
+                api.list_products(
+                    ProductQuery(taken=False, desc=True, limit=5)
+                ),
+                api.list_orders(OrderQuery(limit=5)),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    print(f"Failed to preload the API listings: {result!r}")
+            startup.mark("API listings preloaded")
+    return True
+
+
+def start_warm_up(
+    loop: asyncio.AbstractEventLoop = None,
+) -> "asyncio.Task[bool]":
+    """
+    Start warming the API client up, once.
+
+    It is started along with the gateway login, so the authentication
+    round trip does not delay the bot readiness.
+
+    Args:
+        - loop: the bot event loop. The current one by default.
+    """
+    global warming_up
+    if warming_up is None:
+        warming_up = (loop or asyncio.get_event_loop()).create_task(warm_up())
+    return warming_up
+
+
 @bot.event
 async def on_ready():
+    if startup.reached("ready"):
+        # A reconnection: the token is refreshed by the API client itself.
+        print("Reconnected to Discord.")
+        return
+
+    startup.mark("gateway ready")
     print("Stabilizing connection to the API, wait...")
-    if api.authenticate():
+    if await start_warm_up():
+        startup.mark("ready")
         print("MiceBot is ready to receive commands. 🧀")
+        print(f"Startup: {startup.report()}.")
     else:
         print("Fail to connect to API, check logs.")
         exit(1)
+
+
+@bot.listen("on_command_completion")
+async def report_first_command(ctx: Context):
+    if not startup.reached("first command"):
+        seconds = startup.mark("first command")
+        print(
+            f"First command ({ctx.command}) served {seconds:.2f}s after start."
+        )
+
+
+@bot.listen("on_shard_ready")
+async def report_shard_ready(shard_id: int):
+    print(f"Shard {shard_id} of {bot.shard_count} is ready.")
+
+
+@bot.listen("on_shard_disconnect")
+async def report_shard_disconnect(shard_id: int):
+    print(f"Shard {shard_id} disconnected from Discord.")
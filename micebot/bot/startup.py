@@ -0,0 +1,55 @@
+import time
+from typing import Callable, Dict, Optional, Text
+
+from micebot.metrics import metrics
+
+STARTUP_SECONDS = metrics.gauge(
+    "micebot_startup_seconds",
+    "Seconds from the process start to each startup milestone.",
+    labels=("phase",),
+)
+
+
+class Startup:
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        """
+        Track how long the startup milestones take.
+
+        Each milestone is recorded once, as the seconds elapsed since the
+        tracker was created, i.e. since the bot module was loaded.
+
+        Args:
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.clock = clock
+        self.started_at = clock()
+        self.phases: Dict[Text, float] = {}
+
+    def mark(self, phase: Text) -> float:
+        """
+        Record a milestone, unless it was already reached.
+
+        Returns:
+            - the seconds elapsed until the milestone.
+        """
+        if phase not in self.phases:
+            self.phases[phase] = self.clock() - self.started_at
+            STARTUP_SECONDS.set(self.phases[phase], phase=phase)
+        return self.phases[phase]
+
+    def reached(self, phase: Text) -> bool:
+        return phase in self.phases
+
+    def elapsed(self, phase: Text) -> Optional[float]:
+        return self.phases.get(phase)
+
+    def report(self) -> Text:
+        """
+        Describe the milestones, in the order they were reached.
+        """
+        return ", ".join(
+            f"{phase} in {seconds:.2f}s"
+            for phase, seconds in sorted(
+                self.phases.items(), key=lambda item: item[1]
+            )
+        )
@@ -1,55 +1,131 @@
+from typing import Iterable, Tuple
+
+from discord import Colour
 from discord.ext.commands import Bot, Context
 
-from micebot.api import Api
-from micebot.model.embed import embed, Field
+from micebot.api import AsyncApi, UnknownNetworkError
+from micebot.api.stats import OrderStats
+from micebot.model.embed import (
+    FIELD_VALUE_MAX_CHARACTERS,
+    EmbedTemplate,
+    Field,
+    RecordTemplate,
+    format_datetime,
+)
 from micebot.model.env import env
+from micebot.model.messages import GenericMessage, Messages, StatsCommand
 from micebot.model.model import OrderQuery
+from micebot.model.outbox import outbox
+from micebot.tracing import tracer
+
+LISTING = EmbedTemplate(title="Útimos itens resgatados")
+LISTED_ORDER = RecordTemplate(
+    "Entregue em", "Entregue por", "Entregue para", "Código do {summary}"
+)
+STATS = EmbedTemplate(
+    title="Estatísticas dos resgates",
+    footer="Final do Relatório.",
+    color=Colour.gold(),
+    thumbnail=True,
+)
+
+
+def ranking(rows: Iterable[Tuple[str, int]]) -> str:
+    """
+    One line per key, with its count.
+    """
+    lines = "\n".join(f"**{key}:** {count}" for key, count in rows)
+    return lines[:FIELD_VALUE_MAX_CHARACTERS] or "-"
 
 
-def register(bot: Bot, api: Api):
+def register(bot: Bot, api: AsyncApi):
+    order_stats = OrderStats(api)
+
     @bot.command()
     async def orders(ctx: Context, limit: str = 5):
 
-        response = api.list_orders(query=OrderQuery(limit=int(limit)))
+        response = await api.list_orders(query=OrderQuery(limit=int(limit)))
 
         if response.total == 0:
             """TODO: dar feedback se não tiver pedidos no BD."""
 
         else:
             await ctx.message.delete()
-            await ctx.channel.send(
-                embed=embed(
-                    title="Útimos itens resgatados",
+            with tracer.span("render embeds"):
+                for content in LISTING.pack(
                     description=f"Aqui estão os {limit} itens resgatados "
                     f"de um total de {response.total}.",
-                )
+                    records=(
+                        LISTED_ORDER(
+                            order.uuid,
+                            format_datetime(order.requested_at),
+                            order.mod_display_name,
+                            order.owner_display_name,
+                            order.product.code,
+                            summary=order.product.summary,
+                        )
+                        for order in response.orders
+                    ),
+                ):
+                    outbox.send(ctx.channel, embed=content)
+
+    @bot.command()
+    async def stats(ctx: Context, limit: str = "10"):
+        try:
+            await order_stats.refresh()
+        except UnknownNetworkError as e:
+            await Messages.remove_message_and_answer(
+                context=ctx,
+                message=GenericMessage.UNKNOWN_NETWORK_ERROR,
+                mention=ctx.author.mention,
+                err_message=str(e),
             )
-            for order in response.orders:
-                await ctx.channel.send(
-                    embed=embed(
-                        title=order.uuid,
-                        fields=[
-                            [
-                                Field(
-                                    key="Entregue em",
-                                    value=order.requested_at.strftime(
-                                        env.datetime_formatter
-                                    ),
-                                    inline=False,
-                                ),
-                                Field(
-                                    key="Entregue por",
-                                    value=order.mod_display_name,
+            return
+
+        if order_stats.total == 0:
+            await Messages.remove_message_and_answer(
+                context=ctx,
+                message=StatsCommand.NO_ORDERS,
+                mention=ctx.author.mention,
+            )
+            return
+
+        limit = int(limit)
+        days = [
+            (day.strftime(env.date_formatter), count)
+            for day, count in order_stats.last_days(limit)
+        ]
+        await ctx.message.delete()
+        with tracer.span("render embeds"):
+            outbox.send(
+                ctx.channel,
+                embed=STATS.render(
+                    description=f"Contagem dos {order_stats.total} itens "
+                    f"resgatados até agora.",
+                    fields=[
+                        [
+                            Field(
+                                key="Por moderador",
+                                value=ranking(
+                                    order_stats.top_moderators(limit)
                                 ),
-                                Field(
-                                    key="Entregue para",
-                                    value=order.owner_display_name,
+                            ),
+                            Field(
+                                key="Por destinatário",
+                                value=ranking(
+                                    order_stats.owners.most_common(limit)
                                 ),
-                                Field(
-                                    key=f"Código do {order.product.summary}",
-                                    value=order.product.code,
+                            ),
+                        ],
+                        [
+                            Field(
+                                key="Por produto",
+                                value=ranking(
+                                    order_stats.summaries.most_common(limit)
                                 ),
-                            ]
+                            ),
+                            Field(key="Por dia", value=ranking(days)),
                         ],
-                    )
-                )
+                    ],
+                ),
+            )
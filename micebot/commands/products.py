@@ -1,19 +1,35 @@
-from discord import Colour
+import asyncio
+import csv
+from typing import Any, Callable, Iterator, Optional
+
+from discord import Colour, Embed
 from discord.ext.commands import Bot, Context
 
 from micebot.api import (
-    Api,
+    AsyncApi,
     CodeAlreadyRegistered,
     UnknownNetworkError,
     ProductNotFound,
 )
-from micebot.model.embed import embed, Field
+from micebot.api.bulk import BulkSummary, bulk_add
+from micebot.api.search import ProductIndex
+from micebot.api.writebehind import WriteBehind
+from micebot.model.embed import (
+    EmbedTemplate,
+    Field,
+    RecordTemplate,
+    embed,
+    format_datetime,
+)
 from micebot.model.env import env
 from micebot.model.messages import (
     RemoveProductCommand,
     Messages,
     AddProductCommand,
+    FindProductCommand,
     GenericMessage,
+    ImportProductsCommand,
+    WriteBehindMessage,
 )
 from micebot.model.model import (
     ProductCreation,
@@ -21,11 +37,326 @@ from micebot.model.model import (
     ProductDelete,
     ProductQuery,
 )
+from micebot.model.outbox import outbox
+from micebot.tracing import tracer
 
 DEFAULT_FOOTER = "Essa mensagem será removida após 30 segundos."
+IMPORT_HEADERS = {"code", "codigo", "código"}
+
+ADDED = EmbedTemplate(
+    title="Novo Item",
+    description="Acabei de adicionar um novo item para ser resgatado.",
+    footer=DEFAULT_FOOTER,
+)
+EDITED = EmbedTemplate(
+    title="Atualização Bem Sucedida",
+    description="Acabei de atualizar os dados do produto.",
+    footer=DEFAULT_FOOTER,
+)
+LISTING = EmbedTemplate(
+    title="Detalhamento",
+    description="Esses são os dados que tenho até o momento:",
+    footer="Final do Relatório.",
+    color=Colour.green(),
+    thumbnail=True,
+)
+FOUND = EmbedTemplate(
+    title="Busca", footer=DEFAULT_FOOTER, color=Colour.green()
+)
+LISTED_PRODUCT = RecordTemplate("UUID", "descrição", "criado em")
+
+
+def decode_attachment(content: bytes) -> str:
+    """
+    Decode an uploaded file, as UTF-8 or else as Latin-1.
+
+    The spreadsheets exported by Excel are often Latin-1, and any byte is
+    valid Latin-1, so the decoding never fails.
+    """
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return content.decode("latin-1")
+
+
+def read_products(text: str, summary: str) -> Iterator[ProductCreation]:
+    """
+    Read the products from an uploaded CSV/TXT file.
+
+    Each row has the product code and, optionally, its summary. Empty rows
+    and a header row are skipped.
+
+    Args:
+        - text: the decoded file content.
+        - summary: the summary for the rows that do not have one.
+
+    Returns:
+        - an iterator over the products, read lazily.
+    """
+    for row in csv.reader(text.splitlines()):
+        if not row or not row[0].strip():
+            continue
+        code = row[0].strip()
+        if code.lower() in IMPORT_HEADERS:
+            continue
+        row_summary = row[1].strip() if len(row) > 1 else ""
+        yield ProductCreation(code=code, summary=row_summary or summary)
+
+
+def import_report(
+    summary: BulkSummary, done: bool, error: BaseException = None
+) -> Embed:
+    """
+    Build the embed that reports the progress of an import.
+
+    Args:
+        - summary: the live summary of the import.
+        - done: if the import is finished.
+        - error: what interrupted the import, if anything did.
+
+    Returns:
+        - the progress embed.
+    """
+    fields = [
+        Field(key="Processados", value=str(summary.processed)),
+        Field(key="Adicionados", value=str(summary.added)),
+        Field(key="Já registrados", value=str(len(summary.duplicated))),
+        Field(key="Falhas", value=str(len(summary.failed))),
+    ]
+    if done and summary.failed:
+        fields.append(
+            Field(
+                key="Códigos não enviados",
+                value="\n".join(code for code, _ in summary.failed[:10]),
+                inline=False,
+            )
+        )
+
+    if error is not None:
+        return embed(
+            title="Importação interrompida",
+            description=f"Não consegui concluir a importação: {error!r}",
+            fields=[fields],
+            color=Colour.red(),
+        )
+    return embed(
+        title="Importação concluída" if done else "Importando produtos...",
+        fields=[fields],
+        color=Colour.green() if done else Colour.lighter_grey(),
+    )
+
+
+def answer_when_sent(
+    ctx: Context,
+    queued: "asyncio.Future",
+    operation: str,
+    answer: Callable[[Any], Optional[str]],
+):
+    """
+    Answer the author in the command channel once a queued mutation is sent.
+
+    Args:
+        - ctx: the command context.
+        - queued: the future returned by `WriteBehind.submit`.
+        - operation: the command, e.g. `add <code>`, quoted on failures.
+        - answer: builds the answer from the mutation result, if any.
+    """
+
+    def report(future: "asyncio.Future"):
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            content = answer(future.result())
+        else:
+            content = WriteBehindMessage.FAILED.value.format(
+                mention=ctx.author.mention,
+                operation=operation,
+                err_message=str(error),
+            )
+        if content:
+            outbox.send(
+                ctx.channel, content, delete_after=env.delete_message_after
+            )
+
+    queued.add_done_callback(report)
+
+
+async def queue_add(
+    ctx: Context, writer: WriteBehind, api: AsyncApi, code: str, summary: str
+):
+    """
+    Queue a product creation, then answer once it is sent.
+    """
+    operation = f"add {code}"
+    await Messages.remove_message_and_answer(
+        context=ctx,
+        message=WriteBehindMessage.QUEUED,
+        mention=ctx.author.mention,
+        operation=operation,
+    )
+    answer_when_sent(
+        ctx,
+        writer.submit(
+            api.add_product, ProductCreation(code=code, summary=summary)
+        ),
+        operation,
+        lambda product: WriteBehindMessage.ADDED.value.format(
+            mention=ctx.author.mention, code=product.code, uuid=product.uuid
+        ),
+    )
+
+
+async def queue_remove(
+    ctx: Context, writer: WriteBehind, api: AsyncApi, uuid: str
+):
+    """
+    Queue a product removal, then answer once it is sent.
+    """
+    operation = f"remove {uuid}"
+    await Messages.remove_message_and_answer(
+        context=ctx,
+        message=WriteBehindMessage.QUEUED,
+        mention=ctx.author.mention,
+        operation=operation,
+    )
+    answer_when_sent(
+        ctx,
+        writer.submit(api.delete_product, ProductDelete(uuid=uuid)),
+        operation,
+        lambda response: (
+            RemoveProductCommand.VALID.value.format(
+                mention=ctx.author.mention, uuid=uuid
+            )
+            if response.deleted
+            else None
+        ),
+    )
+
 
+async def find_products(
+    ctx: Context, index: Optional[ProductIndex], text: str
+):
+    """
+    Answer with the products that match the text, from the search index.
 
-def register(bot: Bot, api: Api):
+    Args:
+        - ctx: the command context.
+        - index: the search index, `None` when it is disabled.
+        - text: the code prefix or the summary words.
+    """
+    if not text.strip():
+        await Messages.remove_message_and_answer(
+            context=ctx,
+            message=FindProductCommand.NO_TEXT_PROVIDED,
+            mention=ctx.author.mention,
+            prefix=env.command_prefix,
+        )
+        return
+
+    if index is None:
+        await Messages.remove_message_and_answer(
+            context=ctx,
+            message=FindProductCommand.DISABLED,
+            mention=ctx.author.mention,
+        )
+        return
+
+    if not index.ready:
+        await Messages.remove_message_and_answer(
+            context=ctx,
+            message=FindProductCommand.NOT_READY,
+            mention=ctx.author.mention,
+        )
+        return
+
+    total, found = index.search(text, limit=env.search_results)
+    if not found:
+        await Messages.remove_message_and_answer(
+            context=ctx,
+            message=FindProductCommand.NOT_FOUND,
+            mention=ctx.author.mention,
+            text=text,
+        )
+        return
+
+    await ctx.message.delete()
+    with tracer.span("render embeds"):
+        for content in FOUND.pack(
+            description=f"Encontrei {total} produtos para `{text}`, "
+            f"aqui estão os {len(found)} primeiros:",
+            records=(
+                LISTED_PRODUCT(
+                    product.code,
+                    product.uuid,
+                    product.summary,
+                    format_datetime(product.created_at),
+                )
+                for product in found
+            ),
+        ):
+            outbox.send(
+                ctx.channel,
+                embed=content,
+                delete_after=env.delete_message_after,
+            )
+
+
+async def import_products(ctx: Context, api: AsyncApi, summary: str):
+    """
+    Add the products of the attached file, reporting the progress in a
+    single message, edited until the import ends.
+
+    Args:
+        - ctx: the command context.
+        - api: the API the products are added to.
+        - summary: the summary for the rows that do not have one.
+    """
+    if not ctx.message.attachments:
+        await Messages.remove_message_and_answer(
+            context=ctx,
+            message=ImportProductsCommand.NO_ATTACHMENT,
+            mention=ctx.author.mention,
+            prefix=env.command_prefix,
+        )
+        return
+
+    text = decode_attachment(await ctx.message.attachments[0].read())
+    report = BulkSummary()
+    message = await outbox.send(
+        ctx.channel, embed=import_report(summary=report, done=False)
+    )
+
+    async def report_progress():
+        while True:
+            await asyncio.sleep(env.import_progress_interval)
+            await message.edit(embed=import_report(summary=report, done=False))
+
+    progress = asyncio.ensure_future(report_progress())
+    error = None
+    try:
+        await bulk_add(
+            api=api,
+            products=read_products(text, summary=summary),
+            concurrency=env.import_concurrency,
+            summary=report,
+        )
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        progress.cancel()
+        await message.edit(
+            embed=import_report(summary=report, done=True, error=error)
+        )
+
+
+def register(
+    bot: Bot,
+    api: AsyncApi,
+    index: ProductIndex = None,
+    writer: WriteBehind = None,
+):
     @bot.command()
     async def add(
         ctx: Context,
@@ -42,12 +373,15 @@ def register(bot: Bot, api: Api):
             )
             return
 
+        if writer is not None:
+            await queue_add(ctx, writer, api, code, summary)
+            return
+
         try:
-            product = api.add_product(
+            product = await api.add_product(
                 product=ProductCreation(code=code, summary=summary)
             )
 
-            desc = "Acabei de adicionar um novo item para ser resgatado."
             fields = [
                 [
                     Field(key="UUID", value=product.uuid, inline=False),
@@ -55,21 +389,15 @@ def register(bot: Bot, api: Api):
                     Field(key="descrição", value=product.summary),
                     Field(
                         key="criado em",
-                        value=product.created_at.strftime(
-                            env.datetime_formatter
-                        ),
+                        value=format_datetime(product.created_at),
                         inline=False,
                     ),
                 ]
             ]
             await ctx.message.delete()
-            await ctx.channel.send(
-                embed=embed(
-                    title="Novo Item",
-                    description=desc,
-                    fields=fields,
-                    footer=DEFAULT_FOOTER,
-                ),
+            outbox.send(
+                ctx.channel,
+                embed=ADDED.render(fields=fields),
                 delete_after=env.delete_message_after,
             )
 
@@ -98,11 +426,10 @@ def register(bot: Bot, api: Api):
             ...
 
         try:
-            updated_product = api.edit_product(
+            updated_product = await api.edit_product(
                 product=ProductEdit(uuid=uuid, code=code, summary=summary)
             )
             if updated_product:
-                desc = "Acabei de atualizar os dados do produto."
                 fields = [
                     [
                         Field(
@@ -114,27 +441,19 @@ def register(bot: Bot, api: Api):
                         Field(key="descrição", value=updated_product.summary),
                         Field(
                             key="criado em",
-                            value=updated_product.created_at.strftime(
-                                env.datetime_formatter
-                            ),
+                            value=format_datetime(updated_product.created_at),
                             inline=False,
                         ),
                         Field(
                             key="atualizado em",
-                            value=updated_product.updated_at.strftime(
-                                env.datetime_formatter
-                            ),
+                            value=format_datetime(updated_product.updated_at),
                         ),
                     ]
                 ]
                 await ctx.message.delete()
-                await ctx.channel.send(
-                    embed=embed(
-                        title="Atualização Bem Sucedida",
-                        description=desc,
-                        fields=fields,
-                        footer=DEFAULT_FOOTER,
-                    ),
+                outbox.send(
+                    ctx.channel,
+                    embed=EDITED.render(fields=fields),
                     delete_after=env.delete_message_after,
                 )
 
@@ -159,7 +478,11 @@ def register(bot: Bot, api: Api):
             )
             return
 
-        response = api.delete_product(product=ProductDelete(uuid=uuid))
+        if writer is not None:
+            await queue_remove(ctx, writer, api, uuid)
+            return
+
+        response = await api.delete_product(product=ProductDelete(uuid=uuid))
 
         if response.deleted:
             await Messages.remove_message_and_answer(
@@ -172,17 +495,13 @@ def register(bot: Bot, api: Api):
     @bot.command()
     async def ls(ctx: Context, limit: str = "5"):
 
-        products = api.list_products(
+        products = await api.list_products(
             ProductQuery(taken=False, desc=True, limit=int(limit))
         )
 
         await ctx.message.delete()
-        await ctx.channel.send(
-            embed=embed(
-                title="Detalhamento",
-                description="Esses são os dados que tenho até o momento:",
-                thumbnail=True,
-                color=Colour.green(),
+        with tracer.span("render embeds"):
+            for content in LISTING.pack(
                 fields=[
                     [
                         Field(key="Total", value=str(products.total.all)),
@@ -195,31 +514,24 @@ def register(bot: Bot, api: Api):
                         ),
                     ]
                 ],
-            )
-        )
+                records=(
+                    LISTED_PRODUCT(
+                        product.code,
+                        product.uuid,
+                        product.summary,
+                        format_datetime(product.created_at),
+                    )
+                    for product in products.products
+                ),
+            ):
+                outbox.send(ctx.channel, embed=content)
 
-        for product in products.products:
-            await ctx.channel.send(
-                embed=embed(
-                    title=product.code,
-                    fields=[
-                        [
-                            Field(
-                                key="UUID", value=product.uuid, inline=False
-                            ),
-                            Field(key="descrição", value=product.summary),
-                            Field(
-                                key="criado em",
-                                value=product.created_at.strftime(
-                                    env.datetime_formatter
-                                ),
-                                inline=False,
-                            ),
-                        ]
-                    ],
-                )
-            )
+    @bot.command()
+    async def find(ctx: Context, *words: str):
+        await find_products(ctx, index, " ".join(words))
 
-        await ctx.channel.send(
-            embed=embed(title="Final do Relatório.", color=Colour.green())
-        )
+    @bot.command(name="import")
+    async def import_command(
+        ctx: Context, summary: str = env.default_product_summary
+    ):
+        await import_products(ctx, api, summary)
@@ -0,0 +1,253 @@
+import math
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Sequence,
+    Text,
+    Tuple,
+    Union,
+)
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+Sample = Tuple[Text, Dict[Text, Text], float]
+
+
+def format_value(value: float) -> Text:
+    """
+    Format a sample value as the Prometheus text format expects.
+    """
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def format_labels(labels: Dict[Text, Text]) -> Text:
+    """
+    Format the labels of a sample, e.g. `{method="GET"}`.
+    """
+    if not labels:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            key,
+            str(value)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"'),
+        )
+        for key, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(
+        self, name: Text, documentation: Text, labels: Sequence[Text] = ()
+    ):
+        """
+        A metric family, with one series per combination of label values.
+
+        Args:
+            - name: the metric name.
+            - documentation: the help text.
+            - labels: the label names.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+
+    def _key(self, labels: Dict[Text, Text]) -> Tuple[Text, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f"{self.name} expects the labels {self.labels}, "
+                f"got {tuple(labels)}."
+            )
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def _labels(self, key: Tuple[Text, ...]) -> Dict[Text, Text]:
+        return dict(zip(self.labels, key))
+
+    def samples(self) -> Iterator[Sample]:
+        """
+        The samples of every series.
+        """
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(
+        self,
+        name: Text,
+        documentation: Text,
+        labels: Sequence[Text] = (),
+        function: Callable[
+            [], Union[float, Dict[Tuple[object, ...], float]]
+        ] = None,
+    ):
+        """
+        A value that only goes up.
+
+        Args:
+            - function: reads the value when the metrics are collected,
+                instead of `inc`. For metrics with labels, it returns the
+                value of each series, by its label values.
+        """
+        super().__init__(name, documentation, labels)
+        self.function = function
+        self._values: Dict[Tuple[Text, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Increase the series identified by the labels.
+        """
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        """
+        The current value of the series identified by the labels.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterator[Sample]:
+        if self.function is not None and self.labels:
+            for key, value in self.function().items():
+                yield self.name, self._labels(tuple(map(str, key))), value
+        elif self.function is not None:
+            yield self.name, {}, self.function()
+        for key, value in self._values.items():
+            yield self.name, self._labels(key), value
+
+
+class Gauge(Counter):
+    """
+    A value that can go up and down.
+    """
+
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        """
+        Set the series identified by the labels.
+        """
+        self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: Text,
+        documentation: Text,
+        labels: Sequence[Text] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Count the observations in buckets, e.g. the request latencies.
+
+        Args:
+            - buckets: the upper bounds of the buckets, in ascending order.
+        """
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[Text, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        """
+        Count an observation in the series identified by the labels.
+        """
+        # Each series keeps a count per bucket, then the +Inf count and sum.
+        series = self._series.setdefault(
+            self._key(labels), [0] * (len(self.buckets) + 2)
+        )
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += 1
+        series[-1] += value
+
+    def count(self, **labels) -> int:
+        """
+        How many observations the series identified by the labels has.
+        """
+        series = self._series.get(self._key(labels))
+        return 0 if series is None else series[-2]
+
+    def samples(self) -> Iterator[Sample]:
+        for key, series in self._series.items():
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                yield f"{self.name}_bucket", {
+                    **labels,
+                    "le": format_value(bound),
+                }, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, series[-2]
+            yield f"{self.name}_sum", labels, series[-1]
+            yield f"{self.name}_count", labels, series[-2]
+
+
+class Registry:
+    def __init__(self):
+        """
+        The metrics exposed by the bot.
+        """
+        self._metrics: Dict[Text, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """
+        Add a metric, or return the one already registered with its name.
+        """
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: Text, documentation: Text, **kwargs) -> Counter:
+        return self.register(Counter(name, documentation, **kwargs))
+
+    def gauge(self, name: Text, documentation: Text, **kwargs) -> Gauge:
+        return self.register(Gauge(name, documentation, **kwargs))
+
+    def histogram(
+        self, name: Text, documentation: Text, **kwargs
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, **kwargs))
+
+    def render(self) -> Text:
+        """
+        Render every metric in the Prometheus text format.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(
+                    f"{name}{format_labels(labels)} {format_value(value)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+metrics: Registry = Registry()
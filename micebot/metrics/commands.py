@@ -0,0 +1,54 @@
+import time
+
+from discord.ext.commands import Bot, Context
+
+from micebot.metrics import metrics
+from micebot.tracing import tracer
+
+COMMAND_DURATION = metrics.histogram(
+    "micebot_command_duration_seconds",
+    "Time spent running the commands.",
+    labels=("command",),
+)
+COMMAND_ERRORS = metrics.counter(
+    "micebot_command_errors_total",
+    "Commands that raised an error.",
+    labels=("command",),
+)
+
+
+def instrument(bot: Bot):
+    """
+    Time and trace every command, and count the ones that fail.
+
+    The timing starts once the arguments are parsed and stops when the
+    command returns, so it measures the bot and the API, while the Discord
+    latency is measured by the outbox and the gateway latency gauge. The
+    command span is the parent of the spans started while it runs.
+
+    Args:
+        - bot: the bot whose commands are measured.
+    """
+    metrics.gauge(
+        "micebot_discord_gateway_latency_seconds",
+        "Latency between a gateway heartbeat and its acknowledgement.",
+        function=lambda: bot.latency,
+    )
+
+    @bot.before_invoke
+    async def start_timer(ctx: Context):
+        ctx.span = tracer.start(
+            f"command {ctx.command.qualified_name}", channel=ctx.channel.id,
+        )
+        ctx.started_at = time.perf_counter()
+
+    @bot.after_invoke
+    async def record_timing(ctx: Context):
+        command = ctx.command.qualified_name
+        COMMAND_DURATION.observe(
+            time.perf_counter() - ctx.started_at, command=command
+        )
+        if ctx.command_failed:
+            COMMAND_ERRORS.inc(command=command)
+        ctx.span.set(failed=ctx.command_failed)
+        tracer.finish(ctx.span)
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+
+from micebot.metrics import Registry, metrics
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+logger = logging.getLogger(__name__)
+
+
+async def serve(
+    host: str = "127.0.0.1", port: int = 9100, registry: Registry = metrics
+) -> asyncio.AbstractServer:
+    """
+    Expose the metrics on `GET /metrics`, in the Prometheus text format.
+
+    The server runs on the bot event loop, so the metrics are read without
+    any locking.
+
+    Args:
+        - host: the interface to listen on.
+        - port: the port to listen on.
+        - registry: the metrics to be exposed.
+
+    Returns:
+        - the running server.
+    """
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass
+
+            method, path, *_ = request.decode("latin-1").split() + ["", ""]
+            if method == "GET" and path.split("?")[0] == "/metrics":
+                status, body = "200 OK", registry.render().encode()
+            else:
+                status, body = "404 Not Found", b"Not Found\n"
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: {CONTENT_TYPE}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug("Metrics request failed: %r", e)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("Serving the metrics on http://%s:%d/metrics", host, port)
+    return server
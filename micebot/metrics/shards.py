@@ -0,0 +1,66 @@
+from typing import Optional
+
+from discord.ext.commands import AutoShardedBot
+
+from micebot.metrics import metrics
+
+SHARD_EVENTS = metrics.counter(
+    "micebot_discord_shard_events_total",
+    "Gateway events received, by shard.",
+    labels=("shard",),
+)
+
+# The events whose guild id is the `id` of their payload.
+GUILD_EVENTS = ("GUILD_CREATE", "GUILD_UPDATE", "GUILD_DELETE")
+
+
+def shard_of(payload: dict, shard_count: int) -> Optional[int]:
+    """
+    Find the shard that received a gateway event, as Discord routes them.
+
+    Args:
+        - payload: the gateway payload.
+        - shard_count: how many shards the bot runs.
+
+    Returns:
+        - the shard id, or `None` for the events not bound to a guild.
+    """
+    data = payload.get("d")
+    if not isinstance(data, dict):
+        return None
+    guild_id = data.get("guild_id")
+    if guild_id is None and payload.get("t") in GUILD_EVENTS:
+        guild_id = data.get("id")
+    if guild_id is None:
+        return None
+    return (int(guild_id) >> 22) % shard_count
+
+
+def instrument_shards(bot: AutoShardedBot):
+    """
+    Report the latency and count the gateway events of every shard.
+
+    The events that are not bound to a guild, e.g. the heartbeats and the
+    direct messages, are counted under the `none` shard.
+
+    Args:
+        - bot: the sharded bot whose shards are measured.
+    """
+    metrics.gauge(
+        "micebot_discord_shard_latency_seconds",
+        "Latency between a heartbeat and its acknowledgement, by shard.",
+        labels=("shard",),
+        function=lambda: {
+            (shard_id,): latency for shard_id, latency in bot.latencies
+        },
+    )
+    metrics.gauge(
+        "micebot_discord_shards",
+        "How many shards the bot runs, in all its processes.",
+        function=lambda: bot.shard_count or 0,
+    )
+
+    @bot.listen("on_socket_response")
+    async def count_event(payload: dict):
+        shard = shard_of(payload, bot.shard_count or 1)
+        SHARD_EVENTS.inc(shard="none" if shard is None else shard)
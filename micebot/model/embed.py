@@ -1,4 +1,6 @@
-from typing import List
+from datetime import datetime, tzinfo
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Optional
 
 from attr import dataclass
 from discord import Embed, Colour
@@ -52,3 +54,215 @@ def embed(
     if footer:
         embed_content.set_footer(text=footer)
     return embed_content
+
+
+EMBED_MAX_FIELDS = 25
+EMBED_MAX_CHARACTERS = 6000
+FIELD_NAME_MAX_CHARACTERS = 256
+FIELD_VALUE_MAX_CHARACTERS = 1024
+
+
+class EmbedTemplate:
+    def __init__(
+        self,
+        title: str = None,
+        description: str = None,
+        footer: str = None,
+        color: Colour = Colour.lighter_grey(),
+        thumbnail: bool = False,
+    ):
+        """
+        An embed whose static parts are built once, then rendered many
+        times with different fields.
+
+        The title, the color, the thumbnail and the footer are kept as the
+        attributes of a prebuilt embed, so rendering only copies them and
+        appends the fields, without `Embed.__init__` and its setters.
+
+        Args:
+            - title: the title of the embed.
+            - description: the default description of the embed.
+            - footer: the optional footer of the embed.
+            - color: the color of the embed.
+            - thumbnail: if the default thumbnail is added to the embed.
+        """
+        self.title = title
+        self.description = description
+        self.footer = {"text": footer} if footer else None
+        self.head = self.state(
+            embed(
+                title=title,
+                description=description,
+                color=color,
+                thumbnail=thumbnail,
+            )
+        )
+        self.tail = self.state(Embed(colour=color))
+
+    @staticmethod
+    def state(content: Embed) -> dict:
+        return {
+            slot: getattr(content, slot)
+            for slot in Embed.__slots__
+            if hasattr(content, slot)
+        }
+
+    @staticmethod
+    def build(
+        state: dict, fields: List[dict], footer: Optional[dict] = None
+    ) -> Embed:
+        # The fields and the footer are kept as `Embed.add_field` and
+        # `Embed.set_footer` keep them.
+        content = Embed.__new__(Embed)
+        for slot, value in state.items():
+            setattr(content, slot, value)
+        if fields:
+            content._fields = fields
+        if footer:
+            content._footer = footer
+        return content
+
+    def render(
+        self, fields: List[List[Field]] = None, description: str = None
+    ) -> Embed:
+        """
+        Create an embed from the template.
+
+        Args:
+            - fields: the fields to be added, as in `embed`.
+            - description: replaces the default description.
+
+        Returns:
+            - the embed instance.
+        """
+        state = self.head
+        if description is not None:
+            state = dict(state, description=description)
+        return self.build(
+            state,
+            fields=[
+                {
+                    "inline": field.inline,
+                    "name": field.key,
+                    "value": field.value,
+                }
+                for line in fields or ()
+                for field in line
+            ],
+            footer=self.footer,
+        )
+
+    def pack(
+        self,
+        records: Iterable[Field],
+        fields: List[List[Field]] = None,
+        description: str = None,
+    ) -> Iterator[Embed]:
+        """
+        Pack many records into as few embeds as the Discord limits allow.
+
+        The first embed carries the title, the description and the header
+        fields. The records fill it up to the field count and the character
+        limits of an embed, the remaining ones overflow to untitled embeds of
+        the same color. The footer is added to the last embed.
+
+        Args:
+            - records: the records, as built by a `RecordTemplate`.
+            - fields: the header fields of the first embed.
+            - description: replaces the default description.
+
+        Returns:
+            - an iterator over the embeds, one per message to be sent.
+        """
+        state = self.head
+        if description is not None:
+            state = dict(state, description=description)
+        else:
+            description = self.description
+
+        current = [
+            {"inline": field.inline, "name": field.key, "value": field.value}
+            for line in fields or ()
+            for field in line
+        ]
+        reserved = len(self.footer["text"]) if self.footer else 0
+        characters = reserved + len(self.title or "") + len(description or "")
+        characters += sum(
+            len(field["name"]) + len(field["value"]) for field in current
+        )
+
+        for field in records:
+            name = field.key[:FIELD_NAME_MAX_CHARACTERS]
+            value = field.value[:FIELD_VALUE_MAX_CHARACTERS]
+
+            if (
+                len(current) >= EMBED_MAX_FIELDS
+                or characters + len(name) + len(value) > EMBED_MAX_CHARACTERS
+            ):
+                yield self.build(state, current)
+                state = self.tail
+                current = []
+                characters = reserved
+
+            current.append(
+                {"inline": field.inline, "name": name, "value": value}
+            )
+            characters += len(name) + len(value)
+
+        yield self.build(state, current, footer=self.footer)
+
+
+class RecordTemplate:
+    def __init__(self, *keys: str):
+        """
+        A record whose lines are compiled once into a format string.
+
+        A key may hold named `str.format` fields, which are filled from the
+        keyword arguments of the rendering, e.g. `"Código do {summary}"`.
+
+        Args:
+            - keys: the attribute names, one line each.
+        """
+        self.keys = keys
+        self.format = "\n".join(
+            f"**{key}:** {{{index}}}" for index, key in enumerate(keys)
+        ).format
+
+    def __call__(self, title: str, *values: str, **names: str) -> Field:
+        """
+        Render a record, one line per attribute.
+
+        Args:
+            - title: the record title, used as the field name.
+            - values: the attribute values, in the order of the keys.
+            - names: the named fields of the keys.
+
+        Returns:
+            - the field that represents the record.
+        """
+        return Field(
+            key=title, value=self.format(*values, **names), inline=False
+        )
+
+
+@lru_cache(maxsize=4096)
+def _strftime(value: datetime, zone: Optional[tzinfo], formatter: str) -> str:
+    return value.strftime(formatter)
+
+
+def format_datetime(value: datetime) -> str:
+    """
+    Format a datetime with `env.datetime_formatter`, memoised.
+
+    The listings show the same dates again on every page and command, so
+    the formatted strings are kept for the most recent datetimes.
+
+    Args:
+        - value: the datetime to be formatted.
+
+    Returns:
+        - the formatted datetime.
+    """
+    # Aware datetimes compare equal across time zones, but are formatted in
+    # their own, so the zone is part of the key.
+    return _strftime(value, value.tzinfo, env.datetime_formatter)
@@ -1,18 +1,63 @@
+from typing import List
+
 from pydantic import BaseSettings
 
 
 class Environment(BaseSettings):
     api_endpoint: str = "http://localhost:8000"
+    api_max_connections: int = 100
+    api_max_keepalive: int = 10
+    api_timeout: float = 5.0
+    api_token_ttl: float = 900
+    api_token_refresh_margin: float = 60
+    api_cache_ttl: float = 10
+    api_cache_size: int = 128
+    api_retry_attempts: int = 3
+    api_retry_base: float = 0.2
+    api_retry_cap: float = 5.0
+    api_breaker_threshold: int = 5
+    api_breaker_reset: float = 30
+    api_preload: bool = True
+    api_trust_responses: bool = True
+    api_json_codec: str = "auto"
+    api_idempotency_ttl: float = 3600
+    api_idempotency_size: int = 1024
     datetime_formatter: str = "%d/%m/%Y %H:%M:%S"
+    date_formatter: str = "%d/%m/%Y"
     discord_user: str = "ds_user"
     discord_pass: str = "ds_pass"
     discord_token: str = (
         "NzM0NTY1MDE4ODkyMzY5OTYx.XxTi_A.NgY6B4BYXUvx_HLJNmu9c2CEFhU"
     )
     command_prefix: str = "!mice "
+    discord_sharded: bool = False
+    discord_shard_count: int = 0
+    discord_shard_ids: List[int] = []
     thumbnail_url: str = "https://raw.githubusercontent.com/micebot/assets/master/images/logo-64x64.png"  # noqa
     default_product_summary: str = "E-Book"
     delete_message_after: int = 30
+    outbox_rate: int = 5
+    outbox_per: float = 5.0
+    import_concurrency: int = 16
+    import_progress_interval: float = 2.0
+    write_behind: bool = False
+    write_behind_batch: int = 20
+    write_behind_interval: float = 2.0
+    write_behind_concurrency: int = 8
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 9100
+    trace_file: str = ""
+    trace_max_bytes: int = 10_000_000
+    trace_backups: int = 3
+    mirror_path: str = "micebot.sqlite3"
+    mirror_interval: float = 30
+    mirror_full_sync_every: float = 3600
+    search_index: bool = True
+    search_interval: float = 3600
+    search_results: int = 10
+    permission_ttl: float = 300
+    shared_store_path: str = ""
+    workers: int = 0
 
 
 env: Environment = Environment()
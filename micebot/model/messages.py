@@ -3,6 +3,7 @@ import enum
 from discord.ext.commands import Context
 
 from micebot.model.env import env
+from micebot.model.outbox import outbox
 
 
 class Messages:
@@ -11,7 +12,8 @@ class Messages:
         context: Context, message: enum.Enum, **kwargs
     ):
         await context.message.delete()
-        await context.channel.send(
+        outbox.send(
+            context.channel,
             message.value.format(**kwargs),
             delete_after=env.delete_message_after,
         )
@@ -36,6 +38,15 @@ class AddProductCommand(enum.Enum):
     )
 
 
+class ImportProductsCommand(enum.Enum):
+    NO_ATTACHMENT = (
+        "Hey {mention}, para importar os produtos é necessário anexar um "
+        "arquivo CSV ou TXT com um código por linha (e, opcionalmente, a "
+        "descrição separada por vírgula). "
+        "Exemplo: `{prefix} import <descrição>`"
+    )
+
+
 class EditProductCommand(enum.Enum):
     ...
 
@@ -46,3 +57,41 @@ class RemoveProductCommand(enum.Enum):
         "necessário que você me informe o UUID do produto."
     )
     VALID = "Hey {mention}, acabei de remover o produto com UUID {uuid}."
+
+
+class StatsCommand(enum.Enum):
+    NO_ORDERS = (
+        "Hey {mention}, nenhum item foi resgatado ainda, então não tenho "
+        "estatísticas para mostrar."
+    )
+
+
+class FindProductCommand(enum.Enum):
+    NO_TEXT_PROVIDED = (
+        "Hey {mention}, me diga o que devo procurar: o início do código ou "
+        "palavras da descrição. Exemplo: `{prefix} find <texto>`"
+    )
+    NOT_READY = (
+        "Hey {mention}, ainda estou indexando os produtos, tente novamente "
+        "em instantes."
+    )
+    NOT_FOUND = "Hey {mention}, não encontrei nenhum produto para `{text}`."
+    DISABLED = "Hey {mention}, a busca de produtos está desativada."
+
+
+class PermissionMessage(enum.Enum):
+    MISSING_PERMISSION = (
+        "Hey {mention}, você não tem permissão para usar os meus comandos."
+    )
+
+
+class WriteBehindMessage(enum.Enum):
+    QUEUED = (
+        "Hey {mention}, `{operation}` está na fila ⏳ e será enviado em "
+        "instantes, te aviso quando terminar."
+    )
+    ADDED = "Hey {mention}, o produto `{code}` foi adicionado com UUID {uuid}."
+    FAILED = (
+        "Hey {mention}, não consegui concluir `{operation}`. "
+        "Talvez essa informação possa ajudar: {err_message}"
+    )
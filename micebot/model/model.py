@@ -46,6 +46,7 @@ class ProductResponse(BaseModel):
 class ProductQuery(BaseModel):
     taken: bool = False
     desc: bool = True
+    skip: int = 0
     limit: int = 0
 
 
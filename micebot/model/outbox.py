@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+from discord import Embed, Message
+from discord.abc import Messageable
+
+from micebot.metrics import metrics
+from micebot.model.env import env
+from micebot.tracing import Span, tracer
+
+MESSAGE_MAX_CHARACTERS = 2000
+
+SEND_DURATION = metrics.histogram(
+    "micebot_discord_send_duration_seconds",
+    "Time spent by Discord to accept a message.",
+)
+SEND_ERRORS = metrics.counter(
+    "micebot_discord_send_errors_total",
+    "Messages that Discord failed to accept.",
+)
+QUEUE_WAIT = metrics.histogram(
+    "micebot_outbox_wait_seconds",
+    "Time the messages waited in the outbox, rate limits included.",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxStats(NamedTuple):
+    depth: int
+    channels: int
+    sent: int
+    coalesced: int
+    wait_total: float
+    wait_max: float
+
+
+class Bucket:
+    def __init__(
+        self,
+        rate: int,
+        per: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Token bucket that mirrors a Discord rate-limit bucket.
+
+        Args:
+            - rate: how many messages can be sent in a window.
+            - per: the window length, in seconds.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self.tokens = float(rate)
+        self.updated_at = clock()
+
+    def delay(self) -> float:
+        """
+        Take a token from the bucket.
+
+        Returns:
+            - how many seconds the caller must wait before sending. When it
+                is greater than zero, no token was taken.
+        """
+        now = self.clock()
+        self.tokens = min(
+            self.rate,
+            self.tokens + (now - self.updated_at) * self.rate / self.per,
+        )
+        self.updated_at = now
+
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+
+class Outgoing:
+    __slots__ = (
+        "content",
+        "embed",
+        "delete_after",
+        "future",
+        "queued_at",
+        "span",
+    )
+
+    def __init__(
+        self,
+        content,
+        embed,
+        delete_after,
+        future,
+        queued_at,
+        span: Optional[Span] = None,
+    ):
+        self.content = content
+        self.embed = embed
+        self.delete_after = delete_after
+        self.future = future
+        self.queued_at = queued_at
+        self.span = span
+
+    def merge(self, other: "Outgoing") -> bool:
+        """
+        Append a plain text message to this one, if both fit together.
+
+        Returns:
+            - `True` if the message was merged.
+        """
+        if (
+            self.embed is not None
+            or other.embed is not None
+            or self.delete_after != other.delete_after
+            or len(self.content) + len(other.content) + 1
+            > MESSAGE_MAX_CHARACTERS
+        ):
+            return False
+        self.content = f"{self.content}\n{other.content}"
+        return True
+
+
+class Outbox:
+    def __init__(
+        self,
+        rate: int = 5,
+        per: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Schedule the outbound messages, one queue per channel.
+
+        The messages are sent in the background, so the command handlers
+        return right away. Each channel is paced by its own rate-limit
+        bucket, and plain text messages waiting for the same channel are
+        coalesced into a single message.
+
+        Args:
+            - rate: how many messages a channel accepts in a window.
+            - per: the window length, in seconds.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.rate = rate
+        self.per = per
+        self.clock = clock
+        self.sent = 0
+        self.coalesced = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._queues: Dict[int, Deque[Outgoing]] = {}
+        self._buckets: Dict[int, Bucket] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+
+    @property
+    def stats(self) -> OutboxStats:
+        """
+        The queue depth and wait-time metrics.
+        """
+        return OutboxStats(
+            depth=sum(len(queue) for queue in self._queues.values()),
+            channels=len(self._workers),
+            sent=self.sent,
+            coalesced=self.coalesced,
+            wait_total=self.wait_total,
+            wait_max=self.wait_max,
+        )
+
+    def depth(self, channel: Messageable) -> int:
+        """
+        How many messages are waiting for a channel.
+        """
+        return len(self._queues.get(channel.id, ()))
+
+    def send(
+        self,
+        channel: Messageable,
+        content: str = None,
+        *,
+        embed: Embed = None,
+        delete_after: float = None,
+    ) -> "asyncio.Future[Message]":
+        """
+        Queue a message to be sent.
+
+        Args:
+            - channel: the destination channel.
+            - content: the message text.
+            - embed: the message embed.
+            - delete_after: delete the message after this many seconds.
+
+        Returns:
+            - a future resolved with the sent message. Awaiting it is only
+                needed when the message is used afterwards.
+        """
+        loop = asyncio.get_event_loop()
+        outgoing = Outgoing(
+            content=content,
+            embed=embed,
+            delete_after=delete_after,
+            future=loop.create_future(),
+            queued_at=self.clock(),
+            span=tracer.current(),
+        )
+        self._queues.setdefault(channel.id, deque()).append(outgoing)
+
+        if channel.id not in self._workers:
+            self._workers[channel.id] = loop.create_task(self._drain(channel))
+        return outgoing.future
+
+    async def join(self):
+        """
+        Wait until every queued message is sent.
+        """
+        while self._workers:
+            await asyncio.gather(
+                *self._workers.values(), return_exceptions=True
+            )
+
+    async def _drain(self, channel: Messageable):
+        queue = self._queues[channel.id]
+        bucket = self._buckets.setdefault(
+            channel.id, Bucket(self.rate, self.per, clock=self.clock)
+        )
+
+        try:
+            while queue:
+                delay = bucket.delay()
+                if delay:
+                    await asyncio.sleep(delay)
+                    continue
+
+                batch = [queue.popleft()]
+                while queue and batch[0].merge(queue[0]):
+                    batch.append(queue.popleft())
+                    self.coalesced += 1
+
+                now = self.clock()
+                for outgoing in batch:
+                    waited = now - outgoing.queued_at
+                    self.wait_total += waited
+                    self.wait_max = max(self.wait_max, waited)
+                    QUEUE_WAIT.observe(waited)
+
+                await self._send(channel, batch, now)
+        finally:
+            del self._workers[channel.id]
+            if not queue:
+                del self._queues[channel.id]
+
+    async def _send(
+        self, channel: Messageable, batch: List[Outgoing], now: float
+    ):
+        """
+        Send a batch of coalesced messages and resolve their futures.
+
+        Args:
+            - channel: the destination channel.
+            - batch: the messages, merged into the first one.
+            - now: when the batch left the queue.
+        """
+        message: Optional[Message] = None
+        error: Optional[Exception] = None
+        span = tracer.start(
+            "discord send",
+            parent=batch[0].span,
+            channel=channel.id,
+            messages=len(batch),
+            waited=now - batch[0].queued_at,
+        )
+        try:
+            message = await channel.send(
+                batch[0].content,
+                embed=batch[0].embed,
+                delete_after=batch[0].delete_after,
+            )
+            self.sent += 1
+        except Exception as e:
+            logger.warning("Failed to send a message: %r", e)
+            SEND_ERRORS.inc()
+            error = e
+        finally:
+            tracer.finish(span, error=error)
+        SEND_DURATION.observe(self.clock() - now)
+
+        for outgoing in batch:
+            if outgoing.future.done():
+                continue
+            if error is None:
+                outgoing.future.set_result(message)
+            else:
+                outgoing.future.set_exception(error)
+                # Already logged, the sender may not await it.
+                outgoing.future.exception()
+
+
+outbox: Outbox = Outbox(rate=env.outbox_rate, per=env.outbox_per)
+
+metrics.gauge(
+    "micebot_outbox_depth",
+    "Messages waiting in the outbox.",
+    function=lambda: outbox.stats.depth,
+)
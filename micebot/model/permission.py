@@ -1,6 +1,12 @@
-from typing import List
+import sys
+import time
+import traceback
+from typing import Callable, Dict, FrozenSet, List, Tuple
 
-from discord import Role
+from discord import Guild, Member, Role
+from discord.ext.commands import Bot, CheckFailure, Context
+
+from micebot.model.messages import Messages, PermissionMessage
 
 ROLE_PERMISSION = ["admin"]
 
@@ -10,3 +16,138 @@ def can_use_command(roles: List[Role]) -> bool:
         if role.name.lower() in ROLE_PERMISSION:
             return True
     return False
+
+
+class MissingPermission(CheckFailure):
+    """The author has none of the `ROLE_PERMISSION` roles."""
+
+
+class PermissionCache:
+    def __init__(
+        self, ttl: float = 300, clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Cache the decision of `can_use_command` per guild and member.
+
+        The `ROLE_PERMISSION` names are resolved to role ids once per
+        guild, so a decision compares ids only. The decisions are dropped
+        when the roles of a member or of a guild change. The member
+        updates are only dispatched with the members intent, so the
+        decisions also expire after `ttl` seconds.
+
+        Args:
+            - ttl: how many seconds a decision is kept.
+            - clock: the monotonic clock, replaceable by the tests.
+        """
+        self.ttl = ttl
+        self.clock = clock
+        self.roles: Dict[int, FrozenSet[int]] = {}
+        self.decisions: Dict[int, Dict[int, Tuple[float, bool]]] = {}
+
+    def allowed_roles(self, guild: Guild) -> FrozenSet[int]:
+        """
+        The ids of the guild roles that allow the commands.
+        """
+        roles = self.roles.get(guild.id)
+        if roles is None:
+            roles = self.roles[guild.id] = frozenset(
+                role.id for role in guild.roles if can_use_command([role])
+            )
+        return roles
+
+    def can_use(self, member: Member) -> bool:
+        """
+        Tell if a member may use the commands.
+
+        Args:
+            - member: the command author.
+
+        Returns:
+            - `True` if the member has any of the `ROLE_PERMISSION` roles.
+        """
+        now = self.clock()
+        decisions = self.decisions.setdefault(member.guild.id, {})
+        decision = decisions.get(member.id)
+        if decision is None or decision[0] <= now:
+            allowed = self.allowed_roles(member.guild)
+            decision = decisions[member.id] = (
+                now + self.ttl,
+                any(role.id in allowed for role in member.roles),
+            )
+        return decision[1]
+
+    def forget_member(self, member: Member):
+        """
+        Drop the decision of a member, e.g. when its roles changed.
+        """
+        self.decisions.get(member.guild.id, {}).pop(member.id, None)
+
+    def forget_guild(self, guild: Guild):
+        """
+        Drop the roles and the decisions of a guild, e.g. when a role was
+        renamed.
+        """
+        self.roles.pop(guild.id, None)
+        self.decisions.pop(guild.id, None)
+
+    async def check(self, ctx: Context) -> bool:
+        """
+        Let the command run only for the members that may use it.
+
+        Raises:
+            MissingPermission: in a direct message, or when the author
+                has none of the `ROLE_PERMISSION` roles.
+        """
+        if ctx.guild is None or not self.can_use(ctx.author):
+            raise MissingPermission()
+        return True
+
+    async def report_error(self, ctx: Context, error: Exception):
+        """
+        Answer a `MissingPermission`, print the other command errors.
+        """
+        if isinstance(error, MissingPermission):
+            if ctx.guild is not None:
+                await Messages.remove_message_and_answer(
+                    context=ctx,
+                    message=PermissionMessage.MISSING_PERMISSION,
+                    mention=ctx.author.mention,
+                )
+            return
+        print(f"Ignoring exception in command {ctx.command}:", file=sys.stderr)
+        traceback.print_exception(
+            type(error), error, error.__traceback__, file=sys.stderr
+        )
+
+    def register(self, bot: Bot):
+        """
+        Check the permission of every command of the bot.
+
+        A denied command is answered with `MissingPermission`, which is
+        reported to the author, while the other errors are still printed
+        as the default handler of the bot does.
+
+        Args:
+            - bot: the bot whose commands are guarded.
+        """
+        bot.add_check(self.check)
+        bot.add_listener(self.report_error, "on_command_error")
+
+        @bot.listen("on_member_update")
+        async def forget_member(before: Member, after: Member):
+            if before.roles != after.roles:
+                self.forget_member(after)
+
+        @bot.listen("on_member_remove")
+        async def forget_removed_member(member: Member):
+            self.forget_member(member)
+
+        @bot.listen("on_guild_role_create")
+        @bot.listen("on_guild_role_delete")
+        async def forget_guild_roles(role: Role):
+            self.forget_guild(role.guild)
+
+        @bot.listen("on_guild_role_update")
+        async def forget_updated_role(before: Role, after: Role):
+            if before.name != after.name:
+                self.forget_guild(after.guild)
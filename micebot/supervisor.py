@@ -0,0 +1,177 @@
+"""
+Run the bot in several worker processes, each owning a subset of shards.
+
+The workers are `python -m micebot` processes in sharded mode. They share
+the access token and the cached listings through a `SharedStore` file,
+which replaces the per-process mirror, and each one serves its metrics on
+its own port. Without the mirror, each worker would download the whole
+listing to build its search index, so `find` is disabled in the workers.
+A worker that exits is restarted after a backoff, and the workers are
+stopped along with the supervisor.
+
+Usage:
+    WORKERS=4 DISCORD_SHARD_COUNT=8 python -m micebot.supervisor
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from micebot.model.env import env
+
+DEFAULT_STORE_PATH = "micebot-shared.sqlite3"
+
+
+def plan(workers: int, shard_count: int) -> List[List[int]]:
+    """
+    Spread the shards over the workers, round-robin.
+
+    Args:
+        - workers: how many worker processes run.
+        - shard_count: how many shards the bot runs in all.
+
+    Raises:
+        ValueError: when there are fewer shards than workers.
+
+    Returns:
+        - the shard ids of each worker.
+    """
+    if shard_count < workers:
+        raise ValueError(
+            f"{workers} workers need at least {workers} shards, "
+            f"got {shard_count}."
+        )
+    return [list(range(shard_count))[i::workers] for i in range(workers)]
+
+
+def worker_environ(
+    index: int, shard_ids: List[int], shard_count: int, store_path: str
+) -> Dict[str, str]:
+    """
+    The environment of a worker process.
+    """
+    environ = dict(
+        os.environ,
+        DISCORD_SHARDED="1",
+        DISCORD_SHARD_COUNT=str(shard_count),
+        DISCORD_SHARD_IDS=json.dumps(shard_ids),
+        SHARED_STORE_PATH=store_path,
+        MIRROR_PATH="",
+        SEARCH_INDEX="0",
+    )
+    if env.metrics_port:
+        environ["METRICS_PORT"] = str(env.metrics_port + index)
+    if env.trace_file:
+        environ["TRACE_FILE"] = f"{env.trace_file}.{index}"
+    return environ
+
+
+class Supervisor:
+    def __init__(
+        self,
+        workers: int,
+        shard_count: int,
+        store_path: str,
+        backoff: float = 1.0,
+        max_backoff: float = 60.0,
+    ):
+        """
+        Start, watch and stop the worker processes.
+
+        Args:
+            - workers: how many worker processes run.
+            - shard_count: how many shards the bot runs in all.
+            - store_path: the `SharedStore` file of the workers.
+            - backoff: the seconds before a worker is first restarted,
+                doubled on each restart, until a worker stays up for
+                `max_backoff` seconds.
+            - max_backoff: the longest wait before a restart.
+        """
+        self.shards = plan(workers, shard_count)
+        self.shard_count = shard_count
+        self.store_path = store_path
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.processes: List[Optional[subprocess.Popen]] = [None] * workers
+        self.restarts = [0] * workers
+        self.restart_at = [0.0] * workers
+        self.started_at = [0.0] * workers
+        self.stopping = False
+
+    def spawn(self, index: int):
+        self.started_at[index] = time.monotonic()
+        self.processes[index] = subprocess.Popen(
+            [sys.executable, "-m", "micebot"],
+            env=worker_environ(
+                index, self.shards[index], self.shard_count, self.store_path
+            ),
+        )
+        print(
+            f"Worker {index} started (pid {self.processes[index].pid}, "
+            f"shards {self.shards[index]})."
+        )
+
+    def watch(self):
+        """
+        Restart the workers that exited, once their backoff elapsed.
+        """
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process is not None and process.poll() is None:
+                continue
+            if process is not None:
+                if now - self.started_at[index] >= self.max_backoff:
+                    self.restarts[index] = 0
+                delay = min(
+                    self.backoff * 2 ** self.restarts[index], self.max_backoff
+                )
+                print(
+                    f"Worker {index} exited with {process.returncode}, "
+                    f"restarting in {delay:.0f}s."
+                )
+                self.processes[index] = None
+                self.restarts[index] += 1
+                self.restart_at[index] = now + delay
+            if now >= self.restart_at[index]:
+                self.spawn(index)
+
+    def stop(self, *args):
+        """
+        Stop the workers, e.g. on SIGTERM.
+        """
+        self.stopping = True
+        for process in self.processes:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            if process is not None:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    def run(self, interval: float = 1.0):
+        signal.signal(signal.SIGTERM, self.stop)
+        try:
+            while not self.stopping:
+                self.watch()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stop()
+
+
+def main():
+    workers = env.workers or os.cpu_count() or 1
+    supervisor = Supervisor(
+        workers=workers,
+        shard_count=env.discord_shard_count or workers,
+        store_path=env.shared_store_path or DEFAULT_STORE_PATH,
+    )
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Text
+
+Exporter = Callable[[Dict[Text, Any]], None]
+
+_current: "ContextVar[Optional[Span]]" = ContextVar("span", default=None)
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "error",
+        "started_at",
+        "_start",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        name: Text,
+        trace_id: Text,
+        parent_id: Optional[Text],
+        attributes: Dict[Text, Any],
+    ):
+        """
+        A timed operation, e.g. a command, an API call or a Discord send.
+
+        Args:
+            - name: what the span measures.
+            - trace_id: the trace shared by the spans of a command.
+            - parent_id: the enclosing span, if any.
+            - attributes: extra details, exported with the span.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.error: Optional[Text] = None
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._token = None
+
+    def set(self, **attributes):
+        """
+        Add attributes to the span.
+        """
+        self.attributes.update(attributes)
+
+
+class NoopSpan(Span):
+    """
+    The span handed out while tracing is disabled. It records nothing.
+    """
+
+    def __init__(self):
+        super().__init__("noop", "", None, {})
+
+    def set(self, **attributes):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class JsonlExporter:
+    def __init__(self, path: Text, max_bytes: int, backups: int):
+        """
+        Append the finished spans to a rotating JSON lines file.
+
+        Args:
+            - path: the file path.
+            - max_bytes: the file size that triggers a rotation.
+            - backups: how many rotated files are kept.
+        """
+        from logging.handlers import RotatingFileHandler
+
+        handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger = logging.getLogger(f"{__name__}.{path}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.logger.addHandler(handler)
+
+    def __call__(self, span: Dict[Text, Any]):
+        self.logger.info(json.dumps(span, default=str))
+
+
+class Tracer:
+    def __init__(self, exporter: Exporter = None):
+        """
+        Build the spans of each command and hand them to an exporter.
+
+        The current span follows the asyncio context, so the spans started
+        while a command runs, including in the tasks it creates, are its
+        children. Tracing is disabled while there is no exporter.
+
+        Args:
+            - exporter: called with each finished span, as a dict.
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        """
+        If the spans are recorded.
+        """
+        return self.exporter is not None
+
+    def current(self) -> Optional[Span]:
+        """
+        The span of the running code, if any.
+        """
+        return _current.get()
+
+    def start(
+        self, name: Text, parent: Optional[Span] = None, **attributes
+    ) -> Span:
+        """
+        Start a span and make it the current one.
+
+        Args:
+            - name: what the span measures.
+            - parent: the enclosing span. The current span by default.
+            - attributes: extra details, exported with the span.
+
+        Returns:
+            - the started span, to be passed to `finish`.
+        """
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = parent or _current.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else os.urandom(16).hex(),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        span._token = _current.set(span)
+        return span
+
+    def finish(self, span: Span, error: BaseException = None):
+        """
+        Finish a span, restore its parent as the current one and export it.
+
+        Args:
+            - span: the span returned by `start`.
+            - error: the exception that ended the span, if any.
+        """
+        if span is NOOP_SPAN:
+            return
+
+        duration = time.perf_counter() - span._start
+        try:
+            _current.reset(span._token)
+        except (RuntimeError, ValueError):
+            # Finished from another context, which keeps its own span.
+            pass
+
+        if error is not None:
+            span.error = repr(error)
+
+        self.exporter(
+            {
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "start": span.started_at,
+                "duration": duration,
+                "error": span.error,
+                "attributes": span.attributes,
+            }
+        )
+
+    @contextmanager
+    def span(
+        self, name: Text, parent: Optional[Span] = None, **attributes
+    ) -> Iterator[Span]:
+        """
+        Trace a block of code.
+
+        Args:
+            - name: what the span measures.
+            - parent: the enclosing span. The current span by default.
+            - attributes: extra details, exported with the span.
+        """
+        span = self.start(name, parent=parent, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            self.finish(span, error=e)
+            raise
+        else:
+            self.finish(span)
+
+
+tracer: Tracer = Tracer()
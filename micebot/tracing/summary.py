@@ -0,0 +1,171 @@
+"""
+Summarise the spans exported by the tracer into a flame-style breakdown.
+
+The spans are grouped by their path from the command down, e.g.
+`command ls > api GET /products/`, and each line shows how many times the
+path ran, its total and mean time, its self time (not spent in children)
+and its share of the root total.
+
+Usage:
+    python -m micebot.tracing.summary traces.jsonl traces.jsonl.1
+    python -m micebot.tracing.summary traces.jsonl --slowest 5
+    python -m micebot.tracing.summary traces.jsonl --trace <trace id>
+"""
+import argparse
+import json
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Text, Tuple
+
+Path = Tuple[Text, ...]
+BAR_WIDTH = 30
+
+
+def read_spans(paths: Iterable[Text]) -> Iterator[dict]:
+    """
+    Read the spans from JSON lines files, skipping the malformed lines.
+    """
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def children_of(spans: List[dict]) -> Dict[Optional[Text], List[dict]]:
+    """
+    Index the spans by parent. The spans whose parent is missing, e.g.
+    lost in a rotation, are treated as roots.
+    """
+    ids = {span["span_id"] for span in spans}
+    children = defaultdict(list)
+    for span in sorted(spans, key=lambda span: span["start"]):
+        parent = span["parent_id"] if span["parent_id"] in ids else None
+        children[parent].append(span)
+    return children
+
+
+def aggregate(spans: List[dict]) -> Dict[Path, List[float]]:
+    """
+    Sum the spans by path.
+
+    Returns:
+        - the count, total and self time of each path.
+    """
+    children = children_of(spans)
+    totals: Dict[Path, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+
+    def visit(span: dict, path: Path):
+        path = path + (span["name"],)
+        nested = children.get(span["span_id"], [])
+        total = totals[path]
+        total[0] += 1
+        total[1] += span["duration"]
+        total[2] += max(
+            0.0, span["duration"] - sum(child["duration"] for child in nested)
+        )
+        for child in nested:
+            visit(child, path)
+
+    for root in children[None]:
+        visit(root, ())
+    return totals
+
+
+def flame(totals: Dict[Path, List[float]]) -> Iterator[Text]:
+    """
+    Render the aggregated paths as an indented tree, slowest first.
+    """
+    roots = sum(total[1] for path, total in totals.items() if len(path) == 1)
+
+    def lines(prefix: Path) -> Iterator[Text]:
+        branches = sorted(
+            (
+                path
+                for path in totals
+                if len(path) == len(prefix) + 1 and path[:-1] == prefix
+            ),
+            key=lambda path: -totals[path][1],
+        )
+        for path in branches:
+            count, total, self_time = totals[path]
+            share = total / roots if roots else 0.0
+            name = "  " * len(prefix) + path[-1]
+            yield (
+                f"{name:<48}{count:>7}{total * 1000:>11.1f}"
+                f"{total / count * 1000:>10.1f}{self_time * 1000:>11.1f}"
+                f"{share:>7.1%} {'#' * round(share * BAR_WIDTH)}"
+            )
+            yield from lines(path)
+
+    yield (
+        f"{'span':<48}{'count':>7}{'total ms':>11}"
+        f"{'mean ms':>10}{'self ms':>11}{'share':>7}"
+    )
+    yield from lines(())
+
+
+def waterfall(spans: List[dict], trace_id: Text) -> Iterator[Text]:
+    """
+    Render the spans of a single trace, in the order they started.
+    """
+    spans = [span for span in spans if span["trace_id"] == trace_id]
+    if not spans:
+        yield f"Trace {trace_id} not found."
+        return
+
+    children = children_of(spans)
+    origin = min(span["start"] for span in spans)
+
+    def lines(span: dict, depth: int) -> Iterator[Text]:
+        name = "  " * depth + span["name"]
+        offset = (span["start"] - origin) * 1000
+        error = f"  {span['error']}" if span.get("error") else ""
+        yield (
+            f"{name:<48}{offset:>+10.1f}{span['duration'] * 1000:>10.1f}"
+            f"{error}"
+        )
+        for child in children.get(span["span_id"], []):
+            yield from lines(child, depth + 1)
+
+    yield f"{'span':<48}{'at ms':>10}{'took ms':>10}"
+    for root in children[None]:
+        yield from lines(root, 0)
+
+
+def slowest(spans: List[dict], limit: int) -> Iterator[Text]:
+    """
+    Render the slowest root spans, with their trace ids.
+    """
+    roots = children_of(spans)[None]
+    for span in sorted(roots, key=lambda span: -span["duration"])[:limit]:
+        yield (
+            f"{span['trace_id']}  {span['duration'] * 1000:>10.1f} ms  "
+            f"{span['name']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="+", help="the JSON lines files")
+    parser.add_argument("--trace", help="show the spans of a single trace")
+    parser.add_argument(
+        "--slowest", type=int, help="list the slowest commands"
+    )
+    args = parser.parse_args()
+
+    spans = list(read_spans(args.files))
+    if args.trace:
+        lines = waterfall(spans, args.trace)
+    elif args.slowest:
+        lines = slowest(spans, args.slowest)
+    else:
+        lines = flame(aggregate(spans))
+
+    for line in lines:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
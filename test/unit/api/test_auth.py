@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import time
+from base64 import urlsafe_b64encode
+from tempfile import TemporaryDirectory
+
+from micebot.api.auth import TokenManager, token_expiry
+from micebot.api.store import SharedStore
+from test.unit.test_case import Test, TestAsync
+
+
+def jwt(claims: dict) -> str:
+    payload = urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=")
+    return f"header.{payload.decode()}.signature"
+
+
+class TestTokenExpiry(Test):
+    def test_should_return_the_exp_claim_of_a_jwt(self):
+        self.assertEqual(1600000000, token_expiry(jwt({"exp": 1600000000})))
+
+    def test_should_return_none_when_the_token_is_not_a_jwt(self):
+        self.assertIsNone(token_expiry(self.faker.sha256()))
+
+    def test_should_return_none_when_the_exp_claim_is_missing(self):
+        self.assertIsNone(token_expiry(jwt({"sub": "micebot"})))
+
+
+class TestTokenManager(TestAsync):
+    def setUp(self):
+        self.now = 0.0
+        self.calls = 0
+        self.token = self.faker.sha256()
+        self.lifetime = None
+        self.tokens = TokenManager(
+            self.fetch, ttl=100, refresh_margin=10, clock=lambda: self.now
+        )
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return self.token, self.lifetime
+
+    async def test_should_reuse_the_token_until_the_refresh_margin(self):
+        self.assertEqual(self.token, await self.tokens.get())
+        self.now = 89
+        self.assertEqual(self.token, await self.tokens.get())
+        self.assertEqual(1, self.calls)
+
+        self.now = 90
+        await self.tokens.get()
+        self.assertEqual(2, self.calls)
+
+    async def test_should_use_the_lifetime_informed_by_the_api(self):
+        self.lifetime = 20
+        await self.tokens.get()
+
+        self.assertEqual(20, self.tokens.expires_at)
+
+    async def test_should_use_the_expiration_of_the_jwt(self):
+        self.token = jwt({"exp": time.time() + 50})
+        await self.tokens.get()
+
+        self.assertAlmostEqual(50, self.tokens.expires_at, delta=1)
+
+    async def test_should_share_a_single_refresh_between_concurrent_callers(
+        self,
+    ):
+        tokens = await asyncio.gather(*[self.tokens.get() for _ in range(10)])
+
+        self.assertEqual([self.token] * 10, tokens)
+        self.assertEqual(1, self.calls)
+
+    async def test_should_not_refresh_when_the_stale_token_was_replaced(self):
+        stale = await self.tokens.get()
+        self.token = self.faker.sha256()
+
+        await self.tokens.refresh(stale=stale)
+        await self.tokens.refresh(stale=stale)
+
+        self.assertEqual(self.token, self.tokens.access_token)
+        self.assertEqual(2, self.calls)
+
+    async def test_should_return_none_when_the_credentials_are_rejected(self):
+        self.token = None
+
+        self.assertIsNone(await self.tokens.get())
+        self.assertFalse(self.tokens.is_valid())
+
+
+class TestSharedTokens(TestAsync):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.calls = 0
+        self.token = self.faker.sha256()
+        # One manager and one store connection per simulated process.
+        self.managers = []
+        for owner in (b"1", b"2"):
+            store = SharedStore(os.path.join(directory.name, "shared.db"))
+            store.owner = owner
+            self.addCleanup(store.close)
+            self.managers.append(
+                TokenManager(
+                    self.fetch, ttl=100, store=store, poll_interval=0.001
+                )
+            )
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return self.token, None
+
+    async def test_should_request_a_single_token_for_all_the_processes(self):
+        tokens = await asyncio.gather(
+            *[manager.get() for manager in self.managers]
+        )
+
+        self.assertEqual([self.token] * 2, tokens)
+        self.assertEqual(1, self.calls)
+
+    async def test_should_not_take_the_stale_token_from_the_store(self):
+        first, second = self.managers
+        stale = await first.get()
+        await second.get()
+        self.token = self.faker.sha256()
+
+        await second.refresh(stale=stale)
+        await first.refresh(stale=stale)
+
+        self.assertEqual(self.token, first.access_token)
+        self.assertEqual(2, self.calls)
@@ -0,0 +1,58 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from micebot.api import (
+    AsyncApi,
+    CodeAlreadyRegistered,
+    UnknownNetworkError,
+)
+from micebot.api.bulk import bulk_add
+from test.unit.factories import ProductCreationFactory, ProductFactory
+from test.unit.test_case import TestAsync
+
+
+class TestBulkAdd(TestAsync):
+    def setUp(self):
+        self.api = AsyncMock(spec=AsyncApi)
+
+    async def test_should_keep_duplicated_codes_apart_from_failures(self):
+        products = [ProductCreationFactory() for _ in range(5)]
+        outcomes = {
+            products[1].code: CodeAlreadyRegistered("duplicated"),
+            products[3].code: UnknownNetworkError("network"),
+        }
+
+        async def add_product(product):
+            if product.code in outcomes:
+                raise outcomes[product.code]
+            return ProductFactory(code=product.code)
+
+        self.api.add_product.side_effect = add_product
+
+        summary = await bulk_add(api=self.api, products=products)
+
+        self.assertEqual(3, summary.added)
+        self.assertEqual([products[1].code], summary.duplicated)
+        self.assertEqual([(products[3].code, "network")], summary.failed)
+        self.assertEqual(5, summary.processed)
+
+    async def test_should_bound_the_requests_in_flight(self):
+        in_flight, peak = 0, 0
+
+        async def add_product(product):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+
+        self.api.add_product.side_effect = add_product
+
+        summary = await bulk_add(
+            api=self.api,
+            products=(ProductCreationFactory() for _ in range(50)),
+            concurrency=4,
+        )
+
+        self.assertEqual(50, summary.added)
+        self.assertEqual(4, peak)
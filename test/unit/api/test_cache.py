@@ -0,0 +1,53 @@
+from micebot.api.cache import MISSING, TTLCache
+from test.unit.test_case import Test
+
+
+class TestTTLCache(Test):
+    def setUp(self):
+        self.now = 0.0
+        self.cache = TTLCache(ttl=10, max_size=2, clock=lambda: self.now)
+
+    def test_should_count_a_miss_when_the_key_is_not_cached(self):
+        self.assertIs(MISSING, self.cache.get("key"))
+        self.assertEqual((0, 1, 0, 0), self.cache.stats)
+
+    def test_should_return_the_cached_value_until_it_expires(self):
+        self.cache.set("key", "value")
+
+        self.now = 9.9
+        self.assertEqual("value", self.cache.get("key"))
+
+        self.now = 10
+        self.assertIs(MISSING, self.cache.get("key"))
+        self.assertEqual((1, 1, 0, 0), self.cache.stats)
+
+    def test_should_evict_the_least_recently_used_entry(self):
+        self.cache.set("first", 1)
+        self.cache.set("second", 2)
+        self.cache.get("first")
+        self.cache.set("third", 3)
+
+        self.assertIs(MISSING, self.cache.get("second"))
+        self.assertEqual(1, self.cache.get("first"))
+        self.assertEqual(1, self.cache.stats.evictions)
+
+    def test_should_drop_all_entries_when_cleared(self):
+        self.cache.set("key", "value")
+        self.cache.clear()
+
+        self.assertIs(MISSING, self.cache.get("key"))
+
+    def test_should_not_store_a_value_fetched_before_the_invalidation(self):
+        generation = self.cache.generation
+        self.cache.clear()
+        self.cache.set("key", "stale", generation=generation)
+
+        self.assertIs(MISSING, self.cache.get("key"))
+
+    def test_should_discard_an_entry(self):
+        self.cache.set("key", "value")
+
+        self.cache.discard("key")
+        self.cache.discard("missing")
+
+        self.assertIs(MISSING, self.cache.get("key"))
@@ -0,0 +1,766 @@
+import asyncio
+import json
+import os
+from tempfile import TemporaryDirectory
+from unittest.mock import Mock, patch
+
+from httpx import QueryParams, ReadTimeout
+
+from micebot.api import (
+    AsyncApi,
+    AuthenticationFailed,
+    CircuitOpen,
+    CodeAlreadyRegistered,
+    UnknownNetworkError,
+    ProductNotFound,
+    ProductAlreadyTaken,
+    OrderNotFound,
+)
+from test.unit.factories import (
+    OrderFactory,
+    ProductCreationFactory,
+    ProductFactory,
+    ProductEditFactory,
+    ProductDeleteFactory,
+    ProductQueryFactory,
+    OrderQueryFactory,
+    ProductResponseFactory,
+    OrderWithTotalFactory,
+)
+from micebot.api.client import (
+    RECEIVED_BYTES,
+    REQUEST_DURATION,
+    RESPONSES,
+    endpoint_of,
+)
+from micebot.api.codec import STDLIB
+from micebot.api.resilience import OPEN, CircuitBreaker, RetryPolicy
+from micebot.api.store import SharedStore
+from micebot.model.model import OrderQuery, ProductQuery
+from test.unit.test_case import TestAsync
+from test.unit.transport import MockTransport
+
+
+def to_json(model) -> dict:
+    return json.loads(model.json())
+
+
+class TestAsyncAPI(TestAsync):
+    def setUp(self):
+        self.endpoint = "http://" + self.faker.domain_name()
+        self.username = self.faker.user_name()
+        self.password = self.faker.password()
+        self.access_token = self.faker.sha256()
+        self.routes = {}
+        self.transport = MockTransport(self.handle)
+
+        self.api = AsyncApi(
+            endpoint=self.endpoint,
+            username=self.username,
+            password=self.password,
+            transport=self.transport,
+        )
+
+    async def asyncTearDown(self):
+        await self.api.close()
+
+    def handle(self, request):
+        if request.url.path == "/auth/":
+            return 200, {"access_token": self.access_token}
+        if request.url.path == "/hb/":
+            return 200, {"valid": True}
+        return self.routes[request.method, request.url.path](request)
+
+    def route(self, method, path, status, content=None):
+        self.routes[method, path] = lambda request: (status, content)
+
+    def paths(self):
+        return [r.url.path for r in self.transport.requests]
+
+
+class TestAuthenticate(TestAsyncAPI):
+    async def test_should_return_false_when_http_status_is_401_for_auth(self):
+        self.handle = lambda request: (401, {})
+        self.transport.handler = self.handle
+
+        self.assertFalse(await self.api.authenticate())
+        self.assertIsNone(self.api.get_access_token())
+
+    async def test_set_access_token_and_return_true_when_it_is_present(self):
+        self.assertTrue(await self.api.authenticate())
+        self.assertEqual(self.access_token, self.api.get_access_token())
+
+        request = self.transport.requests[0]
+        self.assertEqual("POST", request.method)
+        self.assertEqual(f"{self.endpoint}/auth/", str(request.url))
+        self.assertEqual(
+            {"username": self.username, "password": self.password},
+            dict(QueryParams(request.content.decode())),
+        )
+
+    async def test_should_raise_value_error_when_access_token_is_not_present_on_response(  # noqa
+        self,
+    ):
+        self.transport.handler = lambda request: (200, {})
+
+        with self.assertRaises(ValueError):
+            await self.api.authenticate()
+
+
+class TestHeartbeat(TestAsyncAPI):
+    async def test_should_not_call_the_api_when_access_token_is_none(self):
+        self.assertFalse(await self.api.heartbeat())
+        self.assertEqual([], self.transport.requests)
+
+    async def test_should_send_the_bearer_token(self):
+        self.api.tokens.access_token = self.access_token
+
+        self.assertTrue(await self.api.heartbeat())
+        self.assertEqual(
+            f"Bearer {self.access_token}",
+            self.transport.requests[0].headers["Authorization"],
+        )
+
+    async def test_should_return_false_when_http_status_is_401(self):
+        self.api.tokens.access_token = self.access_token
+        self.transport.handler = lambda request: (401, {})
+
+        self.assertFalse(await self.api.heartbeat())
+
+
+class TestAddProduct(TestAsyncAPI):
+    async def test_should_return_the_product_data_when_http_status_is_201(
+        self,
+    ):
+        product = ProductFactory()
+        self.route("POST", "/products/", 201, to_json(product))
+
+        self.assertEqual(
+            product,
+            await self.api.add_product(
+                ProductCreationFactory(
+                    code=product.code, summary=product.summary
+                )
+            ),
+        )
+        self.assertEqual(
+            {"code": product.code, "summary": product.summary},
+            json.loads(self.transport.requests[-1].content),
+        )
+
+    async def test_should_raise_code_already_registered_when_http_status_is_409(  # noqa
+        self,
+    ):
+        self.route("POST", "/products/", 409)
+
+        with self.assertRaises(CodeAlreadyRegistered):
+            await self.api.add_product(ProductCreationFactory())
+
+    async def test_should_raise_unknown_network_error_when_http_status_is_not_409_or_201(  # noqa
+        self,
+    ):
+        self.route("POST", "/products/", 500, b"internal error")
+
+        with self.assertRaises(UnknownNetworkError) as context:
+            await self.api.add_product(ProductCreationFactory())
+
+        self.assertEqual(
+            "Failed to add a product, network error: "
+            "(status: 500 - data: b'internal error').",
+            str(context.exception),
+        )
+
+
+class TestEditProduct(TestAsyncAPI):
+    async def test_should_return_the_edited_product_when_http_code_is_200(
+        self,
+    ):
+        product_edit = ProductEditFactory()
+        product = ProductFactory(
+            uuid=product_edit.uuid,
+            code=product_edit.code,
+            summary=product_edit.summary,
+        )
+        self.route("PUT", f"/products/{product.uuid}", 200, to_json(product))
+
+        self.assertEqual(product, await self.api.edit_product(product_edit))
+
+    async def test_should_raise_product_not_found_when_http_status_is_404(
+        self,
+    ):
+        product = ProductEditFactory()
+        self.route("PUT", f"/products/{product.uuid}", 404)
+
+        with self.assertRaises(ProductNotFound):
+            await self.api.edit_product(product)
+
+
+class TestDeleteProduct(TestAsyncAPI):
+    async def test_should_raise_product_already_taken_when_http_status_is_401(  # noqa
+        self,
+    ):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 401)
+
+        with self.assertRaises(ProductAlreadyTaken):
+            await self.api.delete_product(product)
+
+    async def test_should_not_authenticate_again_for_a_taken_product(self):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 401)
+
+        with self.assertRaises(ProductAlreadyTaken):
+            await self.api.delete_product(product)
+
+        self.assertEqual(["/auth/", f"/products/{product.uuid}"], self.paths())
+
+    async def test_should_authenticate_again_when_the_token_expired(self):
+        product = ProductDeleteFactory()
+        path = f"/products/{product.uuid}"
+        expired = self.faker.sha256()
+        self.api.tokens.access_token = expired
+        self.api.tokens.expires_at = float("inf")
+
+        def delete_product(request):
+            if request.headers["Authorization"] == f"Bearer {expired}":
+                self.api.tokens.expires_at = 0.0
+                return 401, {}
+            return 200, {"deleted": 1}
+
+        self.routes["DELETE", path] = delete_product
+
+        self.assertTrue((await self.api.delete_product(product)).deleted)
+        self.assertEqual([path, "/auth/", path], self.paths())
+
+    async def test_should_return_the_delete_response_when_http_code_is_200(
+        self,
+    ):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 200, {"deleted": 1})
+
+        self.assertTrue((await self.api.delete_product(product)).deleted)
+
+
+class TestListProducts(TestAsyncAPI):
+    async def test_should_return_the_product_response_when_http_status_is_200(  # noqa
+        self,
+    ):
+        product_response = ProductResponseFactory()
+        query = ProductQueryFactory()
+        self.route("GET", "/products/", 200, to_json(product_response))
+
+        self.assertEqual(product_response, await self.api.list_products(query))
+
+        params = QueryParams(self.transport.requests[-1].url.query)
+        self.assertEqual(str(query.limit), params["limit"])
+
+    async def test_should_raise_product_not_found_when_http_status_is_404(
+        self,
+    ):
+        self.route("GET", "/products/", 404)
+
+        with self.assertRaises(ProductNotFound):
+            await self.api.list_products(ProductQueryFactory())
+
+
+class TestListOrders(TestAsyncAPI):
+    async def test_should_return_the_orders_when_http_status_is_200(self):
+        orders = OrderWithTotalFactory()
+        query = OrderQueryFactory()
+        self.route("GET", "/orders/", 200, to_json(orders))
+
+        self.assertEqual(orders, await self.api.list_orders(query))
+
+        params = QueryParams(self.transport.requests[-1].url.query)
+        self.assertEqual(str(query.skip), params["skip"])
+        self.assertEqual(query.moderator, params["moderator"])
+
+    async def test_should_raise_order_not_found_when_http_status_is_404(self):
+        self.route("GET", "/orders/", 404)
+
+        with self.assertRaises(OrderNotFound):
+            await self.api.list_orders(OrderQueryFactory())
+
+    async def test_should_decode_the_trusted_orders_without_validation(self):
+        orders = OrderWithTotalFactory()
+        self.route("GET", "/orders/", 200, to_json(orders))
+        self.api.trust_responses = True
+
+        with patch("micebot.api.client.OrderWithTotal") as validate:
+            self.assertEqual(
+                orders, await self.api.list_orders(OrderQueryFactory())
+            )
+        validate.assert_not_called()
+
+    async def test_should_decode_with_the_chosen_codec(self):
+        orders = OrderWithTotalFactory()
+        self.route("GET", "/orders/", 200, to_json(orders))
+        self.api.codec = STDLIB._replace(loads=Mock(wraps=STDLIB.loads))
+
+        self.assertEqual(
+            orders, await self.api.list_orders(OrderQueryFactory())
+        )
+        # The token and the orders.
+        self.assertEqual(2, self.api.codec.loads.call_count)
+        self.assertIsInstance(self.api.codec.loads.call_args[0][0], bytes)
+
+
+class TestTransport(TestAsyncAPI):
+    async def test_should_raise_unknown_network_error_on_transport_error(
+        self,
+    ):
+        def timeout(request):
+            raise ReadTimeout("timed out")
+
+        self.transport.handler = timeout
+
+        with self.assertRaises(UnknownNetworkError):
+            await self.api.authenticate()
+
+    async def test_should_build_the_client_on_the_first_request(self):
+        self.assertIsNone(self.api._client)
+
+        await self.api.authenticate()
+
+        self.assertIs(self.api.client, self.api._client)
+        self.assertIsNotNone(self.api._client)
+
+
+class TestAuthorization(TestAsyncAPI):
+    async def test_should_send_a_single_request_when_the_token_is_valid(
+        self,
+    ):
+        self.route("GET", "/orders/", 200, to_json(OrderWithTotalFactory()))
+
+        await self.api.list_orders(OrderQueryFactory())
+        await self.api.list_orders(OrderQueryFactory())
+
+        self.assertEqual(["/auth/", "/orders/", "/orders/"], self.paths())
+
+    async def test_should_share_the_authentication_between_concurrent_calls(
+        self,
+    ):
+        self.route("GET", "/orders/", 200, to_json(OrderWithTotalFactory()))
+
+        await asyncio.gather(
+            *[self.api.list_orders(OrderQueryFactory()) for _ in range(5)]
+        )
+
+        self.assertEqual(1, self.paths().count("/auth/"))
+        self.assertEqual(5, self.paths().count("/orders/"))
+
+    async def test_should_authenticate_again_and_retry_when_http_status_is_401(  # noqa
+        self,
+    ):
+        expired = self.faker.sha256()
+        self.api.tokens.access_token = expired
+        self.api.tokens.expires_at = float("inf")
+        orders = OrderWithTotalFactory()
+
+        def list_orders(request):
+            if request.headers["Authorization"] == f"Bearer {expired}":
+                return 401, {}
+            return 200, to_json(orders)
+
+        self.routes["GET", "/orders/"] = list_orders
+
+        self.assertEqual(
+            orders, await self.api.list_orders(OrderQueryFactory())
+        )
+        self.assertEqual(["/orders/", "/auth/", "/orders/"], self.paths())
+        self.assertEqual(self.access_token, self.api.get_access_token())
+
+    async def test_should_raise_authentication_failed_when_credentials_are_rejected(  # noqa
+        self,
+    ):
+        self.transport.handler = lambda request: (401, {})
+
+        with self.assertRaises(AuthenticationFailed):
+            await self.api.list_orders(OrderQueryFactory())
+
+
+class TestCache(TestAsyncAPI):
+    def setUp(self):
+        super().setUp()
+        self.api = AsyncApi(
+            endpoint=self.endpoint,
+            username=self.username,
+            password=self.password,
+            cache_ttl=60,
+            transport=self.transport,
+        )
+        self.route("GET", "/products/", 200, to_json(ProductResponseFactory()))
+
+    async def test_should_serve_equal_queries_from_the_cache(self):
+        query = ProductQueryFactory()
+
+        first = await self.api.list_products(query)
+        second = await self.api.list_products(query.copy())
+
+        self.assertIs(first, second)
+        self.assertEqual(1, self.paths().count("/products/"))
+        self.assertEqual(1, self.api.cache.stats.hits)
+
+    async def test_should_request_again_when_the_query_is_different(self):
+        query = ProductQueryFactory(limit=5)
+
+        await self.api.list_products(query)
+        await self.api.list_products(query.copy(update={"limit": 6}))
+
+        self.assertEqual(2, self.paths().count("/products/"))
+
+    async def test_should_invalidate_the_listings_after_a_mutation(self):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 200, {"deleted": 1})
+        query = ProductQueryFactory()
+
+        await self.api.list_products(query)
+        await self.api.delete_product(product)
+        await self.api.list_products(query)
+
+        self.assertEqual(2, self.paths().count("/products/"))
+
+    async def test_should_keep_the_listings_when_a_mutation_fails(self):
+        self.route("POST", "/products/", 409)
+        query = ProductQueryFactory()
+
+        await self.api.list_products(query)
+        with self.assertRaises(CodeAlreadyRegistered):
+            await self.api.add_product(ProductCreationFactory())
+        await self.api.list_products(query)
+
+        self.assertEqual(
+            ["GET", "POST"],
+            [
+                request.method
+                for request in self.transport.requests
+                if request.url.path == "/products/"
+            ],
+        )
+
+
+class TestSharedStore(TestAsyncAPI):
+    def setUp(self):
+        super().setUp()
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "shared.db")
+        # Two workers, each with its own connection to the store.
+        self.api, self.other = [
+            AsyncApi(
+                endpoint=self.endpoint,
+                username=self.username,
+                password=self.password,
+                cache_ttl=60,
+                store=SharedStore(path),
+                transport=self.transport,
+            )
+            for _ in range(2)
+        ]
+        self.route("GET", "/products/", 200, to_json(ProductResponseFactory()))
+
+    async def asyncTearDown(self):
+        await super().asyncTearDown()
+        await self.other.close()
+        self.api.store.close()
+        self.other.store.close()
+
+    async def test_should_share_the_token_and_the_listings(self):
+        query = ProductQueryFactory()
+
+        first = await self.api.list_products(query)
+        second = await self.other.list_products(query)
+
+        self.assertEqual(first, second)
+        self.assertEqual(["/auth/", "/products/"], self.paths())
+
+    async def test_should_invalidate_the_listings_of_every_worker(self):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 200, {"deleted": 1})
+        query = ProductQueryFactory()
+
+        await self.api.list_products(query)
+        await self.other.list_products(query)
+        await self.api.delete_product(product)
+        await self.other.list_products(query)
+
+        self.assertEqual(2, self.paths().count("/products/"))
+
+
+class TestCoalescing(TestAsyncAPI):
+    def setUp(self):
+        super().setUp()
+        self.route("GET", "/products/", 200, to_json(ProductResponseFactory()))
+
+    async def test_should_share_a_request_between_equal_concurrent_queries(
+        self,
+    ):
+        query = ProductQueryFactory()
+
+        first, second = await asyncio.gather(
+            self.api.list_products(query), self.api.list_products(query.copy())
+        )
+
+        self.assertIs(first, second)
+        self.assertEqual(1, self.paths().count("/products/"))
+        self.assertEqual(1, self.api.flights.stats.shared)
+
+    async def test_should_not_share_requests_between_different_queries(self):
+        query = ProductQueryFactory(limit=5)
+
+        await asyncio.gather(
+            self.api.list_products(query),
+            self.api.list_products(query.copy(update={"limit": 6})),
+        )
+
+        self.assertEqual(2, self.paths().count("/products/"))
+
+    async def test_should_request_again_once_the_request_completes(self):
+        query = ProductQueryFactory()
+
+        await self.api.list_products(query)
+        await self.api.list_products(query)
+
+        self.assertEqual(2, self.paths().count("/products/"))
+
+    async def test_should_raise_the_shared_error_to_every_caller(self):
+        self.route("GET", "/orders/", 404)
+        query = OrderQueryFactory()
+
+        results = await asyncio.gather(
+            self.api.list_orders(query),
+            self.api.list_orders(query),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            self.assertIsInstance(result, OrderNotFound)
+        self.assertEqual(1, self.paths().count("/orders/"))
+
+
+class TestPagination(TestAsyncAPI):
+    def setUp(self):
+        super().setUp()
+        self.orders = [to_json(OrderFactory()) for _ in range(25)]
+        self.routes["GET", "/orders/"] = self.list_orders
+        self.products = [to_json(ProductFactory()) for _ in range(7)]
+        self.routes["GET", "/products/"] = self.list_products
+
+    def list_orders(self, request):
+        params = QueryParams(request.url.query)
+        skip, limit = int(params["skip"]), int(params["limit"])
+        return 200, {
+            "total": len(self.orders),
+            "orders": self.orders[skip : skip + limit],
+        }
+
+    def list_products(self, request):
+        params = QueryParams(request.url.query)
+        skip, limit = int(params["skip"]), int(params["limit"])
+        return 200, {
+            "total": {"all": 9, "taken": 2, "available": len(self.products)},
+            "products": self.products[skip : skip + limit],
+        }
+
+    def pages(self, path):
+        return [
+            (
+                int(QueryParams(r.url.query)["skip"]),
+                int(QueryParams(r.url.query)["limit"]),
+            )
+            for r in self.transport.requests
+            if r.url.path == path
+        ]
+
+    async def test_should_iterate_over_all_orders_page_by_page(self):
+        orders = [
+            order.uuid
+            async for order in self.api.iter_orders(OrderQuery(), page_size=10)
+        ]
+
+        self.assertEqual([order["uuid"] for order in self.orders], orders)
+        self.assertEqual([(0, 10), (10, 10), (20, 10)], self.pages("/orders/"))
+
+    async def test_should_stop_at_the_query_limit(self):
+        orders = [
+            order
+            async for order in self.api.iter_orders(
+                OrderQuery(skip=3, limit=12), page_size=10
+            )
+        ]
+
+        self.assertEqual(12, len(orders))
+        self.assertEqual(self.orders[3]["uuid"], orders[0].uuid)
+        self.assertEqual([(3, 10), (13, 2)], self.pages("/orders/"))
+
+    async def test_should_reject_a_page_size_that_is_not_positive(self):
+        with self.assertRaises(ValueError):
+            self.api.iter_orders(OrderQuery(), page_size=0)
+
+        self.assertEqual([], self.pages("/orders/"))
+
+    async def test_should_prefetch_the_next_page_while_the_current_is_consumed(  # noqa
+        self,
+    ):
+        orders = self.api.iter_orders(OrderQuery(), page_size=10)
+
+        await orders.__anext__()
+        await asyncio.sleep(0.01)
+
+        self.assertEqual([(0, 10), (10, 10)], self.pages("/orders/"))
+        await orders.aclose()
+
+    async def test_should_iterate_over_the_available_products(self):
+        products = [
+            product
+            async for product in self.api.iter_products(
+                ProductQuery(taken=False), page_size=3
+            )
+        ]
+
+        self.assertEqual(7, len(products))
+        self.assertEqual([(0, 3), (3, 3), (6, 3)], self.pages("/products/"))
+
+
+class TestResilience(TestAsyncAPI):
+    def setUp(self):
+        super().setUp()
+        self.api = AsyncApi(
+            endpoint=self.endpoint,
+            username=self.username,
+            password=self.password,
+            retry_policy=RetryPolicy(attempts=3, base=0.001),
+            circuit_breaker=CircuitBreaker(failure_threshold=3),
+            transport=self.transport,
+        )
+        self.orders = OrderWithTotalFactory()
+
+    def answers(self, path, *answers):
+        answers = list(answers)
+
+        def answer(request):
+            status = answers.pop(0)
+            if isinstance(status, Exception):
+                raise status
+            if isinstance(status, tuple):
+                return status
+            return status, to_json(self.orders)
+
+        self.routes["GET", path] = answer
+
+    async def test_should_retry_the_idempotent_calls_on_server_errors(self):
+        self.answers("/orders/", 503, ReadTimeout("timed out"), 200)
+
+        self.assertEqual(
+            self.orders, await self.api.list_orders(OrderQueryFactory())
+        )
+        self.assertEqual(3, self.paths().count("/orders/"))
+
+    async def test_should_honour_the_retry_after_header(self):
+        self.answers("/orders/", (429, {}, {"Retry-After": "0.05"}), 200)
+
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        await self.api.list_orders(OrderQueryFactory())
+
+        self.assertGreaterEqual(loop.time() - start, 0.05)
+
+    async def test_should_give_up_after_the_last_attempt(self):
+        self.answers("/orders/", 500, 502, 503)
+
+        with self.assertRaises(UnknownNetworkError):
+            await self.api.list_orders(OrderQueryFactory())
+        self.assertEqual(3, self.paths().count("/orders/"))
+
+    def keys(self, path):
+        return [
+            r.headers.get("Idempotency-Key")
+            for r in self.transport.requests
+            if r.url.path == path
+        ]
+
+    async def test_should_retry_the_mutations_with_the_same_key(self):
+        product = ProductFactory()
+        answers = [ReadTimeout("timed out"), (201, to_json(product))]
+
+        def answer(request):
+            status = answers.pop(0)
+            if isinstance(status, Exception):
+                raise status
+            return status
+
+        self.routes["POST", "/products/"] = answer
+
+        self.assertEqual(
+            product, await self.api.add_product(ProductCreationFactory())
+        )
+        keys = self.keys("/products/")
+        self.assertEqual(2, len(keys))
+        self.assertIsNotNone(keys[0])
+        self.assertEqual(keys[0], keys[1])
+
+    async def test_should_reuse_the_key_while_the_outcome_is_unknown(self):
+        self.api.circuit_breaker = CircuitBreaker(failure_threshold=10)
+        creation = ProductCreationFactory()
+        self.route("POST", "/products/", 503)
+        with self.assertRaises(UnknownNetworkError):
+            await self.api.add_product(creation)
+
+        self.route("POST", "/products/", 201, to_json(ProductFactory()))
+        await self.api.add_product(creation)
+        await self.api.add_product(creation)
+
+        keys = self.keys("/products/")
+        self.assertEqual(5, len(keys))
+        self.assertEqual(1, len(set(keys[:4])))
+        self.assertNotEqual(keys[0], keys[4])
+
+    async def test_should_fail_fast_while_the_circuit_is_open(self):
+        self.answers("/orders/", 500, 500, 500)
+
+        with self.assertRaises(UnknownNetworkError):
+            await self.api.list_orders(OrderQueryFactory())
+        self.assertEqual(OPEN, self.api.circuit_breaker.state)
+
+        with self.assertRaises(CircuitOpen):
+            await self.api.list_orders(OrderQueryFactory())
+        self.assertEqual(3, self.paths().count("/orders/"))
+
+
+class TestMetrics(TestAsyncAPI):
+    def test_should_group_the_resource_paths_by_endpoint(self):
+        self.assertEqual("/products/", endpoint_of("/products/"))
+        self.assertEqual("/products/{uuid}", endpoint_of("/products/abc"))
+        self.assertEqual("/auth/", endpoint_of("/auth/"))
+
+    async def test_should_measure_the_requests_by_endpoint(self):
+        product = ProductDeleteFactory()
+        self.route("DELETE", f"/products/{product.uuid}", 404)
+        labels = {"method": "DELETE", "endpoint": "/products/{uuid}"}
+        count = REQUEST_DURATION.count(**labels)
+        responses = RESPONSES.value(status="404", **labels)
+        received = RECEIVED_BYTES.value(**labels)
+
+        with self.assertRaises(ProductNotFound):
+            await self.api.delete_product(product)
+
+        self.assertEqual(count + 1, REQUEST_DURATION.count(**labels))
+        self.assertEqual(
+            responses + 1, RESPONSES.value(status="404", **labels)
+        )
+        self.assertEqual(
+            received + len(b"null"), RECEIVED_BYTES.value(**labels)
+        )
+
+    async def test_should_count_the_transport_errors(self):
+        def timeout(request):
+            raise ReadTimeout("timed out")
+
+        self.routes["GET", "/orders/"] = timeout
+        labels = {"method": "GET", "endpoint": "/orders/", "status": "error"}
+        errors = RESPONSES.value(**labels)
+
+        with self.assertRaises(UnknownNetworkError):
+            await self.api.list_orders(OrderQueryFactory())
+
+        self.assertLess(errors, RESPONSES.value(**labels))
@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from micebot.api.codec import CODECS, STDLIB, get_codec
+from test.unit.test_case import Test
+
+
+class TestCodec(Test):
+    def test_should_decode_from_bytes(self):
+        for codec in CODECS.values():
+            self.assertEqual(
+                {"valid": True, "name": "ração"},
+                codec.loads('{"valid": true, "name": "ração"}'.encode()),
+            )
+
+    def test_should_prefer_orjson_when_installed(self):
+        with patch.dict(CODECS, {"orjson": STDLIB._replace(name="orjson")}):
+            self.assertEqual("orjson", get_codec().name)
+
+        with patch.dict(CODECS, clear=True, values={"json": STDLIB}):
+            self.assertIs(STDLIB, get_codec())
+
+    def test_should_raise_value_error_for_an_unavailable_codec(self):
+        with patch.dict(CODECS, clear=True, values={"json": STDLIB}):
+            with self.assertRaises(ValueError):
+                get_codec("orjson")
@@ -0,0 +1,34 @@
+import json
+from datetime import datetime, timezone
+
+from micebot.api import decoding
+from micebot.model.model import OrderWithTotal, ProductResponse
+from test.unit.factories import (
+    OrderWithTotalFactory,
+    ProductResponseFactory,
+)
+from test.unit.test_case import Test
+
+
+class TestDecoding(Test):
+    def test_should_decode_the_products_as_the_validation(self):
+        data = json.loads(ProductResponseFactory().json())
+
+        self.assertEqual(
+            ProductResponse(**data), decoding.product_response(data)
+        )
+
+    def test_should_decode_the_orders_as_the_validation(self):
+        data = json.loads(OrderWithTotalFactory().json())
+
+        decoded = decoding.orders_with_total(data)
+
+        self.assertEqual(OrderWithTotal(**data), decoded)
+        self.assertIsInstance(decoded.orders[0].requested_at, datetime)
+
+    def test_should_parse_the_datetimes_fromisoformat_does_not(self):
+        self.assertEqual(
+            datetime(2020, 8, 1, 12, tzinfo=timezone.utc),
+            decoding.parse_datetime("2020-08-01T12:00:00Z"),
+        )
+        self.assertIsNone(decoding.parse_datetime(None))
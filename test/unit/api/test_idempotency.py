@@ -0,0 +1,28 @@
+from micebot.api.idempotency import IdempotencyLedger
+from test.unit.test_case import Test
+
+
+class TestIdempotencyLedger(Test):
+    def setUp(self):
+        self.now = 0.0
+        self.ledger = IdempotencyLedger(ttl=10, clock=lambda: self.now)
+        self.request = self.ledger.request("POST", "/products/", {"code": 1})
+
+    def test_should_reuse_the_key_until_the_mutation_is_resolved(self):
+        key = self.ledger.key_for(self.request)
+
+        self.assertEqual(key, self.ledger.key_for(self.request))
+        self.assertEqual(
+            key,
+            self.ledger.key_for(
+                self.ledger.request("POST", "/products/", {"code": 1})
+            ),
+        )
+        self.ledger.resolve(self.request)
+        self.assertNotEqual(key, self.ledger.key_for(self.request))
+
+    def test_should_forget_the_keys_after_the_ttl(self):
+        key = self.ledger.key_for(self.request)
+        self.now = 10
+
+        self.assertNotEqual(key, self.ledger.key_for(self.request))
@@ -0,0 +1,219 @@
+import json
+from datetime import datetime, timedelta
+
+from httpx import QueryParams
+
+from micebot.api import AsyncApi, OrderNotFound, ProductNotFound
+from micebot.api.mirror import Mirror, MirrorSync
+from micebot.model.model import OrderQuery, ProductQuery
+from test.unit.factories import (
+    OrderFactory,
+    ProductCreationFactory,
+    ProductDeleteFactory,
+    ProductFactory,
+)
+from test.unit.test_case import Test, TestAsync
+from test.unit.transport import MockTransport
+
+
+def to_json(model) -> dict:
+    return json.loads(model.json())
+
+
+class TestMirror(Test):
+    def setUp(self):
+        self.mirror = Mirror(":memory:")
+        self.mirror.open()
+        now = datetime(2020, 8, 1)
+        self.available = [
+            ProductFactory(taken=False, created_at=now - timedelta(days=i))
+            for i in range(3)
+        ]
+        self.orders = [
+            OrderFactory(
+                requested_at=now - timedelta(hours=i),
+                product=ProductFactory(taken=True),
+            )
+            for i in range(2)
+        ]
+        self.mirror.save_products(self.available)
+        self.mirror.save_orders(self.orders)
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def test_should_list_the_products_as_the_api(self):
+        response = self.mirror.list_products(
+            ProductQuery(taken=False, desc=True, skip=1, limit=1)
+        )
+
+        self.assertEqual((5, 2, 3), tuple(response.total.dict().values()))
+        self.assertEqual([self.available[1]], response.products)
+
+    def test_should_read_every_product(self):
+        products = self.available + [order.product for order in self.orders]
+
+        self.assertCountEqual(products, self.mirror.all_products())
+
+    def test_should_raise_product_not_found_for_an_empty_page(self):
+        with self.assertRaises(ProductNotFound):
+            self.mirror.list_products(ProductQuery(skip=3))
+
+    def test_should_list_the_orders_with_their_products(self):
+        response = self.mirror.list_orders(OrderQuery(desc=False))
+
+        self.assertEqual(2, response.total)
+        self.assertEqual(list(reversed(self.orders)), response.orders)
+
+    def test_should_filter_the_orders(self):
+        order = self.orders[1]
+
+        response = self.mirror.list_orders(
+            OrderQuery(moderator=order.mod_id, owner=order.owner_display_name)
+        )
+        self.assertEqual([order], response.orders)
+
+        with self.assertRaises(OrderNotFound):
+            self.mirror.list_orders(OrderQuery(owner=self.faker.user_name()))
+
+    def test_should_find_a_product_by_code(self):
+        product = self.available[2]
+
+        self.assertEqual(product, self.mirror.find_product(product.code))
+        self.assertIsNone(self.mirror.find_product(self.faker.md5()))
+
+    def test_should_delete_a_product(self):
+        self.mirror.delete_product(self.available[0].uuid)
+
+        self.assertEqual(4, self.mirror.totals().all)
+
+
+class TestMirrorSync(TestAsync):
+    def setUp(self):
+        self.now = datetime(2020, 8, 1)
+        self.products = [self.product(days=i) for i in range(5)]
+        self.orders = []
+        self.transport = MockTransport(self.handle)
+        self.api = AsyncApi(
+            endpoint="http://" + self.faker.domain_name(),
+            username=self.faker.user_name(),
+            password=self.faker.password(),
+            mirror=Mirror(":memory:"),
+            transport=self.transport,
+        )
+        self.sync = MirrorSync(
+            api=self.api, mirror=self.api.mirror, page_size=2
+        )
+        self.api.listeners.append(self.sync.on_mutation)
+
+    async def asyncTearDown(self):
+        await self.api.close()
+        self.api.mirror.close()
+
+    def product(self, days=0, taken=False) -> dict:
+        return to_json(
+            ProductFactory(
+                taken=taken, created_at=self.now - timedelta(days=days)
+            )
+        )
+
+    def handle(self, request):
+        if request.url.path == "/auth/":
+            return 200, {"access_token": self.faker.sha256()}
+
+        if request.method == "POST":
+            product = self.product(days=-1)
+            self.products.append(product)
+            return 201, product
+
+        params = QueryParams(request.url.query)
+        skip, limit = int(params["skip"]), int(params["limit"])
+        if request.url.path == "/orders/":
+            orders = sorted(self.orders, key=lambda o: o["requested_at"])
+            page = list(reversed(orders))[skip : skip + limit]
+            if not page:
+                return 404, {}
+            return 200, {"total": len(self.orders), "orders": page}
+
+        taken = params["taken"] == "true"
+        products = sorted(
+            (p for p in self.products if p["taken"] == taken),
+            key=lambda p: p["created_at"],
+            reverse=True,
+        )[skip : skip + limit]
+        if not products:
+            return 404, {}
+        count = sum(p["taken"] for p in self.products)
+        return 200, {
+            "total": {
+                "all": len(self.products),
+                "taken": count,
+                "available": len(self.products) - count,
+            },
+            "products": products,
+        }
+
+    def listed(self):
+        return [
+            r.url.path
+            for r in self.transport.requests
+            if r.url.path in ("/products/", "/orders/")
+        ]
+
+    async def test_should_serve_the_listings_once_synced(self):
+        self.assertFalse(self.api.mirror.ready)
+
+        await self.sync.sync()
+        requests = len(self.transport.requests)
+        response = await self.api.list_products(ProductQuery(limit=5))
+
+        self.assertTrue(self.api.mirror.ready)
+        self.assertEqual(5, len(response.products))
+        self.assertEqual(requests, len(self.transport.requests))
+
+    async def test_should_fetch_only_the_new_records(self):
+        await self.sync.sync()
+        self.products.append(self.product(days=-1))
+        product = self.products.pop(0)
+        product["taken"] = True
+        order = to_json(OrderFactory(requested_at=self.now))
+        order["product"] = product
+        self.products.append(product)
+        self.orders.append(order)
+        self.transport.requests.clear()
+
+        await self.sync.sync()
+
+        # A page with the new product and the watermark, and a short page
+        # with the new order.
+        self.assertEqual(["/products/", "/orders/"], self.listed())
+        mirrored = await self.api.list_products(ProductQuery(taken=True))
+        self.assertEqual(product["uuid"], mirrored.products[0].uuid)
+        self.assertEqual((6, 1, 5), tuple(mirrored.total.dict().values()))
+
+    async def test_should_resync_everything_when_the_totals_diverge(self):
+        await self.sync.sync()
+        removed = self.products.pop(2)
+        self.transport.requests.clear()
+
+        await self.sync.sync()
+
+        self.assertGreater(len(self.listed()), 2)
+        self.assertIsNone(self.api.mirror.find_product(removed["code"]))
+
+    async def test_should_apply_the_mutations_to_the_mirror(self):
+        await self.sync.sync()
+        product = ProductDeleteFactory(uuid=self.products[0]["uuid"])
+        self.transport.handler = lambda request: (
+            (200, {"deleted": True})
+            if request.method == "DELETE"
+            else self.handle(request)
+        )
+
+        added = await self.api.add_product(ProductCreationFactory())
+        await self.api.delete_product(product)
+
+        self.assertEqual(added, await self.api.find_product(added.code))
+        self.assertIsNone(
+            await self.api.find_product(self.products[0]["code"])
+        )
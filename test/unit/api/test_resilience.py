@@ -0,0 +1,115 @@
+from email.utils import formatdate
+from time import time
+from unittest.mock import MagicMock
+
+from micebot.api.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    RetryPolicy,
+    retry_after,
+)
+from test.unit.test_case import Test
+
+
+class TestRetryAfter(Test):
+    def test_should_parse_the_delay_in_seconds(self):
+        self.assertEqual(3, retry_after("3"))
+
+    def test_should_parse_an_http_date(self):
+        self.assertAlmostEqual(
+            10, retry_after(formatdate(time() + 10, usegmt=True)), delta=1
+        )
+
+    def test_should_return_none_when_the_header_is_absent_or_invalid(self):
+        self.assertIsNone(retry_after(None))
+        self.assertIsNone(retry_after("soon"))
+
+
+class TestRetryPolicy(Test):
+    def test_should_grow_exponentially_up_to_the_cap(self):
+        policy = RetryPolicy(base=1, cap=5, rng=lambda: 1)
+
+        self.assertEqual(
+            [1, 2, 4, 5, 5], [policy.backoff(attempt) for attempt in range(5)]
+        )
+
+    def test_should_apply_full_jitter(self):
+        policy = RetryPolicy(base=1, cap=5, rng=lambda: 0.5)
+
+        self.assertEqual(2, policy.backoff(2))
+
+    def test_should_honour_the_retry_after_up_to_the_cap(self):
+        policy = RetryPolicy(cap=5)
+
+        self.assertEqual(3, policy.backoff(0, wait=3))
+        self.assertEqual(5, policy.backoff(0, wait=60))
+
+    def test_should_limit_the_attempts(self):
+        policy = RetryPolicy(attempts=3)
+
+        self.assertEqual(
+            [True, True, False],
+            [policy.should_retry(attempt) for attempt in range(3)],
+        )
+
+
+class TestCircuitBreaker(Test):
+    def setUp(self):
+        self.now = 0.0
+        self.on_state_change = MagicMock()
+        self.breaker = CircuitBreaker(
+            failure_threshold=3,
+            reset_timeout=10,
+            on_state_change=self.on_state_change,
+            clock=lambda: self.now,
+        )
+
+    def open(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+
+    def test_should_open_after_consecutive_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.assertEqual(CLOSED, self.breaker.state)
+
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+        self.on_state_change.assert_called_once_with(CLOSED, OPEN)
+
+    def test_should_let_a_single_probe_through_when_half_open(self):
+        self.open()
+        self.now = 10
+
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(HALF_OPEN, self.breaker.state)
+        self.assertFalse(self.breaker.allow())
+
+    def test_should_close_when_the_probe_succeeds(self):
+        self.open()
+        self.now = 10
+        self.breaker.allow()
+        self.breaker.record_success()
+
+        self.assertEqual(CLOSED, self.breaker.state)
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(
+            [(CLOSED, OPEN), (OPEN, HALF_OPEN), (HALF_OPEN, CLOSED)],
+            [call.args for call in self.on_state_change.call_args_list],
+        )
+
+    def test_should_open_again_when_the_probe_fails(self):
+        self.open()
+        self.now = 10
+        self.breaker.allow()
+        self.breaker.record_failure()
+
+        self.assertEqual(OPEN, self.breaker.state)
+        self.now = 15
+        self.assertFalse(self.breaker.allow())
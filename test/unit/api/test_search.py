@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+from micebot.api import ProductNotFound
+from micebot.api.mirror import Mirror
+from micebot.api.search import ProductIndex, normalize, tokenize
+from test.unit.factories import ProductFactory
+from test.unit.test_case import Test, TestAsync
+
+
+class TestNormalize(Test):
+    def test_should_fold_the_case_and_strip_the_accents(self):
+        self.assertEqual("descricao", normalize("Descrição"))
+        self.assertEqual({"e", "book", "jogo"}, tokenize("E-Book, JOGO"))
+
+
+class TestProductIndex(Test):
+    def setUp(self):
+        self.index = ProductIndex()
+        self.products = [
+            ProductFactory(code="ABC-1", summary="E-Book de Receitas"),
+            ProductFactory(code="abc-2", summary="Jogo de Tabuleiro"),
+            ProductFactory(code="XYZ-3", summary="Livro de Receitas"),
+        ]
+        self.index.replace(self.products)
+
+    def uuids(self, text: str, limit: int = 10):
+        return [product.uuid for product in self.index.search(text, limit)[1]]
+
+    def test_should_find_the_codes_by_prefix_in_code_order(self):
+        total, found = self.index.search("ab")
+
+        self.assertEqual(2, total)
+        self.assertEqual(self.products[:2], found)
+
+    def test_should_find_the_summaries_by_every_word_prefix(self):
+        self.assertEqual(
+            {self.products[0].uuid, self.products[2].uuid},
+            set(self.uuids("receita")),
+        )
+        self.assertEqual([self.products[2].uuid], self.uuids("livro rec"))
+        self.assertEqual([], self.uuids("livro jogo"))
+
+    def test_should_count_every_match_but_return_up_to_the_limit(self):
+        total, found = self.index.search("de", limit=1)
+
+        self.assertEqual(3, total)
+        self.assertEqual(1, len(found))
+
+    def test_should_apply_the_mutations(self):
+        edited = self.products[0].copy(update={"code": "new", "summary": "x"})
+        added = ProductFactory(code="abc-3", summary="Jogo")
+
+        self.index.on_mutation("edit", edited)
+        self.index.on_mutation("add", added)
+        self.index.on_mutation("delete", self.products[1].uuid)
+
+        self.assertEqual([added.uuid], self.uuids("abc"))
+        self.assertEqual([edited.uuid], self.uuids("new"))
+        self.assertEqual([added.uuid], self.uuids("jogo"))
+        self.assertEqual([self.products[2].uuid], self.uuids("receitas"))
+        self.assertNotIn("tabuleiro", self.index.tokens)
+        self.assertEqual(3, len(self.index))
+
+
+class TestProductIndexBuild(TestAsync):
+    def setUp(self):
+        self.products = [ProductFactory(code=f"code-{i}") for i in range(3)]
+        self.api = MagicMock()
+        self.api.mirror = None
+        self.api.iter_products.side_effect = self.iter_products
+        self.index = ProductIndex(api=self.api)
+        self.added = ProductFactory(code="code-added")
+
+    async def iter_products(self, query, page_size):
+        if query.taken:
+            raise ProductNotFound()
+        # A product added while the listing is read.
+        self.index.on_mutation("add", self.added)
+        for product in self.products:
+            yield product
+
+    async def test_should_index_the_listing_and_the_concurrent_mutations(self):
+        await self.index.build()
+
+        self.assertTrue(self.index.ready)
+        self.assertEqual(4, len(self.index))
+        self.assertEqual(4, self.index.search("code")[0])
+        self.assertIsNone(self.index.pending)
+
+    async def test_should_read_the_listing_from_the_ready_mirror(self):
+        self.api.mirror = Mirror(":memory:")
+        self.api.mirror.open()
+        self.api.mirror.save_products(self.products)
+        self.api.mirror.ready = True
+
+        await self.index.build()
+        self.api.mirror.close()
+
+        self.api.iter_products.assert_not_called()
+        self.assertEqual(3, len(self.index))
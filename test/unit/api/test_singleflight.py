@@ -0,0 +1,84 @@
+import asyncio
+
+from micebot.api.singleflight import SingleFlight
+from test.unit.test_case import TestAsync
+
+
+class TestSingleFlight(TestAsync):
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.gate = asyncio.Event()
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await self.gate.wait()
+        return self.calls
+
+    async def test_should_share_a_call_between_concurrent_callers(self):
+        callers = [
+            asyncio.ensure_future(self.flights.do("key", self.fetch))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        self.assertEqual([1, 1, 1], await asyncio.gather(*callers))
+        self.assertEqual((1, 2, 0), self.flights.stats)
+
+    async def test_should_not_share_calls_with_different_keys(self):
+        callers = [
+            asyncio.ensure_future(self.flights.do(key, self.fetch))
+            for key in ("first", "second")
+        ]
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        await asyncio.gather(*callers)
+        self.assertEqual(2, self.calls)
+
+    async def test_should_call_again_once_the_call_completes(self):
+        self.gate.set()
+
+        await self.flights.do("key", self.fetch)
+        await self.flights.do("key", self.fetch)
+
+        self.assertEqual(2, self.calls)
+
+    async def test_should_share_the_exception(self):
+        async def fail():
+            await self.gate.wait()
+            raise ValueError("failed")
+
+        callers = [
+            asyncio.ensure_future(self.flights.do("key", fail))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        for result in await asyncio.gather(*callers, return_exceptions=True):
+            self.assertIsInstance(result, ValueError)
+
+    async def test_should_keep_the_call_when_a_caller_is_cancelled(self):
+        first = asyncio.ensure_future(self.flights.do("key", self.fetch))
+        second = asyncio.ensure_future(self.flights.do("key", self.fetch))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        self.gate.set()
+
+        self.assertEqual(1, await second)
+        self.assertTrue(first.cancelled())
+
+    async def test_should_start_a_new_call_after_forget(self):
+        first = asyncio.ensure_future(self.flights.do("key", self.fetch))
+        await asyncio.sleep(0)
+
+        self.flights.forget()
+        second = asyncio.ensure_future(self.flights.do("key", self.fetch))
+        await asyncio.sleep(0)
+        self.gate.set()
+
+        await asyncio.gather(first, second)
+        self.assertEqual(2, self.calls)
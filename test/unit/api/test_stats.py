@@ -0,0 +1,127 @@
+import json
+from datetime import datetime, timedelta
+
+from httpx import QueryParams
+
+from micebot.api import AsyncApi
+from micebot.api.stats import OrderStats
+from test.unit.factories import OrderFactory, ProductFactory
+from test.unit.test_case import Test, TestAsync
+from test.unit.transport import MockTransport
+
+NOW = datetime(2020, 8, 1, 12)
+
+
+def order(hours: float = 0, mod_id: str = "1", summary: str = "E-Book"):
+    return OrderFactory(
+        requested_at=NOW - timedelta(hours=hours),
+        mod_id=mod_id,
+        mod_display_name=f"moderator-{mod_id}",
+        product=ProductFactory(summary=summary),
+    )
+
+
+class TestOrderStats(Test):
+    def setUp(self):
+        self.stats = OrderStats(api=None)
+
+    def test_should_count_per_moderator_owner_summary_and_day(self):
+        orders = [
+            order(hours=0, mod_id="1", summary="E-Book"),
+            order(hours=1, mod_id="1", summary="Jogo"),
+            order(hours=24, mod_id="2", summary="E-Book"),
+        ]
+
+        self.assertEqual(3, self.stats.fold(orders))
+
+        self.assertEqual(3, self.stats.total)
+        self.assertEqual(
+            [("moderator-1", 2), ("moderator-2", 1)],
+            self.stats.top_moderators(5),
+        )
+        self.assertEqual({"E-Book": 2, "Jogo": 1}, self.stats.summaries)
+        self.assertEqual(
+            [(NOW.date(), 2), ((NOW - timedelta(days=1)).date(), 1)],
+            self.stats.last_days(5),
+        )
+        self.assertEqual(
+            {o.owner_display_name for o in orders}, set(self.stats.owners)
+        )
+
+    def test_should_only_fold_the_orders_after_the_watermark(self):
+        first, second = order(hours=2), order(hours=1)
+        self.stats.fold([first, second])
+
+        same_time = order(hours=1)
+        counted = self.stats.fold([order(hours=0), second, same_time, first])
+
+        self.assertEqual(2, counted)
+        self.assertEqual(4, self.stats.total)
+        self.assertEqual(NOW, self.stats.watermark)
+
+
+class TestOrderStatsRefresh(TestAsync):
+    def setUp(self):
+        self.orders = [order(hours=i) for i in range(5)]
+        self.transport = MockTransport(self.handle)
+        self.api = AsyncApi(
+            endpoint="http://" + self.faker.domain_name(),
+            username=self.faker.user_name(),
+            password=self.faker.password(),
+            mirror=None,
+            transport=self.transport,
+        )
+        self.stats = OrderStats(api=self.api, page_size=3)
+
+    async def asyncTearDown(self):
+        await self.api.close()
+
+    def handle(self, request):
+        if request.url.path == "/auth/":
+            return 200, {"access_token": self.faker.sha256()}
+
+        params = QueryParams(request.url.query)
+        skip, limit = int(params["skip"]), int(params["limit"])
+        orders = sorted(self.orders, key=lambda o: o.requested_at)
+        page = list(reversed(orders))[skip : skip + limit]
+        if not page:
+            return 404, {}
+        return 200, {
+            "total": len(self.orders),
+            "orders": [json.loads(o.json()) for o in page],
+        }
+
+    def order_requests(self):
+        return [r for r in self.transport.requests if r.url.path == "/orders/"]
+
+    async def test_should_count_every_order_on_the_first_refresh(self):
+        self.assertEqual(5, await self.stats.refresh())
+
+        self.assertEqual(5, self.stats.total)
+        self.assertEqual(2, len(self.order_requests()))
+
+    async def test_should_read_only_the_newest_page_afterwards(self):
+        await self.stats.refresh()
+        self.transport.requests.clear()
+        self.orders.append(order(hours=-1))
+
+        self.assertEqual(1, await self.stats.refresh())
+
+        self.assertEqual(6, self.stats.total)
+        self.assertEqual(1, len(self.order_requests()))
+
+    async def test_should_recount_when_orders_were_removed(self):
+        await self.stats.refresh()
+        self.orders.pop()
+        self.orders.append(order(hours=-1))
+
+        await self.stats.refresh()
+
+        self.assertEqual(5, self.stats.total)
+        self.assertEqual(5, sum(self.stats.moderators.values()))
+
+    async def test_should_count_nothing_without_orders(self):
+        self.orders = []
+
+        self.assertEqual(0, await self.stats.refresh())
+        self.assertEqual(0, self.stats.total)
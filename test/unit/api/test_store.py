@@ -0,0 +1,71 @@
+import os
+from tempfile import TemporaryDirectory
+
+from micebot.api.store import SharedStore
+from test.unit.test_case import Test
+
+
+class TestSharedStore(Test):
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.now = 1000.0
+        path = os.path.join(directory.name, "shared.db")
+        self.store = SharedStore(path, clock=lambda: self.now)
+        self.other = SharedStore(path, clock=lambda: self.now)
+        self.other.owner = b"other"
+        self.addCleanup(self.store.close)
+        self.addCleanup(self.other.close)
+
+    def test_should_expire_the_entries(self):
+        self.store.set("token", b"value", ttl=10)
+
+        self.assertEqual((b"value", 1010.0), self.other.get("token"))
+        self.now = 1010
+        self.assertIsNone(self.other.get("token"))
+
+    def test_should_grant_a_lease_to_a_single_process(self):
+        self.assertTrue(self.store.acquire("lease", ttl=10))
+        self.assertFalse(self.other.acquire("lease", ttl=10))
+
+        self.other.release("lease")
+        self.assertFalse(self.other.acquire("lease", ttl=10))
+
+        self.store.release("lease")
+        self.assertTrue(self.other.acquire("lease", ttl=10))
+
+    def test_should_take_over_an_expired_lease(self):
+        self.store.acquire("lease", ttl=10)
+        self.now = 1010
+
+        self.assertTrue(self.other.acquire("lease", ttl=10))
+
+    def test_should_not_cache_a_listing_fetched_before_an_invalidation(self):
+        generation = self.store.generation()
+        self.store.set_cached("ls", b"old", ttl=10, generation=generation)
+
+        self.other.clear_cached()
+        self.store.set_cached("ls", b"stale", ttl=10, generation=generation)
+
+        self.assertIsNone(self.store.get_cached("ls"))
+        self.assertEqual(generation + 1, self.store.generation())
+
+    def test_should_answer_as_empty_while_another_process_writes(self):
+        self.store.set("token", b"value", ttl=10)
+        self.store.open()
+        self.store.db.execute("BEGIN EXCLUSIVE")
+        self.addCleanup(self.store.db.execute, "ROLLBACK")
+
+        self.assertIsNone(self.other.get("token"))
+        self.assertFalse(self.other.acquire("lease", ttl=10))
+        self.assertIsNone(self.other.generation())
+        self.assertFalse(self.other.clear_cached())
+
+    def test_should_retry_an_invalidation_when_the_store_is_free(self):
+        generation = self.store.generation()
+        self.store.db.execute("BEGIN EXCLUSIVE")
+        self.other.clear_cached()
+        self.store.db.execute("ROLLBACK")
+
+        self.assertEqual(generation + 1, self.other.generation())
+        self.assertFalse(self.other.stale)
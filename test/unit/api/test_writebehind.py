@@ -0,0 +1,94 @@
+import asyncio
+
+from micebot.api import ProductNotFound
+from micebot.api.writebehind import WriteBehind
+from test.unit.test_case import TestAsync
+
+
+class TestWriteBehind(TestAsync):
+    def setUp(self):
+        self.sent = []
+        self.in_flight = self.max_in_flight = 0
+
+    async def mutate(self, argument):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        if argument == "missing":
+            raise ProductNotFound(argument)
+        self.sent.append(argument)
+        return argument.upper()
+
+    async def test_should_flush_once_the_batch_is_full(self):
+        writer = WriteBehind(batch_size=3, interval=60)
+
+        queued = [writer.submit(self.mutate, code) for code in "abc"]
+
+        results = await asyncio.wait_for(asyncio.gather(*queued), 1)
+        self.assertEqual(["A", "B", "C"], results)
+        self.assertEqual(1, writer.flushes)
+
+    async def test_should_flush_after_the_interval(self):
+        writer = WriteBehind(batch_size=10, interval=0.01)
+
+        self.assertEqual("A", await writer.submit(self.mutate, "a"))
+        self.assertEqual(1, writer.flushes)
+        self.assertEqual(0, len(writer))
+
+    async def test_should_resolve_each_mutation_with_its_own_outcome(self):
+        writer = WriteBehind(batch_size=2, interval=60)
+
+        found = writer.submit(self.mutate, "a")
+        missing = writer.submit(self.mutate, "missing")
+
+        self.assertEqual("A", await found)
+        with self.assertRaises(ProductNotFound):
+            await missing
+
+    async def test_should_limit_the_requests_in_flight(self):
+        writer = WriteBehind(batch_size=8, interval=60, concurrency=2)
+
+        await asyncio.gather(
+            *(writer.submit(self.mutate, str(i)) for i in range(8))
+        )
+
+        self.assertEqual(2, self.max_in_flight)
+        self.assertEqual(8, len(self.sent))
+
+    async def test_should_flush_everything_on_join(self):
+        writer = WriteBehind(batch_size=2, interval=60)
+        queued = [writer.submit(self.mutate, code) for code in "abcde"]
+
+        await writer.join()
+
+        self.assertTrue(all(future.done() for future in queued))
+        self.assertEqual(list("abcde"), self.sent)
+        self.assertEqual(3, writer.flushes)
+
+    async def test_should_send_the_queued_mutations_on_close(self):
+        writer = WriteBehind(batch_size=2, interval=60)
+        queued = [writer.submit(self.mutate, code) for code in "abc"]
+
+        await writer.close()
+
+        self.assertEqual(["A", "B", "C"], await asyncio.gather(*queued))
+        self.assertEqual(0, len(writer))
+
+    async def test_should_send_an_interrupted_flush_again_on_close(self):
+        writer = WriteBehind(batch_size=1, interval=60)
+        attempts = []
+
+        async def hang_once(argument):
+            attempts.append(argument)
+            if len(attempts) == 1:
+                await asyncio.Event().wait()
+            return argument.upper()
+
+        queued = writer.submit(hang_once, "a")
+        await asyncio.sleep(0.01)
+
+        await writer.close()
+
+        self.assertEqual("A", await queued)
+        self.assertEqual(["a", "a"], attempts)
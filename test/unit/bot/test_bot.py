@@ -1,24 +1,80 @@
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 
-from micebot.bot import on_ready
+from micebot.bot import close, on_ready, report_first_command
+from micebot.bot.startup import Startup
 from test.unit.test_case import TestAsync
 
 
+@patch("micebot.bot.AsyncApi.list_orders")
+@patch("micebot.bot.AsyncApi.list_products")
 class TestBot(TestAsync):
+    def setUp(self):
+        self.startup = Startup()
+        for target, value in (
+            ("micebot.bot.startup", self.startup),
+            ("micebot.bot.warming_up", None),
+            ("micebot.bot.api.mirror", None),
+        ):
+            patcher = patch(target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
     @patch("micebot.bot.exit")
-    @patch("micebot.bot.Api.authenticate", return_value=True)
+    @patch("micebot.bot.AsyncApi.authenticate", return_value=True)
     async def test_should_not_exit_when_the_app_is_authenticated(
-        self, authenticate, exit_function
+        self, authenticate, exit_function, list_products, list_orders
     ):
         await on_ready()
         authenticate.assert_called_once()
         exit_function.assert_not_called()
 
     @patch("micebot.bot.exit")
-    @patch("micebot.bot.Api.authenticate", return_value=False)
+    @patch("micebot.bot.AsyncApi.authenticate", return_value=False)
     async def test_should_exit_when_the_app_is_not_authenticated(
-        self, authenticate, exit_function
+        self, authenticate, exit_function, list_products, list_orders
     ):
         await on_ready()
         authenticate.assert_called_once()
         exit_function.assert_called_once()
+        list_products.assert_not_called()
+
+    @patch("micebot.bot.exit")
+    @patch("micebot.bot.AsyncApi.authenticate", return_value=True)
+    async def test_should_preload_the_default_listings(
+        self, authenticate, exit_function, list_products, list_orders
+    ):
+        await on_ready()
+        list_products.assert_called_once()
+        list_orders.assert_called_once()
+        self.assertTrue(self.startup.reached("API listings preloaded"))
+
+    @patch("micebot.bot.exit")
+    @patch("micebot.bot.AsyncApi.authenticate", return_value=True)
+    async def test_should_not_authenticate_again_on_reconnection(
+        self, authenticate, exit_function, list_products, list_orders
+    ):
+        await on_ready()
+        await on_ready()
+        authenticate.assert_called_once()
+        list_products.assert_called_once()
+
+    async def test_should_record_only_the_first_command(
+        self, list_products, list_orders
+    ):
+        ctx = type("Context", (), {"command": "ls"})()
+
+        await report_first_command(ctx)
+        first = self.startup.elapsed("first command")
+        await report_first_command(ctx)
+
+        self.assertEqual(first, self.startup.elapsed("first command"))
+
+    @patch("micebot.bot.AsyncApi.close")
+    @patch("micebot.bot.close_bot", new_callable=AsyncMock)
+    async def test_should_close_the_api_after_the_bot(
+        self, close_bot, close_api, list_products, list_orders
+    ):
+        await close()
+
+        close_bot.assert_awaited_once()
+        close_api.assert_awaited_once()
@@ -0,0 +1,25 @@
+from itertools import count
+
+from micebot.bot.startup import STARTUP_SECONDS, Startup
+from test.unit.test_case import Test
+
+
+class TestStartup(Test):
+    def setUp(self):
+        self.startup = Startup(clock=count(10).__next__)
+
+    def test_should_record_a_milestone_once(self):
+        self.assertEqual(1, self.startup.mark("gateway ready"))
+        self.assertEqual(1, self.startup.mark("gateway ready"))
+        self.assertTrue(self.startup.reached("gateway ready"))
+        self.assertIsNone(self.startup.elapsed("first command"))
+        self.assertEqual(1, STARTUP_SECONDS.value(phase="gateway ready"))
+
+    def test_should_report_the_milestones_in_order(self):
+        self.startup.mark("API authenticated")
+        self.startup.mark("gateway ready")
+
+        self.assertEqual(
+            "API authenticated in 1.00s, gateway ready in 2.00s",
+            self.startup.report(),
+        )
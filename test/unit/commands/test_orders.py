@@ -0,0 +1,56 @@
+from micebot.api import OrderNotFound
+from micebot.commands.orders import register
+from micebot.model.model import OrderQuery
+from test.unit.factories import OrderFactory, OrderWithTotalFactory
+from test.unit.test_case import TestCommand
+
+
+class TestOrdersCommand(TestCommand):
+    def setUp(self):
+        super().setUp()
+        register(bot=self.bot, api=self.api)
+
+    async def test_should_pack_the_orders_in_a_few_messages(self):
+        self.api.list_orders.return_value = OrderWithTotalFactory(
+            total=100, orders=[OrderFactory() for _ in range(50)]
+        )
+
+        await self.invoke("orders", "50")
+
+        self.api.list_orders.assert_awaited_once_with(
+            query=OrderQuery(limit=50)
+        )
+        self.assertEqual(2, self.context.channel.send.await_count)
+        self.assertEqual(
+            50, sum(len(content.fields) for content in self.sent_embeds())
+        )
+
+
+class TestStatsCommand(TestCommand):
+    def setUp(self):
+        super().setUp()
+        self.api.mirror = None
+        register(bot=self.bot, api=self.api)
+
+    async def test_should_report_the_aggregates(self):
+        self.api.fetch_orders.return_value = OrderWithTotalFactory(
+            total=5, orders=[OrderFactory(mod_id="1") for _ in range(5)]
+        )
+
+        await self.invoke("stats")
+        await self.invoke("stats")
+
+        self.assertEqual(2, self.api.fetch_orders.await_count)
+        embeds = self.sent_embeds()
+        self.assertEqual(2, len(embeds))
+        self.assertEqual(embeds[0].to_dict(), embeds[1].to_dict())
+        self.assertIn("5", embeds[0].fields[0].value)
+
+    async def test_should_answer_when_there_are_no_orders(self):
+        self.api.fetch_orders.side_effect = OrderNotFound()
+
+        await self.invoke("stats")
+
+        self.assertIsNone(
+            self.context.channel.send.call_args.kwargs.get("embed")
+        )
@@ -0,0 +1,206 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from discord.ext.commands import Bot
+
+from micebot.api import CodeAlreadyRegistered, ProductNotFound
+from micebot.api.search import ProductIndex
+from micebot.api.writebehind import WriteBehind
+from micebot.commands.products import (
+    decode_attachment,
+    read_products,
+    register,
+)
+from micebot.model.model import ProductCreation, ProductDelete, ProductQuery
+from micebot.model.outbox import outbox
+from test.unit.factories import ProductFactory, ProductResponseFactory
+from test.unit.test_case import Test, TestCommand
+
+
+class TestListCommand(TestCommand):
+    def setUp(self):
+        super().setUp()
+        register(bot=self.bot, api=self.api)
+
+    async def test_should_pack_the_products_in_a_few_messages(self):
+        self.api.list_products.return_value = ProductResponseFactory(
+            products=[ProductFactory() for _ in range(50)]
+        )
+
+        await self.invoke("ls", "50")
+
+        self.api.list_products.assert_awaited_once_with(
+            ProductQuery(taken=False, desc=True, limit=50)
+        )
+        self.context.message.delete.assert_awaited_once()
+        self.assertEqual(3, self.context.channel.send.await_count)
+
+        embeds = self.sent_embeds()
+        self.assertEqual("Detalhamento", embeds[0].title)
+        self.assertEqual(53, sum(len(content.fields) for content in embeds))
+        self.assertEqual("Final do Relatório.", embeds[-1].footer.text)
+
+    async def test_should_send_a_single_message_for_a_short_listing(self):
+        self.api.list_products.return_value = ProductResponseFactory()
+
+        await self.invoke("ls")
+
+        self.assertEqual(1, self.context.channel.send.await_count)
+
+
+class TestReadProducts(Test):
+    def test_should_read_the_code_and_the_optional_summary(self):
+        content = "código,descrição\nabc,Kindle\n\ndef\n".encode()
+        text = decode_attachment(content)
+
+        self.assertEqual(
+            [
+                ProductCreation(code="abc", summary="Kindle"),
+                ProductCreation(code="def", summary="E-Book"),
+            ],
+            list(read_products(text, summary="E-Book")),
+        )
+
+    def test_should_decode_a_latin_1_file(self):
+        content = "código,descrição\nabc,Edição\n".encode("latin-1")
+
+        self.assertEqual(
+            [ProductCreation(code="abc", summary="Edição")],
+            list(read_products(decode_attachment(content), summary="")),
+        )
+
+
+class TestImportCommand(TestCommand):
+    def setUp(self):
+        super().setUp()
+        register(bot=self.bot, api=self.api)
+        self.progress = MagicMock()
+        self.progress.edit = AsyncMock()
+        self.context.channel.send.return_value = self.progress
+
+    async def test_should_ask_for_the_attachment_when_there_is_none(self):
+        self.context.message.attachments = []
+
+        await self.invoke("import")
+
+        self.api.add_product.assert_not_awaited()
+        self.context.message.delete.assert_awaited_once()
+
+    async def test_should_add_the_products_and_report_the_summary(self):
+        attachment = MagicMock()
+        attachment.read = AsyncMock(return_value=b"a\nb\nc\n")
+        self.context.message.attachments = [attachment]
+
+        async def add_product(product):
+            if product.code == "b":
+                raise CodeAlreadyRegistered("duplicated")
+
+        self.api.add_product.side_effect = add_product
+
+        await self.invoke("import")
+
+        self.assertEqual(3, self.api.add_product.await_count)
+        self.context.channel.send.assert_awaited_once()
+
+        report = self.progress.edit.call_args.kwargs["embed"]
+        self.assertEqual("Importação concluída", report.title)
+        self.assertEqual(
+            ["3", "2", "1", "0"], [field.value for field in report.fields]
+        )
+
+    async def test_should_report_an_interrupted_import(self):
+        attachment = MagicMock()
+        attachment.read = AsyncMock(return_value=b"a\n")
+        self.context.message.attachments = [attachment]
+
+        with patch(
+            "micebot.commands.products.bulk_add",
+            AsyncMock(side_effect=RuntimeError("boom")),
+        ):
+            with self.assertRaises(RuntimeError):
+                await self.invoke("import")
+
+        report = self.progress.edit.call_args.kwargs["embed"]
+        self.assertEqual("Importação interrompida", report.title)
+
+
+class TestFindCommand(TestCommand):
+    def setUp(self):
+        super().setUp()
+        self.index = ProductIndex()
+        self.index.ready = True
+        register(bot=self.bot, api=self.api, index=self.index)
+
+    async def test_should_list_the_products_found(self):
+        products = [ProductFactory(code=f"code-{i}") for i in range(3)]
+        self.index.replace(products)
+
+        await self.invoke("find", "code-1")
+
+        self.context.message.delete.assert_awaited_once()
+        embeds = self.sent_embeds()
+        self.assertEqual(1, len(embeds))
+        self.assertEqual(["code-1"], [f.name for f in embeds[0].fields])
+        self.assertIn(products[1].uuid, embeds[0].fields[0].value)
+        self.api.assert_not_called()
+        self.assertEqual([], self.api.method_calls)
+
+    async def test_should_answer_while_the_index_is_not_ready(self):
+        self.index.ready = False
+
+        await self.invoke("find", "code")
+
+        self.assertIn("indexando", self.context.channel.send.call_args.args[0])
+
+    async def test_should_answer_when_the_search_is_disabled(self):
+        self.bot = Bot(command_prefix="!mice ")
+        register(bot=self.bot, api=self.api, index=None)
+
+        await self.invoke("find", "code")
+
+        self.assertIn(
+            "desativada", self.context.channel.send.call_args.args[0]
+        )
+
+
+class TestWriteBehindCommands(TestCommand):
+    def setUp(self):
+        super().setUp()
+        self.writer = WriteBehind(batch_size=10, interval=60)
+        register(bot=self.bot, api=self.api, writer=self.writer)
+
+    def answers(self):
+        return [
+            call.args[0] for call in self.context.channel.send.call_args_list
+        ]
+
+    async def test_should_acknowledge_the_add_then_report_it(self):
+        product = ProductFactory(code="abc")
+        self.api.add_product.return_value = product
+
+        await self.invoke("add", "abc", "Kindle")
+
+        self.api.add_product.assert_not_awaited()
+        self.context.message.delete.assert_awaited_once()
+        self.assertIn("na fila", self.answers()[0])
+
+        await self.writer.join()
+        await outbox.join()
+
+        self.api.add_product.assert_awaited_once_with(
+            ProductCreation(code="abc", summary="Kindle")
+        )
+        self.assertIn(product.uuid, self.answers()[-1])
+
+    async def test_should_report_the_failed_remove(self):
+        self.api.delete_product.side_effect = ProductNotFound("not found")
+
+        await self.invoke("remove", "uuid")
+        await self.writer.join()
+        await outbox.join()
+
+        self.api.delete_product.assert_awaited_once_with(
+            ProductDelete(uuid="uuid")
+        )
+        self.assertIn(
+            "não consegui concluir `remove uuid`", self.answers()[-1]
+        )
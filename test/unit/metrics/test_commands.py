@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from discord.ext.commands import Bot
+
+from micebot.metrics.commands import (
+    COMMAND_DURATION,
+    COMMAND_ERRORS,
+    instrument,
+)
+from test.unit.test_case import TestAsync
+
+
+class TestInstrument(TestAsync):
+    def setUp(self):
+        self.bot = Bot(command_prefix="!mice ")
+        instrument(self.bot)
+        self.context = MagicMock()
+        self.context.command.qualified_name = self.faker.word()
+        self.context.command_failed = False
+
+    async def run_command(self):
+        await self.bot._before_invoke(self.context)
+        await self.bot._after_invoke(self.context)
+
+    async def test_should_time_the_command(self):
+        name = self.context.command.qualified_name
+        count = COMMAND_DURATION.count(command=name)
+
+        await self.run_command()
+
+        self.assertEqual(count + 1, COMMAND_DURATION.count(command=name))
+
+    async def test_should_count_the_failed_command(self):
+        name = self.context.command.qualified_name
+        errors = COMMAND_ERRORS.value(command=name)
+        self.context.command_failed = True
+
+        await self.run_command()
+
+        self.assertEqual(errors + 1, COMMAND_ERRORS.value(command=name))
@@ -0,0 +1,94 @@
+from micebot.metrics import Counter, Gauge, Histogram, Registry
+from test.unit.test_case import Test
+
+
+class TestRegistry(Test):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_should_render_the_counters_by_label(self):
+        counter = self.registry.counter(
+            "requests_total", "Requests.", labels=("method",)
+        )
+        counter.inc(method="GET")
+        counter.inc(2, method="POST")
+
+        self.assertEqual(
+            "# HELP requests_total Requests.\n"
+            "# TYPE requests_total counter\n"
+            'requests_total{method="GET"} 1.0\n'
+            'requests_total{method="POST"} 2.0\n',
+            self.registry.render(),
+        )
+
+    def test_should_render_the_cumulative_histogram_buckets(self):
+        histogram = self.registry.histogram(
+            "latency_seconds", "Latency.", buckets=(0.1, 1.0)
+        )
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(2)
+
+        self.assertEqual(
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{le="0.1"} 1.0\n'
+            'latency_seconds_bucket{le="1.0"} 2.0\n'
+            'latency_seconds_bucket{le="+Inf"} 3.0\n'
+            "latency_seconds_sum 2.55\n"
+            "latency_seconds_count 3.0\n",
+            self.registry.render(),
+        )
+
+    def test_should_read_the_gauge_function_when_rendering(self):
+        depth = [3]
+        self.registry.gauge("depth", "Depth.", function=lambda: depth[0])
+        depth[0] = 5
+
+        self.assertIn("depth 5.0\n", self.registry.render())
+
+    def test_should_read_the_series_of_a_labelled_gauge_function(self):
+        self.registry.gauge(
+            "latency",
+            "Latency.",
+            labels=("shard",),
+            function=lambda: {(0,): 0.1, (1,): 0.2},
+        )
+
+        self.assertIn(
+            'latency{shard="0"} 0.1\nlatency{shard="1"} 0.2\n',
+            self.registry.render(),
+        )
+
+    def test_should_escape_the_label_values(self):
+        counter = self.registry.counter("errors", "Errors.", labels=("kind",))
+        counter.inc(kind='say "hi"\n')
+
+        self.assertIn(
+            'errors{kind="say \\"hi\\"\\n"} 1.0', self.registry.render()
+        )
+
+    def test_should_return_the_metric_already_registered(self):
+        first = self.registry.counter("total", "Total.")
+
+        self.assertIs(first, self.registry.counter("total", "Total."))
+
+
+class TestMetric(Test):
+    def test_should_reject_unexpected_labels(self):
+        with self.assertRaises(ValueError):
+            Counter("total", "Total.", labels=("method",)).inc(status="200")
+
+    def test_should_set_the_gauge(self):
+        gauge = Gauge("depth", "Depth.")
+        gauge.set(4)
+        gauge.set(2)
+
+        self.assertEqual(2, gauge.value())
+
+    def test_should_count_the_observations(self):
+        histogram = Histogram("latency", "Latency.", labels=("endpoint",))
+        histogram.observe(0.2, endpoint="/orders/")
+
+        self.assertEqual(1, histogram.count(endpoint="/orders/"))
+        self.assertEqual(0, histogram.count(endpoint="/products/"))
@@ -0,0 +1,38 @@
+import asyncio
+
+from micebot.metrics import Registry
+from micebot.metrics.server import serve
+from test.unit.test_case import TestAsync
+
+
+class TestServer(TestAsync):
+    async def asyncSetUp(self):
+        self.registry = Registry()
+        self.registry.counter("commands_total", "Commands.").inc()
+        self.server = await serve(port=0, registry=self.registry)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def get(self, path):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(
+            f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode()
+        )
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def test_should_expose_the_metrics_in_the_prometheus_format(self):
+        response = await self.get("/metrics")
+
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK\r\n"))
+        self.assertIn("text/plain; version=0.0.4", response)
+        self.assertTrue(response.endswith(self.registry.render()))
+
+    async def test_should_answer_404_for_other_paths(self):
+        response = await self.get("/")
+
+        self.assertTrue(response.startswith("HTTP/1.1 404 Not Found\r\n"))
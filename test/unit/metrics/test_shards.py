@@ -0,0 +1,47 @@
+import asyncio
+
+from discord.ext.commands import AutoShardedBot
+
+from micebot.metrics import metrics
+from micebot.metrics.shards import SHARD_EVENTS, instrument_shards, shard_of
+from test.unit.test_case import TestAsync
+
+GUILD_ID = 81384788765712384
+
+
+class TestShards(TestAsync):
+    def setUp(self):
+        self.bot = AutoShardedBot(
+            command_prefix="!mice ", shard_count=4, shard_ids=[1, 2]
+        )
+        instrument_shards(self.bot)
+
+    def test_should_route_the_guild_events_as_discord(self):
+        shard = (GUILD_ID >> 22) % 4
+
+        self.assertEqual(
+            shard,
+            shard_of({"t": "MESSAGE_CREATE", "d": {"guild_id": GUILD_ID}}, 4),
+        )
+        self.assertEqual(
+            shard, shard_of({"t": "GUILD_CREATE", "d": {"id": GUILD_ID}}, 4)
+        )
+        self.assertIsNone(shard_of({"op": 11, "d": None}, 4))
+
+    async def test_should_count_the_events_by_shard(self):
+        shard = (GUILD_ID >> 22) % 4
+        events = SHARD_EVENTS.value(shard=shard)
+        unbound = SHARD_EVENTS.value(shard="none")
+
+        self.bot.dispatch(
+            "socket_response",
+            {"t": "MESSAGE_CREATE", "d": {"guild_id": str(GUILD_ID)}},
+        )
+        self.bot.dispatch("socket_response", {"op": 11, "d": None})
+        await asyncio.sleep(0)
+
+        self.assertEqual(events + 1, SHARD_EVENTS.value(shard=shard))
+        self.assertEqual(unbound + 1, SHARD_EVENTS.value(shard="none"))
+
+    def test_should_expose_the_shard_count(self):
+        self.assertIn("micebot_discord_shards 4.0\n", metrics.render())
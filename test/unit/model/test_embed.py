@@ -0,0 +1,142 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+from discord import Colour, Embed
+
+from micebot.model.embed import (
+    EMBED_MAX_CHARACTERS,
+    EMBED_MAX_FIELDS,
+    EmbedTemplate,
+    Field,
+    RecordTemplate,
+    embed,
+    format_datetime,
+)
+from test.unit.test_case import Test
+
+
+class TestPack(Test):
+    def setUp(self):
+        self.template = EmbedTemplate(
+            title="title", footer="footer", color=Colour.green()
+        )
+
+    def records(self, size: int, value: str = "value"):
+        return [Field(key=f"record {i}", value=value) for i in range(size)]
+
+    def test_should_return_a_single_embed_when_there_are_no_records(self):
+        embeds = list(self.template.pack(records=[]))
+
+        self.assertEqual(1, len(embeds))
+        self.assertEqual("title", embeds[0].title)
+        self.assertEqual("footer", embeds[0].footer.text)
+
+    def test_should_fill_the_embeds_up_to_the_field_limit(self):
+        header = [[Field(key="Total", value="60")]]
+
+        embeds = list(
+            self.template.pack(fields=header, records=self.records(60))
+        )
+
+        self.assertEqual(
+            [EMBED_MAX_FIELDS, EMBED_MAX_FIELDS, 11],
+            [len(content.fields) for content in embeds],
+        )
+        self.assertEqual("Total", embeds[0].fields[0].name)
+        self.assertEqual("footer", embeds[-1].footer.text)
+
+    def test_should_continue_in_untitled_embeds_of_the_same_color(self):
+        embeds = list(self.template.pack(records=self.records(30)))
+
+        self.assertEqual("title", embeds[0].title)
+        self.assertEqual(Embed.Empty, embeds[1].title)
+        self.assertEqual(Embed.Empty, embeds[0].footer.text)
+        self.assertEqual(Colour.green(), embeds[1].colour)
+
+    def test_should_respect_the_character_limit(self):
+        embeds = list(
+            self.template.pack(records=self.records(20, value="x" * 1000))
+        )
+
+        self.assertEqual(4, len(embeds))
+        for content in embeds:
+            self.assertLessEqual(
+                sum(len(f.name) + len(f.value) for f in content.fields),
+                EMBED_MAX_CHARACTERS,
+            )
+
+    def test_should_truncate_the_field_values(self):
+        embeds = list(
+            self.template.pack(records=self.records(1, value="x" * 2000))
+        )
+
+        self.assertEqual(1024, len(embeds[0].fields[0].value))
+
+
+class TestEmbedTemplate(Test):
+    def setUp(self):
+        self.template = EmbedTemplate(
+            title="title",
+            description="description",
+            footer="footer",
+            color=Colour.green(),
+            thumbnail=True,
+        )
+
+    def test_should_render_as_the_embed_function(self):
+        fields = [[Field(key="a", value="b"), Field(key="c", value="d")]]
+
+        content = self.template.render(fields=fields)
+
+        self.assertEqual(
+            embed(
+                title="title",
+                description="description",
+                fields=fields,
+                footer="footer",
+                color=Colour.green(),
+                thumbnail=True,
+            ).to_dict(),
+            content.to_dict(),
+        )
+
+    def test_should_not_share_the_fields_between_renders(self):
+        first = self.template.render(fields=[[Field(key="a", value="b")]])
+        second = self.template.render(description="other")
+
+        self.assertEqual(1, len(first.fields))
+        self.assertEqual(0, len(second.fields))
+        self.assertEqual("description", first.description)
+        self.assertEqual("other", second.description)
+
+
+class TestRecordTemplate(Test):
+    def test_should_condense_the_fields_in_a_single_field(self):
+        template = RecordTemplate("UUID", "Código do {summary}")
+
+        field = template("code", "1", "b", summary="a")
+
+        self.assertEqual("code", field.key)
+        self.assertEqual("**UUID:** 1\n**Código do a:** b", field.value)
+        self.assertFalse(field.inline)
+
+    def test_should_not_format_the_values(self):
+        field = RecordTemplate("a")("code", "{0} {summary}")
+
+        self.assertEqual("**a:** {0} {summary}", field.value)
+
+
+class TestFormatDatetime(Test):
+    def test_should_format_with_the_env_formatter(self):
+        value = datetime(2020, 5, 17, 13, 30, 5)
+
+        self.assertEqual("17/05/2020 13:30:05", format_datetime(value))
+        with patch("micebot.model.embed.env.datetime_formatter", "%Y"):
+            self.assertEqual("2020", format_datetime(value))
+
+    def test_should_format_equal_datetimes_in_their_own_zones(self):
+        utc = datetime(2020, 5, 17, 13, tzinfo=timezone.utc)
+        brt = utc.astimezone(timezone(timedelta(hours=-3)))
+
+        self.assertEqual("17/05/2020 13:00:00", format_datetime(utc))
+        self.assertEqual("17/05/2020 10:00:00", format_datetime(brt))
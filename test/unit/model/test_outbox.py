@@ -0,0 +1,91 @@
+from unittest.mock import AsyncMock, MagicMock
+
+from discord import Embed
+
+from micebot.model.outbox import Bucket, Outbox
+from test.unit.test_case import Test, TestAsync
+
+
+class TestBucket(Test):
+    def setUp(self):
+        self.now = 0.0
+        self.bucket = Bucket(rate=5, per=5, clock=lambda: self.now)
+
+    def test_should_allow_a_burst_up_to_the_rate(self):
+        self.assertEqual([0.0] * 5, [self.bucket.delay() for _ in range(5)])
+        self.assertAlmostEqual(1.0, self.bucket.delay())
+
+    def test_should_refill_the_tokens_over_time(self):
+        for _ in range(5):
+            self.bucket.delay()
+
+        self.now = 2
+        self.assertEqual([0.0, 0.0], [self.bucket.delay() for _ in range(2)])
+        self.assertGreater(self.bucket.delay(), 0)
+
+
+class TestOutbox(TestAsync):
+    def setUp(self):
+        self.outbox = Outbox(rate=100, per=1)
+        self.channel = MagicMock()
+        self.channel.id = self.faker.pyint()
+        self.channel.send = AsyncMock(side_effect=lambda *a, **k: MagicMock())
+
+    async def test_should_send_in_the_background(self):
+        future = self.outbox.send(self.channel, "hello", delete_after=5)
+
+        self.assertEqual(1, self.outbox.stats.depth)
+        self.channel.send.assert_not_awaited()
+
+        self.assertIsNotNone(await future)
+        self.channel.send.assert_awaited_once_with(
+            "hello", embed=None, delete_after=5
+        )
+        self.assertEqual(0, self.outbox.stats.depth)
+        self.assertEqual(1, self.outbox.stats.sent)
+
+    async def test_should_coalesce_the_plain_text_messages(self):
+        first = self.outbox.send(self.channel, "first")
+        second = self.outbox.send(self.channel, "second")
+        report = self.outbox.send(self.channel, embed=Embed(title="report"))
+
+        await self.outbox.join()
+
+        self.assertEqual(2, self.channel.send.await_count)
+        self.assertEqual(
+            "first\nsecond", self.channel.send.await_args_list[0].args[0]
+        )
+        self.assertIs(first.result(), second.result())
+        self.assertIsNot(first.result(), report.result())
+        self.assertEqual(1, self.outbox.stats.coalesced)
+
+    async def test_should_not_coalesce_messages_with_different_lifetimes(
+        self,
+    ):
+        self.outbox.send(self.channel, "first", delete_after=5)
+        self.outbox.send(self.channel, "second")
+
+        await self.outbox.join()
+
+        self.assertEqual(2, self.channel.send.await_count)
+
+    async def test_should_pace_the_channel_with_its_bucket(self):
+        self.outbox = Outbox(rate=2, per=0.05)
+
+        for i in range(3):
+            self.outbox.send(self.channel, embed=Embed(title=str(i)))
+        await self.outbox.join()
+
+        self.assertEqual(3, self.channel.send.await_count)
+        self.assertGreater(self.outbox.stats.wait_max, 0.02)
+
+    async def test_should_deliver_the_failure_to_the_sender(self):
+        self.channel.send.side_effect = [RuntimeError("boom"), MagicMock()]
+
+        failed = self.outbox.send(self.channel, embed=Embed(title="1"))
+        sent = self.outbox.send(self.channel, embed=Embed(title="2"))
+        await self.outbox.join()
+
+        with self.assertRaises(RuntimeError):
+            await failed
+        self.assertIsNotNone(await sent)
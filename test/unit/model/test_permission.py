@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock, PropertyMock
+
+from discord.ext.commands import Bot
+
+from micebot.model.permission import MissingPermission, PermissionCache
+from test.unit.test_case import Test, TestAsync
+
+
+def role(role_id: int, name: str):
+    value = MagicMock(id=role_id)
+    value.name = name
+    return value
+
+
+class TestPermissionCache(Test):
+    def setUp(self):
+        self.now = 0
+        self.permissions = PermissionCache(ttl=60, clock=lambda: self.now)
+        self.admin, self.viewer = role(1, "Admin"), role(2, "viewer")
+        self.guild = MagicMock(id=10)
+        self.guild_roles = PropertyMock(return_value=[self.admin, self.viewer])
+        type(self.guild).roles = self.guild_roles
+
+    def member(self, member_id: int, *roles):
+        member = MagicMock(id=member_id, guild=self.guild)
+        type(member).roles = PropertyMock(return_value=list(roles))
+        return member
+
+    def test_should_allow_the_members_with_a_permission_role(self):
+        self.assertTrue(self.permissions.can_use(self.member(1, self.admin)))
+        self.assertFalse(self.permissions.can_use(self.member(2, self.viewer)))
+        self.assertEqual(1, self.guild_roles.call_count)
+
+    def test_should_cache_the_decision_until_it_expires(self):
+        member = self.member(1, self.admin)
+        self.permissions.can_use(member)
+        type(member).roles = PropertyMock(return_value=[self.viewer])
+
+        self.assertTrue(self.permissions.can_use(member))
+        self.now = 60
+        self.assertFalse(self.permissions.can_use(member))
+
+    def test_should_forget_the_decisions(self):
+        member = self.member(1, self.admin)
+        self.permissions.can_use(member)
+        type(member).roles = PropertyMock(return_value=[self.viewer])
+        self.permissions.forget_member(member)
+        self.assertFalse(self.permissions.can_use(member))
+
+        self.viewer.name = "admin"
+        self.permissions.forget_guild(self.guild)
+        self.assertTrue(self.permissions.can_use(member))
+        self.assertEqual(2, self.guild_roles.call_count)
+
+
+class TestPermissionCheck(TestAsync):
+    def setUp(self):
+        self.bot = Bot(command_prefix="!mice ")
+        self.permissions = PermissionCache()
+        self.permissions.register(self.bot)
+        self.context = MagicMock()
+        self.context.guild.roles = [role(1, "admin")]
+        self.context.author.guild = self.context.guild
+        self.context.author.roles = []
+
+    async def test_should_deny_the_members_without_permission(self):
+        with self.assertRaises(MissingPermission):
+            await self.bot.can_run(self.context)
+
+    async def test_should_reevaluate_after_a_member_update(self):
+        with self.assertRaises(MissingPermission):
+            await self.bot.can_run(self.context)
+
+        before = MagicMock(roles=[])
+        self.context.author.roles = self.context.guild.roles
+        for listener in self.bot.extra_events["on_member_update"]:
+            await listener(before, self.context.author)
+
+        self.assertTrue(await self.bot.can_run(self.context))
+
+    async def test_should_deny_the_direct_messages(self):
+        self.context.guild = None
+
+        with self.assertRaises(MissingPermission):
+            await self.bot.can_run(self.context)
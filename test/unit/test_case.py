@@ -1,8 +1,13 @@
 from unittest.async_case import IsolatedAsyncioTestCase
 from unittest.case import TestCase
+from unittest.mock import AsyncMock, MagicMock
 
+from discord.ext.commands import Bot
 from faker import Faker
 
+from micebot.api import AsyncApi
+from micebot.model.outbox import outbox
+
 
 class Test(TestCase):
     @classmethod
@@ -12,3 +17,24 @@ class Test(TestCase):
 
 class TestAsync(IsolatedAsyncioTestCase, Test):
     """Use it for test 'async' functions."""
+
+
+class TestCommand(TestAsync):
+    """Use it for test the bot commands, with a mocked API and context."""
+
+    def setUp(self):
+        self.bot = Bot(command_prefix="!mice ")
+        self.api = AsyncMock(spec=AsyncApi)
+        self.context = MagicMock()
+        self.context.message.delete = AsyncMock()
+        self.context.channel.send = AsyncMock()
+
+    async def invoke(self, name: str, *args):
+        await self.bot.get_command(name).callback(self.context, *args)
+        await outbox.join()
+
+    def sent_embeds(self):
+        return [
+            call.kwargs["embed"]
+            for call in self.context.channel.send.call_args_list
+        ]
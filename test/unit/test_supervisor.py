@@ -0,0 +1,53 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from micebot.supervisor import Supervisor, plan, worker_environ
+from test.unit.test_case import Test
+
+
+class TestPlan(Test):
+    def test_should_spread_the_shards_over_the_workers(self):
+        self.assertEqual([[0, 3], [1, 4], [2]], plan(workers=3, shard_count=5))
+
+    def test_should_raise_value_error_when_there_are_fewer_shards(self):
+        with self.assertRaises(ValueError):
+            plan(workers=3, shard_count=2)
+
+    def test_should_configure_a_sharded_worker_without_mirror(self):
+        environ = worker_environ(1, [1, 3], 4, "shared.db")
+
+        self.assertEqual("1", environ["DISCORD_SHARDED"])
+        self.assertEqual([1, 3], json.loads(environ["DISCORD_SHARD_IDS"]))
+        self.assertEqual("shared.db", environ["SHARED_STORE_PATH"])
+        self.assertEqual("", environ["MIRROR_PATH"])
+        self.assertEqual("0", environ["SEARCH_INDEX"])
+
+
+@patch("micebot.supervisor.time.monotonic")
+class TestSupervisor(Test):
+    def setUp(self):
+        self.supervisor = Supervisor(
+            workers=2, shard_count=2, store_path="shared.db", backoff=1
+        )
+        self.supervisor.spawn = MagicMock(side_effect=self.spawn)
+
+    def spawn(self, index):
+        process = MagicMock()
+        process.poll.return_value = None
+        self.supervisor.processes[index] = process
+
+    def test_should_restart_an_exited_worker_after_a_backoff(self, clock):
+        clock.return_value = 0
+        self.supervisor.watch()
+        self.supervisor.processes[1].poll.return_value = 1
+
+        clock.return_value = 0.5
+        self.supervisor.watch()
+        clock.return_value = 1.4
+        self.supervisor.watch()
+        self.assertIsNone(self.supervisor.processes[1])
+
+        clock.return_value = 1.5
+        self.supervisor.watch()
+        self.assertEqual(3, self.supervisor.spawn.call_count)
+        self.assertIsNotNone(self.supervisor.processes[1])
@@ -0,0 +1,59 @@
+from micebot.tracing.summary import aggregate, flame, slowest, waterfall
+from test.unit.test_case import Test
+
+
+def span(span_id, name, start, duration, parent_id=None, trace_id="t1"):
+    return {
+        "trace_id": trace_id,
+        "span_id": span_id,
+        "parent_id": parent_id,
+        "name": name,
+        "start": start,
+        "duration": duration,
+        "error": None,
+        "attributes": {},
+    }
+
+
+class TestSummary(Test):
+    def setUp(self):
+        self.spans = [
+            span("a", "command ls", 0.0, 1.0),
+            span("b", "api GET /products/", 0.1, 0.6, parent_id="a"),
+            span("c", "parse ProductResponse", 0.6, 0.1, parent_id="b"),
+            span("d", "command ls", 2.0, 0.5, trace_id="t2"),
+            span("e", "api GET /products/", 2.1, 0.2, "d", trace_id="t2"),
+        ]
+
+    def test_should_sum_the_spans_by_path(self):
+        totals = aggregate(self.spans)
+
+        self.assertEqual([2, 1.5, 0.7], totals[("command ls",)])
+        self.assertEqual(2, totals[("command ls", "api GET /products/")][0])
+        self.assertAlmostEqual(
+            0.7, totals[("command ls", "api GET /products/")][2]
+        )
+
+    def test_should_treat_the_orphan_spans_as_roots(self):
+        totals = aggregate(self.spans[1:3])
+
+        self.assertIn(("api GET /products/",), totals)
+
+    def test_should_indent_the_children_under_their_parent(self):
+        lines = list(flame(aggregate(self.spans)))
+
+        self.assertTrue(lines[1].startswith("command ls "))
+        self.assertTrue(lines[2].startswith("  api GET /products/ "))
+        self.assertTrue(lines[3].startswith("    parse ProductResponse "))
+
+    def test_should_show_a_single_trace(self):
+        lines = list(waterfall(self.spans, "t2"))
+
+        self.assertEqual(3, len(lines))
+        self.assertIn("+100.0", lines[2])
+
+    def test_should_list_the_slowest_commands(self):
+        lines = list(slowest(self.spans, 1))
+
+        self.assertEqual(1, len(lines))
+        self.assertTrue(lines[0].startswith("t1 "))
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import tempfile
+
+from micebot.tracing import NOOP_SPAN, JsonlExporter, Tracer
+from test.unit.test_case import TestAsync
+
+
+class TestTracer(TestAsync):
+    def setUp(self):
+        self.spans = []
+        self.tracer = Tracer(exporter=self.spans.append)
+
+    def by_name(self):
+        return {span["name"]: span for span in self.spans}
+
+    async def test_should_nest_the_spans_of_a_trace(self):
+        with self.tracer.span("command ls"):
+            with self.tracer.span("api GET /products/", attempt=0):
+                pass
+
+        spans = self.by_name()
+        command, api = spans["command ls"], spans["api GET /products/"]
+        self.assertIsNone(command["parent_id"])
+        self.assertEqual(command["span_id"], api["parent_id"])
+        self.assertEqual(command["trace_id"], api["trace_id"])
+        self.assertEqual({"attempt": 0}, api["attributes"])
+        self.assertIsNone(self.tracer.current())
+
+    async def test_should_keep_the_parent_in_the_created_tasks(self):
+        async def fetch():
+            with self.tracer.span("api GET /orders/"):
+                await asyncio.sleep(0)
+
+        with self.tracer.span("command orders"):
+            await asyncio.gather(fetch(), fetch())
+
+        command = self.by_name()["command orders"]
+        children = [s for s in self.spans if s["name"] != "command orders"]
+        self.assertEqual(2, len(children))
+        for span in children:
+            self.assertEqual(command["span_id"], span["parent_id"])
+
+    async def test_should_start_a_new_trace_per_root_span(self):
+        with self.tracer.span("command ls"):
+            pass
+        with self.tracer.span("command orders"):
+            pass
+
+        first, second = self.spans
+        self.assertNotEqual(first["trace_id"], second["trace_id"])
+
+    async def test_should_record_the_error(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("command add"):
+                raise ValueError("invalid")
+
+        self.assertEqual("ValueError('invalid')", self.spans[0]["error"])
+
+    async def test_should_accept_an_explicit_parent(self):
+        command = self.tracer.start("command ls")
+        self.tracer.finish(command)
+
+        with self.tracer.span("discord send", parent=command):
+            pass
+
+        self.assertEqual(command.span_id, self.spans[1]["parent_id"])
+
+    async def test_should_record_nothing_while_disabled(self):
+        tracer = Tracer()
+
+        with tracer.span("command ls") as span:
+            span.set(limit=5)
+
+        self.assertIs(NOOP_SPAN, span)
+        self.assertIsNone(tracer.current())
+
+
+class TestJsonlExporter(TestAsync):
+    def test_should_append_a_json_line_per_span_and_rotate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "traces.jsonl")
+            tracer = Tracer(
+                exporter=JsonlExporter(path, max_bytes=1024, backups=1)
+            )
+
+            for i in range(20):
+                with tracer.span("command ls", index=i):
+                    pass
+            for handler in tracer.exporter.logger.handlers:
+                handler.close()
+
+            with open(path) as file:
+                spans = [json.loads(line) for line in file]
+            self.assertEqual(19, spans[-1]["attributes"]["index"])
+            self.assertTrue(os.path.exists(f"{path}.1"))
@@ -0,0 +1,60 @@
+import json
+from typing import Callable, List, Tuple, Union
+
+from httpcore import AsyncByteStream, AsyncHTTPTransport
+from httpx import Request
+
+Handler = Callable[[Request], Tuple[int, Union[dict, list, bytes, None]]]
+
+
+class MockTransport(AsyncHTTPTransport):
+    """
+    Transport that answers the requests with a handler instead of a server.
+
+    The handler receives the `httpx.Request` and returns a tuple with the
+    HTTP status and the response body (a JSON serializable object or bytes),
+    optionally followed by a dict of response headers. The handler may also
+    raise any exception to simulate a transport failure.
+    """
+
+    def __init__(self, handler: Handler):
+        self.handler = handler
+        self.requests: List[Request] = []
+
+    async def request(
+        self, method, url, headers=None, stream=None, timeout=None
+    ):
+        scheme, host, port, path = url
+        body = b""
+        if stream is not None:
+            body = b"".join([chunk async for chunk in stream])
+
+        authority = host.decode()
+        if port not in (None, 80, 443):
+            authority = f"{authority}:{port}"
+        request = Request(
+            method.decode(),
+            f"{scheme.decode()}://{authority}{path.decode()}",
+            headers=headers,
+            data=body,
+        )
+        await request.aread()
+        self.requests.append(request)
+
+        status, content, *extra = self.handler(request)
+        response_headers = extra[0] if extra else {}
+        if not isinstance(content, bytes):
+            content = json.dumps(content).encode()
+            response_headers.setdefault("content-type", "application/json")
+        response_headers["content-length"] = str(len(content))
+
+        async def content_iterator():
+            yield content
+
+        return (
+            b"HTTP/1.1",
+            status,
+            b"",
+            [(k.encode(), v.encode()) for k, v in response_headers.items()],
+            AsyncByteStream(aiterator=content_iterator()),
+        )